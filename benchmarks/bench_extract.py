@@ -0,0 +1,304 @@
+"""
+Offline benchmark of card extraction: per-section scans against the single pass.
+
+Both extractors run on fresh soups of the same synthetic page with the network
+stubbed out; the rendered markdown of the two must be identical. Results are
+written as JSON.
+
+Usage (from the project root):
+    python -m benchmarks.bench_extract --sizes 100 1000 --backend lxml
+"""
+
+import argparse
+import json
+import platform
+import re
+import sys
+
+import bs4
+
+from benchmarks.bench_parse import _summarise, _time, stub_network
+from benchmarks.synthetic_pages import generate_exam_page
+from src.models.question import Choice, Comment, Question, VoteBar
+from src.parsers.html_parser import DEFAULT_BACKEND, PARSER_BACKENDS, HtmlParser
+from src.parsers.question_processor import QuestionProcessor
+
+DEFAULT_SIZES = [100, 1000]
+
+
+class LegacyQuestionProcessor(QuestionProcessor):
+    """
+    The extraction used before CardExtractor, kept as the benchmark baseline:
+    every section of a card is located by its own find/find_all scan
+    """
+
+    def prefetch(self, question_cards, assets_folder):
+        self.image_handler.prefetch_images(question_cards, assets_folder)
+        return self.fetch_discussions(
+            [self._get_question_id(card) for card in question_cards]
+        )
+
+    def extract_question(self, card, assets_folder, discussions=None):
+        question = Question()
+        self._process_question_header(card, question)
+        self._process_question_body(card, question, assets_folder, discussions)
+        return question
+
+    def _process_question_header(self, card, question):
+        """Extract question header information (number and topic)"""
+        header = card.find("div", class_="card-header")
+        if header:
+            question.number = header.get_text().strip().split("\n")[0].strip()
+            topic_span = header.find("span", class_="question-title-topic")
+            if topic_span:
+                question.topic = topic_span.text.strip()
+
+    def _get_question_id(self, card):
+        """Return the data-id of a question card, or None if it has none"""
+        body = card.find("div", class_="card-body")
+        return body.get("data-id") if body else None
+
+    def _process_question_body(self, card, question, assets_folder, discussions=None):
+        """
+        Process the question body including text, images, choices and answers.
+        discussions: optional mapping of question ID to prefetched top comments
+        """
+        body = card.find("div", class_="card-body")
+        if not body:
+            return
+
+        # Add question ID if available
+        question.question_id = body.get("data-id")
+
+        # Process question text and images
+        self._process_question_text(body, question, assets_folder)
+
+        # Process choices
+        choices_container = body.find("div", class_="question-choices-container")
+        if choices_container:
+            self._process_choices(choices_container, question, assets_folder)
+
+        # Process correct answer
+        self._process_correct_answer(body, question, assets_folder)
+
+        # Fetch and add top 3 discussion comments
+        question_id = question.question_id
+        if question_id:
+            if discussions is not None and question_id in discussions:
+                top_comments = discussions[question_id]
+            else:
+                top_comments = self.fetch_top_discussion_comments(question_id)
+            question.comments = [
+                Comment(comment["author"], comment["votes"], comment["content"])
+                for comment in top_comments
+            ]
+
+    def _process_question_text(self, body, question, assets_folder):
+        """Extract and process the question text with images"""
+        question_text = body.find("p", class_="card-text")
+        if not question_text:
+            return
+
+        # Process images inside question text
+        self.image_handler.process_images_in_element(question_text, assets_folder)
+
+        question.text = question_text.get_text().strip()
+
+        # Check for any remaining images directly in question text
+        for img in question_text.find_all("img"):
+            image = self.image_handler.get_image(img, assets_folder)
+            if image:
+                question.images.append(image)
+
+    def _process_choices(self, choices_container, question, assets_folder):
+        """Process question choices"""
+        choice_items = choices_container.find_all("li", class_="multi-choice-item")
+
+        for item in choice_items:
+            choice_letter = item.find("span", class_="multi-choice-letter")
+            letter = ""
+            if choice_letter:
+                letter = choice_letter.get_text().strip()
+
+            # Check if this is the correct answer
+            is_correct = "correct-hidden" in item.get("class", [])
+
+            # Process images in choice text
+            self.image_handler.process_images_in_element(item, assets_folder)
+
+            # Get the choice text (excluding the letter part)
+            choice_text = item.get_text().strip()
+            choice_text = re.sub(rf"^{letter}\s*", "", choice_text).strip()
+            # Also remove "Most Voted" if present
+            choice_text = re.sub(r"Most Voted\s*$", "", choice_text).strip()
+
+            choice = Choice(letter, choice_text, is_correct)
+
+            # Check if there are any images in this choice that weren't processed via text
+            for img in item.find_all("img"):
+                image = self.image_handler.get_image(img, assets_folder)
+                if image:
+                    choice.images.append(image)
+
+            question.choices.append(choice)
+
+    def _process_correct_answer(self, body, question, assets_folder):
+        """Process the correct answer section"""
+        # Use a more flexible selector that looks for elements containing both required classes
+        answer_p = body.find(
+            "p",
+            class_=lambda c: c
+            and all(cls in c.split() for cls in ["card-text", "question-answer"]),
+        )
+        if not answer_p:
+            return
+
+        question.has_answer = True
+
+        correct_span = answer_p.find("span", class_="correct-answer")
+        if correct_span:
+            question.correct_answer = correct_span.text.strip()
+
+        # Process images in explanation
+        for img in answer_p.find_all("img"):
+            image = self.image_handler.get_image(img, assets_folder)
+            if image:
+                question.answer_images.append(image)
+
+        vote_div = answer_p.find("div", class_="voting-summary")
+        if not vote_div:
+            # lxml and html5lib follow the HTML rules and close the <p> before
+            # the nested <div>, which moves the summary right after the answer
+            next_element = answer_p.find_next_sibling()
+            if next_element is not None and "voting-summary" in next_element.get(
+                "class", []
+            ):
+                vote_div = next_element
+        if vote_div:
+            question.votes = []
+
+            progress_bar = vote_div.find("div", class_="vote-distribution-bar")
+            if progress_bar:
+                vote_bars = progress_bar.find_all("div", class_="vote-bar")
+
+                for bar in vote_bars:
+                    # Only process visible vote bars (display: flex)
+                    if bar.get("style") and "display: flex" in bar.get("style"):
+                        option_text = bar.text.strip()
+                        width_match = re.search(
+                            r"width:\s*(\d+)%", bar.get("style", "")
+                        )
+                        percentage = int(width_match.group(1)) if width_match else None
+
+                        # Get vote count from tooltip
+                        vote_count = None
+                        if (
+                            bar.has_attr("data-original-title")
+                            and "vote" in bar["data-original-title"]
+                        ):
+                            vote_count_match = re.search(
+                                r"(\d+)\s*vote", bar["data-original-title"]
+                            )
+                            if vote_count_match:
+                                vote_count = int(vote_count_match.group(1))
+
+                        question.votes.append(VoteBar(option_text, vote_count, percentage))
+
+EXTRACTORS = {
+    "legacy": LegacyQuestionProcessor,
+    "single_pass": QuestionProcessor,
+}
+
+
+def benchmark_size(num_questions, repeat, backend):
+    """
+    Time both extractors on one synthetic page
+
+    Returns:
+        dict: Page size, timing summary (seconds) of each extractor and speedup
+
+    Raises:
+        AssertionError: If the extractors render different markdown
+    """
+    html_content = generate_exam_page(num_questions)
+    parser = HtmlParser(show_progress=False, backend=backend)
+    assets_folder = parser.file_utils.get_assets_folder_path()
+
+    # Extraction replaces <img> tags in place, so every run parses a fresh soup
+    processors = {
+        name: extractor(parser.file_utils, show_progress=False)
+        for name, extractor in EXTRACTORS.items()
+    }
+    outputs = {
+        name: processor.process_questions(
+            parser._prepare_soup(html_content), assets_folder
+        )
+        for name, processor in processors.items()
+    }
+    if outputs["legacy"] != outputs["single_pass"]:
+        raise AssertionError(f"Extractors disagree on a {num_questions} question page")
+
+    timings = {name: [] for name in EXTRACTORS}
+    for _ in range(repeat):
+        for name, processor in processors.items():
+            soup = parser._prepare_soup(html_content)
+            timings[name].append(_time(processor.process_questions, soup, assets_folder))
+
+    seconds = {name: _summarise(runs) for name, runs in timings.items()}
+    return {
+        "questions": num_questions,
+        "page_bytes": len(html_content.encode("utf-8")),
+        "seconds": seconds,
+        "speedup": seconds["legacy"]["median"] / seconds["single_pass"]["median"],
+    }
+
+
+def run(sizes, repeat, backend):
+    """Run the benchmark for every size and return the JSON-serialisable report"""
+    with stub_network():
+        results = []
+        for size in sizes:
+            results.append(benchmark_size(size, repeat, backend))
+            print(
+                f"{size} questions: speedup {results[-1]['speedup']:.2f}x",
+                file=sys.stderr,
+            )
+
+    return {
+        "benchmark": "extract",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "beautifulsoup4": bs4.__version__,
+        "backend": backend,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Questions per page"
+    )
+    arg_parser.add_argument(
+        "--repeat", type=int, default=5, help="Runs per size (default: 5)"
+    )
+    arg_parser.add_argument(
+        "--backend", choices=PARSER_BACKENDS, default=DEFAULT_BACKEND
+    )
+    arg_parser.add_argument(
+        "--output", help="Write the JSON report to this file instead of stdout"
+    )
+    args = arg_parser.parse_args(argv)
+
+    report = run(args.sizes, args.repeat, args.backend)
+    content = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(content + "\n")
+    else:
+        print(content)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Offline benchmark of the parsing hot path on synthetic exam pages.
+
+Network access is stubbed out, so the timings only cover HTML parsing,
+extraction and rendering. Results are written as JSON.
+
+Usage (from the project root):
+    python -m benchmarks.bench_parse --sizes 10 100 1000 5000 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+# Make both "src.*" and the top-level packages under src importable, like src/main.py
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+import bs4  # noqa: E402
+
+from benchmarks.synthetic_pages import generate_exam_page  # noqa: E402
+from src.parsers.html_parser import DEFAULT_BACKEND, PARSER_BACKENDS, HtmlParser  # noqa: E402
+from src.parsers.question_processor import QuestionProcessor  # noqa: E402
+
+DEFAULT_SIZES = [10, 100, 1000, 5000]
+
+STUB_COMMENTS = [
+    {"author": "reviewer", "votes": 12, "content": "Answer is correct."},
+    {"author": "student", "votes": 3, "content": "Agree."},
+]
+
+
+def _stub_download_image(image_url, save_folder="assets", *args, **kwargs):
+    return os.path.join(save_folder, os.path.basename(image_url))
+
+
+def _stub_download_images(image_urls, save_folder="assets", *args, **kwargs):
+    return {url: _stub_download_image(url, save_folder) for url in image_urls}
+
+
+def _stub_fetch_top_discussion_comments(self, question_id, top_n=3):
+    return STUB_COMMENTS[:top_n]
+
+
+@contextmanager
+def stub_network():
+    """Replace image downloads and discussion fetches with local stubs"""
+    with mock.patch(
+        "src.parsers.image_handler.download_image", _stub_download_image
+    ), mock.patch(
+        "src.parsers.image_handler.download_images", _stub_download_images
+    ), mock.patch.object(
+        QuestionProcessor,
+        "fetch_top_discussion_comments",
+        _stub_fetch_top_discussion_comments,
+    ):
+        yield
+
+
+def _summarise(runs):
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "max": max(runs),
+        "runs": runs,
+    }
+
+
+def _time(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def benchmark_size(num_questions, repeat, backend):
+    """
+    Time the parsing stages on one synthetic page
+
+    Returns:
+        dict: Page size and timing summary (seconds) of each stage
+    """
+    html_content = generate_exam_page(num_questions)
+    parser = HtmlParser(show_progress=False, backend=backend)
+    assets_folder = parser.file_utils.get_assets_folder_path()
+
+    timings = {
+        "html_parser.parse": [],
+        "question_processor.process_questions": [],
+        "exam_info_extractor": [],
+    }
+    for _ in range(repeat):
+        timings["html_parser.parse"].append(_time(parser.parse, html_content))
+
+        # Processing replaces <img> tags in place, so every run needs a fresh soup
+        soup = parser._prepare_soup(html_content)
+        timings["question_processor.process_questions"].append(
+            _time(parser.question_processor.process_questions, soup, assets_folder)
+        )
+        timings["exam_info_extractor"].append(
+            _time(parser.exam_info_extractor.extract_exam_info, soup)
+        )
+
+    return {
+        "questions": num_questions,
+        "page_bytes": len(html_content.encode("utf-8")),
+        "seconds": {name: _summarise(runs) for name, runs in timings.items()},
+    }
+
+
+def run(sizes, repeat, backend):
+    """Run the benchmark for every size and return the JSON-serialisable report"""
+    with stub_network():
+        results = []
+        for size in sizes:
+            results.append(benchmark_size(size, repeat, backend))
+            print(
+                f"{size} questions: parse "
+                f"{results[-1]['seconds']['html_parser.parse']['median']:.3f}s",
+                file=sys.stderr,
+            )
+
+    return {
+        "benchmark": "parse",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "beautifulsoup4": bs4.__version__,
+        "backend": backend,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Questions per page"
+    )
+    arg_parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per size (default: 3)"
+    )
+    arg_parser.add_argument(
+        "--backend", choices=PARSER_BACKENDS, default=DEFAULT_BACKEND
+    )
+    arg_parser.add_argument(
+        "--output", help="Write the JSON report to this file instead of stdout"
+    )
+    args = arg_parser.parse_args(argv)
+
+    report = run(args.sizes, args.repeat, args.backend)
+    content = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(content + "\n")
+    else:
+        print(content)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark of the vote analytics on synthetic vote distributions.
+
+Both the NumPy and the pure Python statistics run on the same distributions and
+must agree. Results are written as JSON.
+
+Usage (from the project root):
+    python -m benchmarks.bench_votes --sizes 1000 10000 100000
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+
+from benchmarks.bench_parse import _summarise, _time
+from src.analytics.votes import (
+    STAT_FIELDS,
+    VoteDistributions,
+    _numpy,
+    rank_disputed_answers,
+    vote_statistics,
+)
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+LETTERS = "ABCDEF"
+
+
+def generate_distributions(num_questions, seed=0):
+    """
+    Build vote distributions in the QuestionStore.vote_distributions layout.
+    About one question in ten has its official answer outvoted.
+    """
+    rng = random.Random(seed)
+    distributions = []
+    for index in range(num_questions):
+        options = LETTERS[: rng.randint(2, 6)]
+        counts = sorted((rng.randint(0, 200) for _ in options), reverse=True)
+        official = options[0] if rng.random() > 0.1 else options[-1]
+        total = sum(counts) or 1
+        bars = [
+            (f"{letter} ({round(100 * count / total)}%)", count, round(100 * count / total))
+            for letter, count in zip(options, counts)
+        ]
+        distributions.append(
+            ("EXAM-1", str(index), f"#{index}", "Topic 1", official, bars)
+        )
+    return distributions
+
+
+def _agree(first, second):
+    """Tell whether two vote_statistics results are equal up to rounding"""
+    for name in STAT_FIELDS:
+        for a, b in zip(first[name], second[name]):
+            if isinstance(a, float) or isinstance(b, float):
+                if not math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12):
+                    return False
+            elif a != b:
+                return False
+    return True
+
+
+def benchmark_size(num_questions, repeat):
+    """
+    Time the statistics of num_questions distributions with each backend
+
+    Returns:
+        dict: Timing summary (seconds) of loading, of each backend and of ranking
+    """
+    rows = generate_distributions(num_questions)
+    timings = {"load": [], "python": [], "rank": []}
+    for _ in range(repeat):
+        timings["load"].append(_time(VoteDistributions, rows))
+    distributions = VoteDistributions(rows)
+
+    python_stats = vote_statistics(distributions, use_numpy=False)
+    for _ in range(repeat):
+        timings["python"].append(_time(vote_statistics, distributions, False))
+    if _numpy() is not None:
+        timings["numpy"] = []
+        if not _agree(python_stats, vote_statistics(distributions, use_numpy=True)):
+            raise AssertionError("NumPy and Python vote statistics disagree")
+        for _ in range(repeat):
+            timings["numpy"].append(_time(vote_statistics, distributions, True))
+    for _ in range(repeat):
+        timings["rank"].append(_time(rank_disputed_answers, distributions))
+
+    return {
+        "questions": num_questions,
+        "seconds": {name: _summarise(runs) for name, runs in timings.items()},
+    }
+
+
+def run(sizes, repeat):
+    """Run the benchmark for every size and return the JSON-serialisable report"""
+    results = []
+    for size in sizes:
+        results.append(benchmark_size(size, repeat))
+        seconds = results[-1]["seconds"]
+        backend = "numpy" if "numpy" in seconds else "python"
+        print(
+            f"{size} questions: {backend} {seconds[backend]['median']:.4f}s",
+            file=sys.stderr,
+        )
+    numpy = _numpy()
+    return {
+        "benchmark": "votes",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": numpy.__version__ if numpy is not None else None,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Questions analysed"
+    )
+    arg_parser.add_argument(
+        "--repeat", type=int, default=5, help="Runs per size (default: 5)"
+    )
+    arg_parser.add_argument(
+        "--output", help="Write the JSON report to this file instead of stdout"
+    )
+    args = arg_parser.parse_args(argv)
+
+    report = run(args.sizes, args.repeat)
+    content = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(content + "\n")
+    else:
+        print(content)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Startup budget check: import time of the command line entry point.
+
+Each run imports src.cmd.cli in a fresh interpreter under `python -X importtime`
+and reads the cumulative time of the module. The check fails if the median
+exceeds the budget or if a heavy module is imported at startup.
+
+Usage (from the project root):
+    python -m benchmarks.import_budget --budget-ms 150 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+ENTRY_MODULE = "src.cmd.cli"
+DEFAULT_BUDGET_MS = 150
+
+# Modules that only the code paths using them may import
+HEAVY_MODULES = (
+    "requests",
+    "urllib3",
+    "bs4",
+    "lxml",
+    "tqdm",
+    "selenium",
+    "cProfile",
+    "sqlite3",
+)
+
+# Same sys.path as src/main.py: the project root and the packages under src
+_IMPORT_SCRIPT = (
+    "import sys; sys.path[:0] = [{root!r}, {src!r}]; import {module}; "
+    "print(','.join(sorted(sys.modules)))"
+)
+
+
+def measure_once(module=ENTRY_MODULE):
+    """
+    Import module in a fresh interpreter
+
+    Returns:
+        tuple: (cumulative import time in ms, set of loaded module names,
+            list of (ms, name) of the imported modules)
+    """
+    script = _IMPORT_SCRIPT.format(
+        root=PROJECT_ROOT, src=os.path.join(PROJECT_ROOT, "src"), module=module
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        check=True,
+    )
+    cumulative_ms = None
+    imports = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        if name.strip() == module:
+            cumulative_ms = int(cumulative) / 1000
+        else:
+            imports.append((int(cumulative) / 1000, name.strip()))
+    loaded = set(result.stdout.strip().split(","))
+    return cumulative_ms, loaded, imports
+
+
+def run(repeat=5, budget_ms=DEFAULT_BUDGET_MS, module=ENTRY_MODULE, top=10):
+    """
+    Measure the import time of module several times
+
+    Returns:
+        dict: Report with the timings, the heaviest top-level imports, the heavy
+            modules loaded at startup and whether the budget is met
+    """
+    timings = []
+    loaded = set()
+    imports = []
+    for _ in range(repeat):
+        cumulative_ms, loaded, imports = measure_once(module)
+        timings.append(cumulative_ms)
+    heavy = sorted(name for name in HEAVY_MODULES if name in loaded)
+    median_ms = statistics.median(timings)
+    return {
+        "module": module,
+        "python": sys.version.split()[0],
+        "budget_ms": budget_ms,
+        "median_ms": round(median_ms, 1),
+        "min_ms": round(min(timings), 1),
+        "max_ms": round(max(timings), 1),
+        "heavy_modules_loaded": heavy,
+        "slowest_imports": [
+            {"module": name, "cumulative_ms": round(ms, 1)}
+            for ms, name in sorted(imports, reverse=True)[:top]
+        ],
+        "ok": median_ms <= budget_ms and not heavy,
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help=f"Maximum median import time in milliseconds (default: {DEFAULT_BUDGET_MS})",
+    )
+    arg_parser.add_argument(
+        "--repeat", type=int, default=5, help="Fresh interpreters measured (default: 5)"
+    )
+    arg_parser.add_argument(
+        "--module", default=ENTRY_MODULE, help=f"Module to import (default: {ENTRY_MODULE})"
+    )
+    args = arg_parser.parse_args(argv)
+
+    report = run(args.repeat, args.budget_ms, args.module)
+    print(json.dumps(report, indent=2))
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Generate synthetic exam pages with the ExamTopics layout for benchmarks"""
+
+import random
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<title>Exam {exam_code} topic 1 question 1 discussion - ExamTopics</title>
+<style>body {{ font-family: sans-serif; }}</style>
+<script>var examCode = "{exam_code}";</script>
+</head>
+<body>
+<nav class="navbar"><a href="/">ExamTopics</a><img src="/assets/images/logo.png" alt="logo"></nav>
+<div class="container">
+<div class="examQa">
+  <h2>Microsoft {exam_code} Exam Actual Questions</h2>
+  <span class="examQa__date">Last updated on Jan. 1, 2026.</span>
+  <div class="examQa__item"><span>Vendor:</span><span>Microsoft</span></div>
+  <div class="examQa__item"><span>Exam Code:</span><span>{exam_code}</span></div>
+  <div class="examQa__item"><span>Questions:</span><span>{num_questions}</span></div>
+</div>
+<div class="questions-container">
+{cards}
+</div>
+</div>
+<footer class="footer"><p>Footer</p></footer>
+</body>
+</html>
+"""
+
+CARD_TEMPLATE = """<div class="card exam-question-card">
+  <div class="card-header text-white bg-primary">
+    Question #{number}
+    <span class="question-title-topic pl-1">Topic {topic}</span>
+  </div>
+  <div class="card-body question-body" data-id="{question_id}">
+    <p class="card-text">
+      {text}<br>
+      {question_image}
+    </p>
+    <div class="question-choices-container">
+      <ul>
+{choices}
+      </ul>
+    </div>
+    <p class="card-text question-answer bg-light white-text">
+      <span class="correct-answer-box"><strong>Correct Answer:</strong>
+      <span class="correct-answer">{correct}</span></span>
+      <span class="answer-description">{answer_image}</span>
+      <div class="voting-summary col-12">
+        <div class="vote-distribution-bar progress">
+{vote_bars}
+        </div>
+      </div>
+    </p>
+    <a href="#" class="btn btn-primary reveal-solution">Reveal Solution</a>
+    <a href="#" class="btn btn-secondary question-discussion-button">Discussion</a>
+  </div>
+</div>"""
+
+CHOICE_TEMPLATE = """        <li class="multi-choice-item{correct_class}">
+          <span class="multi-choice-letter" data-choice-letter="{letter}">{letter}.</span>
+          {text}{badge}
+        </li>"""
+
+VOTE_BAR_TEMPLATE = (
+    '          <div class="vote-bar progress-bar" style="width: {percentage}%; display: flex;"'
+    ' data-toggle="tooltip" data-original-title="{votes} votes">{letter} ({percentage}%)</div>'
+)
+
+WORDS = (
+    "you need to deploy configure an azure function app that processes messages "
+    "from a storage queue what should you use solution must minimize cost and "
+    "administrative effort which service tier container registry"
+).split()
+
+LETTERS = "ABCDEF"
+
+
+def _sentence(rng, length):
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + "."
+
+
+def generate_question_card(number, rng, num_choices=4, images=True):
+    """
+    Generate one exam-question-card
+
+    Args:
+        number (int): Question number, also used to derive the question ID
+        rng (random.Random): Random generator
+        num_choices (int): Number of choices of the question
+        images (bool): Include a question image and an answer image
+
+    Returns:
+        str: HTML of the card
+    """
+    letters = LETTERS[:num_choices]
+    correct = rng.choice(letters)
+    most_voted = rng.choice(letters)
+
+    choices = "\n".join(
+        CHOICE_TEMPLATE.format(
+            correct_class=" correct-hidden" if letter == correct else "",
+            letter=letter,
+            text=_sentence(rng, rng.randint(4, 12)),
+            badge=(
+                ' <span class="badge badge-success most-voted-answer-badge">Most Voted</span>'
+                if letter == most_voted
+                else ""
+            ),
+        )
+        for letter in letters
+    )
+
+    voted_letters = rng.sample(letters, k=min(len(letters), rng.randint(1, 3)))
+    votes = [rng.randint(1, 200) for _ in voted_letters]
+    total = sum(votes)
+    vote_bars = "\n".join(
+        VOTE_BAR_TEMPLATE.format(
+            letter=letter, votes=count, percentage=round(100 * count / total)
+        )
+        for letter, count in zip(voted_letters, votes)
+    )
+
+    return CARD_TEMPLATE.format(
+        number=number,
+        topic=1 + number // 50,
+        question_id=100000 + number,
+        text=_sentence(rng, rng.randint(15, 60)),
+        question_image=(
+            f'<img src="/assets/media/exam-media/q{number}.png" class="in-exam-image">'
+            if images
+            else ""
+        ),
+        choices=choices,
+        correct=correct,
+        answer_image=(
+            f'<img src="/assets/media/exam-media/a{number}.png" class="in-exam-image">'
+            if images
+            else ""
+        ),
+        vote_bars=vote_bars,
+    )
+
+
+def generate_exam_page(num_questions, num_choices=4, images=True, seed=0, exam_code="AZ-204"):
+    """
+    Generate a full exam page in the ExamTopics layout
+
+    Args:
+        num_questions (int): Number of question cards
+        num_choices (int): Number of choices per question
+        images (bool): Include question and answer images
+        seed (int): Seed of the random generator, pages are deterministic per seed
+        exam_code (str): Exam code shown in the header
+
+    Returns:
+        str: HTML of the page
+    """
+    rng = random.Random(seed)
+    cards = "\n".join(
+        generate_question_card(number, rng, num_choices, images)
+        for number in range(1, num_questions + 1)
+    )
+    return PAGE_TEMPLATE.format(
+        exam_code=exam_code, num_questions=num_questions, cards=cards
+    )
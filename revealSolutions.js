@@ -1,20 +1,40 @@
 /**
  * Script to automatically click all "Reveal Solution" buttons on a page
  * and "Discussion" buttons
+ *
+ * window.revealSolutionsPending counts the clicks still scheduled, so the
+ * scraper can wait for it to reach 0 instead of sleeping.
+ * window.revealSolutionsDuration is the delay in ms of the last scheduled
+ * click, so the scraper can scale its wait with the number of buttons.
  */
 
+// Delay between two clicks of the same kind, to prevent overwhelming the page
+const CLICK_INTERVAL_MS = 300;
+
+window.revealSolutionsPending = 0;
+window.revealSolutionsDuration = 0;
+
 function revealAllSolutions() {
   // Find all buttons with the class "reveal-solution"
   const revealButtons = document.querySelectorAll('.btn.btn-primary.reveal-solution');
   
   console.log(`Found ${revealButtons.length} solution buttons to click.`);
+  window.revealSolutionsDuration = Math.max(
+    window.revealSolutionsDuration,
+    (revealButtons.length - 1) * CLICK_INTERVAL_MS
+  );
   
   // Click on each button with a small delay
   revealButtons.forEach((button, index) => {
+    window.revealSolutionsPending++;
     setTimeout(() => {
       console.log(`Clicking button ${index + 1} of ${revealButtons.length}`);
-      button.click();
-    }, index * 300); // 300ms delay between clicks to prevent overwhelming the page
+      try {
+        button.click();
+      } finally {
+        window.revealSolutionsPending--;
+      }
+    }, index * CLICK_INTERVAL_MS);
   });
 }
 
@@ -24,13 +44,22 @@ function clickAllDiscussionButtons() {
   const discussionButtons = document.querySelectorAll('.btn.btn-secondary.question-discussion-button');
   
   console.log(`Found ${discussionButtons.length} discussion buttons to click.`);
+  window.revealSolutionsDuration = Math.max(
+    window.revealSolutionsDuration,
+    (discussionButtons.length - 1) * CLICK_INTERVAL_MS
+  );
   
   // Click on each button with a small delay
   discussionButtons.forEach((button, index) => {
+    window.revealSolutionsPending++;
     setTimeout(() => {
       console.log(`Clicking discussion button ${index + 1} of ${discussionButtons.length}`);
-      button.click();
-    }, index * 300); // 300ms delay between clicks to prevent overwhelming the page
+      try {
+        button.click();
+      } finally {
+        window.revealSolutionsPending--;
+      }
+    }, index * CLICK_INTERVAL_MS);
   });
 }
 
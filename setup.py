@@ -11,7 +11,12 @@ setup(
     install_requires=[
         'requests',
         'beautifulsoup4',
+        'lxml',
     ],
+    extras_require={
+        'zstd': ['zstandard'],
+        'analytics': ['numpy'],
+    },
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',
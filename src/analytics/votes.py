@@ -0,0 +1,278 @@
+import math
+import re
+from functools import lru_cache
+
+_ANSWER_LETTERS = re.compile(r"^[A-Z]+\b")
+
+STAT_FIELDS = (
+    "bars",
+    "total_votes",
+    "consensus",
+    "community_answer",
+    "official_share",
+    "entropy",
+    "normalized_entropy",
+    "disagreement",
+    "score",
+)
+
+
+@lru_cache(maxsize=4096)
+def answer_letters(text):
+    """
+    Normalise an answer such as "BD", "DB" or a vote bar label such as "B (67%)"
+
+    Returns:
+        str: Sorted answer letters, the stripped text if it has none, or None
+    """
+    if text is None:
+        return None
+    text = text.strip()
+    match = _ANSWER_LETTERS.match(text)
+    return "".join(sorted(match.group(0))) if match else text
+
+
+def _bar_weights(bars):
+    """
+    Return the weight of each bar and the total vote count of a question.
+
+    Vote counts are used when every bar has one, else percentages; the total is
+    0 when counts are missing.
+    """
+    if all(votes is not None for _, votes, _ in bars):
+        weights = [float(votes) for _, votes, _ in bars]
+        return weights, int(sum(weights))
+    return [float(percentage or 0) for _, _, percentage in bars], 0
+
+
+class VoteDistributions:
+    """
+    Community vote distributions of many questions.
+
+    Each question contributes one row of bar weights, padded with zeros to the
+    widest question, together with the position of the bar matching its
+    official answer (-1 when no bar does) and its total vote count.
+    """
+
+    def __init__(self, distributions):
+        """
+        distributions: (exam, question_id, number, topic, correct_answer, bars)
+            tuples as returned by QuestionStore.vote_distributions
+        """
+        self.questions = []
+        self.weights = []
+        self.official = []
+        self.totals = []
+        self.labels = []
+        for exam, question_id, number, topic, correct_answer, bars in distributions:
+            if not bars:
+                continue
+            letters = [answer_letters(option) for option, _, _ in bars]
+            official = answer_letters(correct_answer)
+            weights, total = _bar_weights(bars)
+            self.questions.append(
+                {
+                    "exam": exam,
+                    "question_id": question_id,
+                    "number": number,
+                    "topic": topic,
+                    "correct_answer": correct_answer,
+                }
+            )
+            self.weights.append(weights)
+            self.labels.append(letters)
+            self.official.append(letters.index(official) if official in letters else -1)
+            self.totals.append(total)
+        self.width = max((len(weights) for weights in self.weights), default=0)
+
+    @classmethod
+    def from_store(cls, store, exam=None):
+        """Load the distributions of a QuestionStore, optionally of one exam"""
+        return cls(store.vote_distributions(exam))
+
+    def __len__(self):
+        return len(self.questions)
+
+
+def _numpy():
+    """Return the numpy module, or None if it is not installed"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def vote_statistics(distributions, use_numpy=None):
+    """
+    Compute per question vote statistics in batch
+
+    For every question:
+        consensus: share of the most voted bar
+        community_answer: letters of the most voted bar
+        official_share: share of the bar matching the official answer (0 if none)
+        entropy: Shannon entropy of the distribution in bits
+        normalized_entropy: entropy divided by its maximum, log2 of the bar count
+        disagreement: consensus - official_share, None without an official answer
+        score: disagreement * log2(2 + total votes), ranks likely wrong answers
+            backed by many votes first
+
+    Args:
+        distributions (VoteDistributions): Loaded distributions
+        use_numpy (bool): Force (True) or avoid (False) NumPy; by default it is
+            used when installed
+
+    Returns:
+        dict: Mapping of each STAT_FIELDS name to a list with one value per question
+
+    Raises:
+        ImportError: If use_numpy is True and NumPy is not installed
+    """
+    numpy = _numpy() if use_numpy is not False else None
+    if use_numpy and numpy is None:
+        raise ImportError("Vectorised vote analytics require NumPy: pip install numpy")
+    if numpy is not None and len(distributions):
+        stats = _vote_statistics_numpy(distributions, numpy)
+    else:
+        stats = _vote_statistics_python(distributions)
+    # Community answers are strings, picked from the labels by bar position
+    stats["community_answer"] = [
+        labels[top] for labels, top in zip(distributions.labels, stats.pop("top"))
+    ]
+    stats["bars"] = [len(weights) for weights in distributions.weights]
+    stats["total_votes"] = list(distributions.totals)
+    return stats
+
+
+def _vote_statistics_numpy(distributions, np):
+    count = len(distributions)
+    weights = np.zeros((count, distributions.width))
+    bar_counts = np.fromiter(
+        (len(row) for row in distributions.weights), dtype=np.int64, count=count
+    )
+    rows = np.repeat(np.arange(count), bar_counts)
+    columns = np.arange(bar_counts.sum()) - np.repeat(
+        np.cumsum(bar_counts) - bar_counts, bar_counts
+    )
+    weights[rows, columns] = np.fromiter(
+        (weight for row in distributions.weights for weight in row),
+        dtype=float,
+        count=int(bar_counts.sum()),
+    )
+
+    sums = weights.sum(axis=1)
+    shares = np.divide(
+        weights, sums[:, None], out=np.zeros_like(weights), where=sums[:, None] > 0
+    )
+    top = shares.argmax(axis=1)
+    consensus = shares.max(axis=1)
+    terms = np.zeros_like(shares)
+    np.log2(shares, out=terms, where=shares > 0)
+    entropy = -(shares * terms).sum(axis=1) + 0.0
+    max_entropy = np.log2(np.maximum(bar_counts, 1))
+    normalized_entropy = np.divide(
+        entropy, max_entropy, out=np.zeros_like(entropy), where=max_entropy > 0
+    )
+
+    official = np.asarray(distributions.official, dtype=np.int64)
+    official_share = np.where(
+        official >= 0, shares[np.arange(count), np.maximum(official, 0)], 0.0
+    )
+    disagreement = consensus - official_share
+    totals = np.asarray(distributions.totals, dtype=float)
+    score = disagreement * np.log2(2 + totals)
+
+    has_official = np.fromiter(
+        (question["correct_answer"] is not None for question in distributions.questions),
+        dtype=bool,
+        count=count,
+    )
+    return {
+        "top": top.tolist(),
+        "consensus": consensus.tolist(),
+        "official_share": official_share.tolist(),
+        "entropy": entropy.tolist(),
+        "normalized_entropy": normalized_entropy.tolist(),
+        "disagreement": [
+            value if known else None
+            for value, known in zip(disagreement.tolist(), has_official)
+        ],
+        "score": [
+            value if known else None for value, known in zip(score.tolist(), has_official)
+        ],
+    }
+
+
+def _vote_statistics_python(distributions):
+    stats = {
+        name: []
+        for name in (
+            "top",
+            "consensus",
+            "official_share",
+            "entropy",
+            "normalized_entropy",
+            "disagreement",
+            "score",
+        )
+    }
+    for question, weights, official, total in zip(
+        distributions.questions,
+        distributions.weights,
+        distributions.official,
+        distributions.totals,
+    ):
+        weight_sum = sum(weights)
+        shares = [weight / weight_sum if weight_sum > 0 else 0.0 for weight in weights]
+        top = max(range(len(shares)), key=lambda index: (shares[index], -index))
+        entropy = -sum(share * math.log2(share) for share in shares if share > 0) + 0.0
+        max_entropy = math.log2(len(shares))
+        official_share = shares[official] if official >= 0 else 0.0
+        disagreement = shares[top] - official_share
+        known = question["correct_answer"] is not None
+
+        stats["top"].append(top)
+        stats["consensus"].append(shares[top])
+        stats["official_share"].append(official_share)
+        stats["entropy"].append(entropy)
+        stats["normalized_entropy"].append(entropy / max_entropy if max_entropy > 0 else 0.0)
+        stats["disagreement"].append(disagreement if known else None)
+        stats["score"].append(disagreement * math.log2(2 + total) if known else None)
+    return stats
+
+
+def rank_disputed_answers(distributions, limit=20, use_numpy=None):
+    """
+    Rank the questions whose official answer most likely is wrong
+
+    Questions are ordered by score (see vote_statistics); only questions whose
+    community answer differs from the official one are kept.
+
+    Args:
+        distributions (VoteDistributions): Loaded distributions
+        limit (int): Maximum number of questions
+        use_numpy (bool): See vote_statistics
+
+    Returns:
+        list: Dicts with the exam, question_id, number, topic, correct_answer and
+            STAT_FIELDS of each question, highest score first
+    """
+    stats = vote_statistics(distributions, use_numpy)
+    ranked = [
+        index
+        for index, disagreement in enumerate(stats["disagreement"])
+        if disagreement is not None and disagreement > 0
+    ]
+    ranked.sort(
+        key=lambda index: (
+            -stats["score"][index],
+            distributions.questions[index]["question_id"],
+        )
+    )
+    return [
+        dict(
+            distributions.questions[index],
+            **{name: stats[name][index] for name in STAT_FIELDS},
+        )
+        for index in ranked[:limit]
+    ]
@@ -1,28 +1,824 @@
-from scrapers.html_scraper import HtmlScraper
-from parsers.html_parser import HtmlParser
+# Only lightweight modules are imported here: the scrapers, parsers, requests,
+# bs4, tqdm and the like are imported by the code paths that use them, so that
+# startup stays cheap (see benchmarks/import_budget.py)
+from parsers.backends import DEFAULT_BACKEND, PARSER_BACKENDS, PARSER_VERSION
 from store.data_store import DataStore
+from store.response_cache import DEFAULT_TTL
+from store.sinks import SINKS, get_sink
 from utils.file_utils import FileUtils
+
+# Imported through "src" like the parsers, so that both share one profiler
+from src.utils.profiling import profiler
+import argparse
+import json
 import os
-from tqdm import tqdm
 
 from rich.console import Console
-from rich.table import Table
-from rich.prompt import Prompt, IntPrompt
+from rich.prompt import Prompt
 from rich.panel import Panel
-from rich import box
 import re
 
 
 import warnings
-from urllib3.exceptions import InsecureRequestWarning
 
-warnings.simplefilter("ignore", InsecureRequestWarning)
+# Image downloads skip certificate verification; silence urllib3's
+# InsecureRequestWarning by its message, without importing urllib3 up front
+warnings.filterwarnings("ignore", message="Unverified HTTPS request")
 
 console = Console()
 
+DEFAULT_EXAM_URL = "https://www.examtopics.com/exams/microsoft/az-204/view/"
+
+
+def parse_args(argv=None):
+    """Parse the command line options"""
+    arg_parser = argparse.ArgumentParser(description="ExamTopics Data Miner")
+    arg_parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Serve discussion threads from the response cache only",
+    )
+    arg_parser.add_argument(
+        "--cache-ttl",
+        type=int,
+        default=DEFAULT_TTL,
+        help="Seconds a cached discussion thread stays fresh (default: one day)",
+    )
+    arg_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the discussion response cache",
+    )
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of processes used in folder mode (default: number of CPUs)",
+    )
+    arg_parser.add_argument(
+        "--parser",
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_BACKEND,
+        help=f"HTML parser backend (default: {DEFAULT_BACKEND})",
+    )
+    arg_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Also save the extracted question model as JSON next to the markdown",
+    )
+    arg_parser.add_argument(
+        "--sink",
+        choices=sorted(SINKS),
+        default="plain",
+        help="How outputs are written: plain files, gzip or zstd compressed files, "
+        "or a directory with one file per question (default: plain)",
+    )
+    arg_parser.add_argument(
+        "--db",
+        metavar="FILE",
+        help="Also insert or update the extracted questions in a SQLite question store",
+    )
+    arg_parser.add_argument(
+        "--analytics",
+        action="store_true",
+        help="Rank the questions of the --db question store whose official answer "
+        "the community vote disputes, then exit",
+    )
+    arg_parser.add_argument(
+        "--search",
+        metavar="QUERY",
+        help="List the indexed questions best matching every word of QUERY, then exit",
+    )
+    arg_parser.add_argument(
+        "--index",
+        metavar="FILE",
+        help="Full-text search index updated with every converted page and read by "
+        "--search (default: cache/search_index.sqlite3)",
+    )
+    arg_parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Do not add the converted questions to the search index",
+    )
+    arg_parser.add_argument(
+        "--exam",
+        metavar="KEY",
+        help="With --analytics or --search, only list questions of this exam code or title",
+    )
+    arg_parser.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="With --analytics or --search, number of questions listed (default: 20)",
+    )
+    arg_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="In folder mode, rebuild every file even if its input is unchanged",
+    )
+    arg_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Pick up an interrupted page or folder run from its checkpoint journal",
+    )
+    arg_parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print a table of the time and bytes spent in each stage",
+    )
+    arg_parser.add_argument(
+        "--timings-json",
+        metavar="FILE",
+        help="Write the per-stage time and bytes as JSON to FILE",
+    )
+    arg_parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="Profile the whole run with cProfile and dump the pstats to FILE "
+        "(implies --timings)",
+    )
+    arg_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Convert local HTML files one question at a time with bounded memory",
+    )
+    arg_parser.add_argument(
+        "--pages",
+        type=int,
+        metavar="N",
+        help="Scrape pages 1..N of the exam view URL in one browser session",
+    )
+    arg_parser.add_argument(
+        "--browsers",
+        type=int,
+        default=1,
+        help="Number of browsers scraping pages in parallel with --pages (default: 1)",
+    )
+    arg_parser.add_argument(
+        "--http",
+        action="store_true",
+        help="Scrape over plain HTTP, using the browser only for pages missing "
+        "question markup",
+    )
+    arg_parser.add_argument(
+        "--http-rate",
+        type=float,
+        metavar="N",
+        help="Requests per second sent to each host (default: 10)",
+    )
+    arg_parser.add_argument(
+        "--http-concurrency",
+        type=int,
+        metavar="N",
+        help="Requests in flight per host at the start; the limit then adapts "
+        "between 1 and 16 (default: 8)",
+    )
+    arg_parser.add_argument(
+        "--base-url",
+        metavar="URL",
+        help="With --http, fetch pages from this scheme://host instead, "
+        "e.g. a local stand-in server",
+    )
+    args = arg_parser.parse_args(argv)
+    if args.stream:
+        # The streaming path only renders markdown: it keeps no question
+        # records and no journal
+        unsupported = [
+            option
+            for option, value in (
+                ("--json", args.json),
+                ("--db", args.db),
+                ("--resume", args.resume),
+                ("--index", args.index),
+            )
+            if value
+        ]
+        if unsupported:
+            arg_parser.error(f"--stream cannot be combined with {', '.join(unsupported)}")
+    return args
+
+
+def create_html_parser(args, show_progress=True):
+    """Build an HtmlParser configured from the command line options"""
+    from parsers.html_parser import HtmlParser
+    from store.response_cache import ResponseCache
+
+    response_cache = None
+    if not args.no_cache:
+        cache_path = os.path.join(
+            FileUtils().get_cache_folder_path(), "responses.sqlite3"
+        )
+        response_cache = ResponseCache(cache_path, ttl=args.cache_ttl)
+    elif args.offline:
+        console.print(
+            "[yellow]--offline without a cache: no discussions will be included.[/yellow]"
+        )
+    return HtmlParser(
+        response_cache=response_cache,
+        offline=args.offline,
+        show_progress=show_progress,
+        backend=args.parser,
+    )
+
+
+# Parser owned by each folder-mode worker process
+_worker_parser = None
+
+
+def _init_folder_worker(args):
+    """Create the parser of a folder-mode worker process"""
+    global _worker_parser
+    _worker_parser = create_html_parser(args, show_progress=False)
+    profiler.enabled = timings_enabled(args)
+
+
+def _parse_folder_file(file_path, save_json=False, keep_model=False):
+    """
+    Parse one HTML file with the folder-mode parser.
+    Returns a dict mapping each output extension to its content, the markdown
+    as its list of rendered blocks, and the (ExamInfo, questions) model if
+    keep_model is set, else None.
+    """
+    html_content = DataStore.read_file(file_path)
+    exam_info, questions = _worker_parser.extract(html_content)
+    outputs = {".md": list(_worker_parser.renderer.iter_render(exam_info, questions))}
+    if save_json:
+        from renderers.json_renderer import JsonRenderer
+
+        outputs[".json"] = JsonRenderer().render(exam_info, questions)
+    return outputs, ((exam_info, questions) if keep_model else None)
+
+
+def _parse_folder_file_in_worker(file_path, save_json=False, keep_model=False):
+    """
+    Parse one HTML file in a folder-mode worker process.
+    Also returns the stage timings collected meanwhile, for the parent to merge.
+    """
+    profiler.reset()
+    outputs, model = _parse_folder_file(file_path, save_json, keep_model)
+    return outputs, model, profiler.summary()
+
+
+def process_folder(folder_path, output_folder, args):
+    """
+    Convert every changed HTML file of a folder to markdown.
+
+    A manifest in the output folder records the content hash, parser version and
+    outputs of each converted input; inputs that did not change since the last
+    run are skipped and changed ones have their outputs replaced in place.
+    Files are parsed in a pool of args.workers processes, each owning one parser,
+    while progress, failures and output writing are handled here in the parent.
+
+    Returns:
+        int: Number of files processed successfully
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from tqdm import tqdm
+    from utils.build_manifest import BuildManifest
+
+    all_html_files = sorted(
+        f for f in os.listdir(folder_path) if f.lower().endswith(".html")
+    )
+    file_utils = FileUtils()
+    manifest = BuildManifest(output_folder)
+    parser_version = f"{PARSER_VERSION}/{args.parser}"
+    if args.sink != "plain":
+        parser_version += f"/{args.sink}"
+    sink = get_sink(args.sink)
+    extensions = [".md", ".json"] if args.json else [".md"]
+    processed = 0
+    failures = []
+
+    # Files converted by an interrupted run of this folder, kept with --resume
+    journal = open_journal(
+        f"folder-{os.path.basename(os.path.abspath(folder_path))}",
+        f"{parser_version}:{os.path.abspath(folder_path)}",
+        args.resume,
+    )
+    finished = journal.completed("file")
+
+    file_hashes = {}
+    html_files = []
+    resumed = 0
+    for filename in all_html_files:
+        file_path = os.path.join(folder_path, filename)
+        file_hashes[filename] = BuildManifest.hash_file(file_path)
+        record = finished.get(filename)
+        if (
+            record is not None
+            and record["hash"] == file_hashes[filename]
+            and all(os.path.exists(path) for path in record["outputs"].values())
+        ):
+            resumed += 1
+        elif args.force or not manifest.is_up_to_date(
+            os.path.abspath(file_path), file_hashes[filename], parser_version, extensions
+        ):
+            html_files.append(filename)
+    skipped = len(all_html_files) - len(html_files) - resumed
+    if skipped:
+        console.print(f"[cyan]Skipping {skipped} unchanged HTML files.[/cyan]")
+    if resumed:
+        console.print(f"[cyan]Resuming: {resumed} HTML files already converted.[/cyan]")
+
+    question_store = DataStore.open_question_store(args.db) if args.db else None
+    search_index = open_search_index(args)
+    keep_model = question_store is not None or search_index is not None
+
+    def save_result(filename, outputs, model):
+        # Replace the outputs of this input in output_folder using FileUtils
+        if question_store is not None:
+            question_store.save_exam(*model)
+        output_paths = {}
+        for extension, content in outputs.items():
+            if extension == ".md":
+                # Written block by block, so the questions sink gets one file per question
+                output_paths[extension] = file_utils.save_output_stream(
+                    content,
+                    input_filename=filename,
+                    output_folder=output_folder,
+                    overwrite=True,
+                    sink=sink,
+                )
+                continue
+            output_paths[extension] = file_utils.save_output(
+                content,
+                input_filename=filename,
+                extension=extension,
+                output_folder=output_folder,
+                overwrite=True,
+                sink=sink,
+            )
+            console.print(
+                f"[green]Processed:[/green] {filename} -> {output_paths[extension]}"
+            )
+        input_name = os.path.abspath(os.path.join(folder_path, filename))
+        for output_path in output_paths.values():
+            for other in manifest.other_inputs(input_name, output_path):
+                console.print(
+                    f"[yellow]{output_path} replaces the output of {other}, "
+                    "which will be rebuilt on its next run.[/yellow]"
+                )
+        manifest.record(input_name, file_hashes[filename], parser_version, output_paths)
+        if search_index is not None:
+            search_index.add_questions(*model, source=output_paths[".md"])
+        journal.append("file", filename, hash=file_hashes[filename], outputs=output_paths)
+
+    workers = max(1, min(args.workers, len(html_files)))
+    if workers == 1:
+        _init_folder_worker(args)
+        for filename in tqdm(html_files, desc="Processing HTML files", unit="file"):
+            try:
+                outputs, model = _parse_folder_file(
+                    os.path.join(folder_path, filename), args.json, keep_model
+                )
+                save_result(filename, outputs, model)
+                processed += 1
+            except Exception as e:
+                failures.append((filename, e))
+                console.print(f"[red]Failed to process {filename}: {e}[/red]")
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_folder_worker, initargs=(args,)
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _parse_folder_file_in_worker,
+                    os.path.join(folder_path, filename),
+                    args.json,
+                    keep_model,
+                ): filename
+                for filename in html_files
+            }
+            for future in tqdm(
+                as_completed(futures),
+                total=len(futures),
+                desc=f"Processing HTML files ({workers} workers)",
+                unit="file",
+            ):
+                filename = futures[future]
+                try:
+                    outputs, model, timings = future.result()
+                    profiler.merge(timings)
+                    save_result(filename, outputs, model)
+                    processed += 1
+                except Exception as e:
+                    failures.append((filename, e))
+                    console.print(f"[red]Failed to process {filename}: {e}[/red]")
+
+    if question_store is not None:
+        question_store.close()
+    if search_index is not None:
+        search_index.close()
+
+    if failures:
+        journal.close()
+    else:
+        journal.discard()
+    if failures:
+        console.print(f"[bold red]{len(failures)} file(s) failed:[/bold red]")
+        for filename, error in failures:
+            console.print(f"[red]- {filename}: {error}[/red]")
+    return processed
+
+
+def scraped_filename(url):
+    """
+    Build the input filename of a scraped page from its URL
+
+    Examples:
+        https://www.examtopics.com/exams/microsoft/az-204/view/      -> az-204.html
+        https://www.examtopics.com/exams/microsoft/az-204/view/1     -> az-204-1.html
+        https://www.examtopics.com/exams/microsoft/az-204/view/2     -> az-204-2.html
+    """
+    match = re.search(r"/exams/[^/]+/(?P<exam>[^/]+)/view(?:/(?P<page>\d+))?", url)
+    if not match:
+        return "scraped_content.html"
+    exam = match.group("exam")
+    page = match.group("page")
+    if page:
+        return f"{exam}-{page}.html"
+    return f"{exam}.html"
+
+
+def open_journal(name, job, resume=False):
+    """Open the checkpoint journal of a job in the cache folder"""
+    from store.checkpoint_journal import CheckpointJournal
+
+    folder = os.path.join(FileUtils().get_cache_folder_path(), "checkpoints")
+    return CheckpointJournal(CheckpointJournal.path_for(folder, name), job, resume)
+
+
+def open_search_index(args):
+    """
+    Open the search index updated with the converted questions
+
+    Returns:
+        SearchIndex: Open index, to be closed by the caller, or None with
+            --no-index or when SQLite lacks full-text search
+    """
+    if args.no_index:
+        return None
+    try:
+        return DataStore.open_search_index(search_index_path(args))
+    except RuntimeError as e:
+        console.print(f"[yellow]Search index disabled: {e}[/yellow]")
+        return None
+
+
+def search_index_path(args):
+    """Return the path of the search index: --index, else in the cache folder"""
+    return args.index or os.path.join(
+        FileUtils().get_cache_folder_path(), "search_index.sqlite3"
+    )
+
+
+def convert_and_save(parser, html_content, input_filename, args):
+    """
+    Convert one HTML page and save its outputs to the output folder.
+
+    The markdown is written question by question as the cards are extracted.
+    Every rendered question is also recorded in a checkpoint journal, so that
+    after an interruption a rerun with --resume takes the finished questions
+    from the journal and only extracts the rest, and added to the search index.
+    The journal only holds the question records when the JSON output or the
+    question store need them. Otherwise it marks how far the search index got,
+    and a resumed run extracts the questions after that mark again.
+
+    Returns:
+        str: Path of the markdown output
+    """
+    import hashlib
+    from itertools import islice
+
+    from src.models.question import Question
+
+    # JSON and the question store need every record once the page is done
+    kept = [] if args.json or args.db else None
+    journal = open_journal(
+        f"page-{os.path.basename(input_filename)}",
+        f"{PARSER_VERSION}/{args.parser}:"
+        f"{hashlib.sha256(html_content.encode('utf-8')).hexdigest()}"
+        f"{'/records' if kept is not None else ''}",
+        args.resume,
+    )
+    # Questions are journaled in page order: resume after the leading run
+    resumed = 0
+    for record in journal.records("question"):
+        if record["key"] != resumed:
+            break
+        resumed += 1
+    search_index = open_search_index(args)
+    if resumed and search_index is not None and kept is None:
+        # Without their records, only the questions the index took can be skipped
+        resumed = min(
+            resumed,
+            max((record["key"] for record in journal.records("indexed")), default=0),
+        )
+    if resumed:
+        console.print(f"[cyan]Resuming after {resumed} journaled questions.[/cyan]")
+
+    exam_info, questions = parser.iter_extract(html_content, start=resumed)
+    renderer = parser.renderer
+    # The index takes the questions in batches as they stream by
+    index_writer = search_index.writer(exam_info) if search_index is not None else None
+
+    def blocks():
+        yield "\n".join(renderer.render_exam_info(exam_info))
+        for record in islice(journal.records("question"), resumed):
+            question = None
+            if "question" in record:
+                question = Question.from_dict(record["question"])
+                if kept is not None:
+                    kept.append(question)
+            if index_writer is not None:
+                if question is not None:
+                    index_writer.add(question)
+                else:
+                    index_writer.add_indexed(record["question_id"])
+            yield record["block"]
+        for position, question in enumerate(questions, resumed):
+            block = "\n".join(renderer.render_question(question))
+            if kept is not None:
+                journal.append(
+                    "question", position, block=block, question=question.to_dict()
+                )
+            else:
+                journal.append(
+                    "question", position, block=block, question_id=question.question_id
+                )
+            if kept is not None:
+                kept.append(question)
+            if index_writer is not None:
+                batches = index_writer.batches
+                index_writer.add(question)
+                if index_writer.batches != batches:
+                    journal.append("indexed", position + 1)
+            yield block
+
+    try:
+        file_utils = FileUtils()
+        sink = get_sink(args.sink)
+        output_path = file_utils.save_output_stream(
+            blocks(), input_filename=input_filename, sink=sink
+        )
+        if args.json:
+            from renderers.json_renderer import JsonRenderer
+
+            file_utils.save_output(
+                JsonRenderer().render(exam_info, kept),
+                input_filename=input_filename,
+                extension=".json",
+                sink=sink,
+            )
+        if args.db:
+            DataStore.save_questions(args.db, exam_info, kept)
+        if index_writer is not None:
+            index_writer.finish(output_path)
+    except BaseException:
+        journal.close()
+        raise
+    finally:
+        if search_index is not None:
+            search_index.close()
+    journal.discard()
+    return output_path
+
+
+def scrape_pages(view_url, args):
+    """
+    Scrape pages 1..args.pages of an exam (or view_url alone without --pages)
+    and convert each of them.
+
+    With --http the pages are fetched concurrently over HTTP. Otherwise they are
+    loaded by a single reused browser session, or by a pool of args.browsers
+    sessions; every browser is quit once the pages are loaded.
+    """
+    from scrapers.html_scraper import HtmlScraper, ScraperPool, exam_page_urls
+
+    urls = exam_page_urls(view_url, args.pages) if args.pages else [view_url]
+    if args.http:
+        from scrapers.http_scraper import HttpScraper
 
-def execute():
+        pages = HttpScraper(base_url=args.base_url).scrape_pages(urls)
+    elif args.browsers > 1:
+        with ScraperPool(args.browsers) as pool:
+            pages = pool.scrape_pages(urls)
+    else:
+        from tqdm import tqdm
+
+        with HtmlScraper() as scraper:
+            pages = list(
+                tqdm(
+                    scraper.scrape_pages(urls),
+                    total=len(urls),
+                    desc="Scraping pages",
+                    unit="page",
+                )
+            )
+
+    parser = create_html_parser(args)
+    failed = 0
+    for url, html_content in pages:
+        input_filename = scraped_filename(url)
+        if not html_content:
+            console.print(f"[red]No HTML content to parse for {url}[/red]")
+            failed += 1
+            continue
+        try:
+            convert_and_save(parser, html_content, input_filename, args)
+        except Exception as e:
+            console.print(f"[red]Failed to process {url}: {e}[/red]")
+            failed += 1
+            continue
+        console.print(f"[green]Processed:[/green] {url} -> {input_filename}")
+    summary = f"Scraped {len(pages) - failed} pages."
+    if failed:
+        summary += f" {failed} failed."
+    console.print(f"[bold blue]{summary}[/bold blue]")
+
+
+def configure_http_client(args):
+    """Apply the --http-rate and --http-concurrency limits to the shared HTTP client"""
+    if args.http_rate is None and args.http_concurrency is None:
+        return
+    from src.utils.http_client import configure_client
+
+    limits = {}
+    if args.http_rate is not None:
+        limits["rate"] = args.http_rate
+    if args.http_concurrency is not None:
+        limits["concurrency"] = args.http_concurrency
+    configure_client(**limits)
+
+
+def timings_enabled(args):
+    """Tell whether the per-stage timers must run"""
+    return bool(args.timings or args.timings_json or args.profile)
+
+
+def print_timings(summary):
+    """Print the per-stage time and bytes as a table"""
+    from rich import box
+    from rich.table import Table
+
+    table = Table(title="Stage timings", box=box.SIMPLE)
+    table.add_column("Stage", style="cyan")
+    table.add_column("Calls", justify="right")
+    table.add_column("Seconds", justify="right", style="green")
+    table.add_column("Bytes", justify="right", style="yellow")
+    for name, stats in sorted(
+        summary.items(), key=lambda item: item[1]["seconds"], reverse=True
+    ):
+        table.add_row(
+            name,
+            str(stats["calls"]),
+            f"{stats['seconds']:.3f}",
+            f"{stats['bytes']:,}" if stats["bytes"] else "",
+        )
+    console.print(table)
+
+
+def print_vote_analytics(args):
+    """Print the questions of the question store with the most disputed answers"""
+    import time
+
+    from analytics.votes import VoteDistributions, rank_disputed_answers
+    from rich import box
+    from rich.table import Table
+
+    if not os.path.exists(args.db):
+        console.print(f"[bold red]Question store not found:[/bold red] {args.db}")
+        return
+    start = time.perf_counter()
+    with DataStore.open_question_store(args.db) as store:
+        distributions = VoteDistributions.from_store(store, args.exam)
+    ranked = rank_disputed_answers(distributions, args.top)
+    elapsed = time.perf_counter() - start
+
+    table = Table(title="Disputed answers", box=box.SIMPLE)
+    table.add_column("Exam", style="cyan")
+    table.add_column("Question", no_wrap=True)
+    table.add_column("Topic", no_wrap=True)
+    table.add_column("Official", justify="center")
+    table.add_column("Community", justify="center", style="yellow")
+    table.add_column("Top %", justify="right")
+    table.add_column("Official %", justify="right")
+    table.add_column("Entropy", justify="right")
+    table.add_column("Votes", justify="right")
+    table.add_column("Score", justify="right", style="green")
+    for row in ranked:
+        table.add_row(
+            row["exam"],
+            row["number"],
+            row["topic"],
+            row["correct_answer"],
+            row["community_answer"],
+            f"{row['consensus']:.0%}",
+            f"{row['official_share']:.0%}",
+            f"{row['normalized_entropy']:.2f}",
+            str(row["total_votes"] or "?"),
+            f"{row['score']:.2f}",
+        )
+    console.print(table)
+    console.print(
+        f"[cyan]{len(distributions)} questions with votes analysed in {elapsed:.3f}s.[/cyan]"
+    )
+
+
+def print_search_results(args):
+    """Print the indexed questions best matching the --search query"""
+    import time
+
+    from rich import box
+    from rich.markup import escape
+    from rich.table import Table
+
+    path = search_index_path(args)
+    if not os.path.exists(path):
+        console.print(f"[bold red]Search index not found:[/bold red] {path}")
+        return
+    try:
+        search_index = DataStore.open_search_index(path)
+    except RuntimeError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        return
+    with search_index:
+        start = time.perf_counter()
+        results = search_index.search(args.search, args.exam, args.top)
+        elapsed = time.perf_counter() - start
+        indexed = search_index.count()
+
+    table = Table(title=f"Questions matching {args.search!r}", box=box.SIMPLE)
+    table.add_column("Exam", style="cyan")
+    table.add_column("Question", no_wrap=True)
+    table.add_column("Topic", no_wrap=True)
+    table.add_column("ID", style="magenta")
+    table.add_column("Match")
+    table.add_column("Output", style="yellow")
+    table.add_column("Score", justify="right", style="green")
+    for row in results:
+        table.add_row(
+            row["exam"],
+            row["number"],
+            row["topic"],
+            row["question_id"],
+            escape(" ".join(row["snippet"].split())),
+            os.path.relpath(row["source"]) if row["source"] else "",
+            f"{row['score']:.2f}",
+        )
+    console.print(table)
+    console.print(
+        f"[cyan]{len(results)} of {indexed} indexed questions in "
+        f"{elapsed * 1000:.1f} ms.[/cyan]"
+    )
+
+
+def execute(argv=None):
     """Main command line interface execution function"""
+    args = parse_args(argv)
+    if args.search:
+        print_search_results(args)
+        return
+    if args.analytics:
+        if not args.db:
+            console.print("[bold red]--analytics needs a question store: --db FILE[/bold red]")
+            return
+        print_vote_analytics(args)
+        return
+    try:
+        get_sink(args.sink)
+    except ImportError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        return
+    configure_http_client(args)
+    profiler.enabled = timings_enabled(args)
+    run_profile = None
+    if args.profile:
+        import cProfile
+
+        run_profile = cProfile.Profile()
+
+    if run_profile:
+        run_profile.enable()
+    try:
+        _execute(args)
+    finally:
+        if run_profile:
+            run_profile.disable()
+            run_profile.dump_stats(args.profile)
+            console.print(f"[cyan]cProfile stats written to {args.profile}[/cyan]")
+        if profiler.enabled:
+            summary = profiler.summary()
+            if args.timings or args.profile:
+                print_timings(summary)
+            if args.timings_json:
+                with open(args.timings_json, "w", encoding="utf-8") as file:
+                    json.dump(summary, file, indent=2)
+                console.print(f"[cyan]Stage timings written to {args.timings_json}[/cyan]")
+
+
+def _execute(args):
+    """Run the interactive flow with the parsed command line options"""
     console.print(Panel("[bold cyan]ExamTopics Data Miner[/bold cyan]", expand=False))
     console.print("[bold]Choose input source:[/bold]")
     console.print("[green]1.[/green] URL (web scraping)")
@@ -33,28 +829,31 @@ def execute():
     html_content = None
     input_filename = None
 
+    if choice == "1" and args.http:
+        url = Prompt.ask("Enter the URL to scrape", default=DEFAULT_EXAM_URL)
+        scrape_pages(url, args)
+        return
     if choice == "1":
+        from rich import box
+        from rich.table import Table
+        from scrapers.html_scraper import HtmlScraper
+
         scraper = HtmlScraper()
         try:
-            # Optional: Print ChromeDriver and Chrome versions for debugging
-            try:
-                from selenium import webdriver  # type: ignore
-
-                driver = webdriver.Chrome()
-                console.print(
-                    f"[cyan]Chrome version:[/cyan] {driver.capabilities.get('browserVersion')}"
-                )
-                console.print(
-                    f"[cyan]ChromeDriver version:[/cyan] {driver.capabilities.get('chrome', {}).get('chromedriverVersion')}"
-                )
-                driver.quit()
-            except Exception as version_exc:
-                console.print(
-                    f"[yellow]Could not determine Chrome/ChromeDriver version:[/yellow] {version_exc}"
-                )
+            # Print browser and driver versions for debugging, without a browser
+            version_info = scraper.get_version_info()
+            console.print(
+                f"[cyan]{version_info['browser'].capitalize()} version:[/cyan] "
+                f"{version_info['browser_version'] or 'unknown'}"
+            )
+            console.print(
+                f"[cyan]Driver version:[/cyan] "
+                f"{version_info['driver_version'] or 'not resolved yet'}"
+            )
 
-            profiles = scraper.get_chrome_profiles_info()
             selected_profile = None
+            # --pages scrapes with fresh sessions: no profile to ask for
+            profiles = [] if args.pages else scraper.get_chrome_profiles_info()
             if profiles:
                 table = Table(title="Available Chrome Profiles", box=box.SIMPLE)
                 table.add_column("No.", style="cyan", justify="right")
@@ -77,31 +876,17 @@ def execute():
                     console.print("[red]Invalid selection, using first profile.[/red]")
                     selected_profile = profiles[0]["profile"]
                 console.print("\n---\n")
-            else:
+            elif not args.pages:
                 console.print("[yellow]No Chrome profiles found.[/yellow]")
             url = Prompt.ask(
                 "Enter the URL to scrape",
-                default="https://www.examtopics.com/exams/microsoft/az-204/view/",
+                default=DEFAULT_EXAM_URL,
             )
+            if args.pages:
+                scrape_pages(url, args)
+                return
             html_content = scraper.scrape(url, profile_dir=selected_profile)
-            # Build filename based on URL format
-            # Examples:
-            # https://www.examtopics.com/exams/microsoft/az-204/view/      -> az-204.html
-            # https://www.examtopics.com/exams/microsoft/az-204/view/1     -> az-204-1.html
-            # https://www.examtopics.com/exams/microsoft/az-204/view/2     -> az-204-2.html
-            # https://www.examtopics.com/exams/microsoft/az-204/view/3     -> az-204-3.html
-            match = re.search(
-                r"/exams/[^/]+/(?P<exam>[^/]+)/view(?:/(?P<page>\d+))?", url
-            )
-            if match:
-                exam = match.group("exam")
-                page = match.group("page")
-                if page:
-                    input_filename = f"{exam}-{page}.html"
-                else:
-                    input_filename = f"{exam}.html"
-            else:
-                input_filename = "scraped_content.html"
+            input_filename = scraped_filename(url)
         except Exception as e:
             console.print(
                 "[bold red]Error during Chrome profile selection or scraping:[/bold red]"
@@ -120,6 +905,22 @@ def execute():
     elif choice == "2":
         file_path = Prompt.ask("Enter path to HTML file", default="data/sample.html")
         input_filename = file_path
+        if args.stream:
+            # Stream straight from the file to the output, question by question
+            if not args.no_index:
+                console.print(
+                    "[yellow]--stream does not update the search index.[/yellow]"
+                )
+            parser = create_html_parser(args)
+            try:
+                FileUtils().save_output_stream(
+                    parser.iter_parse_file(file_path),
+                    input_filename=input_filename,
+                    sink=get_sink(args.sink),
+                )
+            except Exception as e:
+                console.print(f"[bold red]Error processing file:[/bold red] {e}")
+            return
         try:
             html_content = DataStore.read_file(file_path)
         except Exception as e:
@@ -133,32 +934,9 @@ def execute():
             console.print(f"[bold red]Folder not found:[/bold red] {folder_path}")
             return
 
-        output_base = "output"
-        # Use the name of the input directory (not just the last folder)
-        input_dir_name = os.path.basename(os.path.normpath(folder_path))
-        output_folder = os.path.join(output_base, input_dir_name)
-        os.makedirs(output_folder, exist_ok=True)
+        output_folder = FileUtils().get_output_folder_path()
 
-        parser = HtmlParser()
-        processed = 0
-        html_files = [f for f in os.listdir(folder_path) if f.lower().endswith(".html")]
-        for filename in tqdm(html_files, desc="Processing HTML files", unit="file"):
-            file_path = os.path.join(folder_path, filename)
-            try:
-                html_content = DataStore.read_file(file_path)
-                data = parser.parse(
-                    html_content, save_output=False, input_filename=filename
-                )
-                # Save result as .md in output_folder using FileUtils
-                file_utils = FileUtils()
-                output_file = os.path.join(
-                    output_folder, f"{os.path.splitext(filename)[0]}.md"
-                )
-                file_utils.save_output(data, input_filename=output_file)
-                processed += 1
-                console.print(f"[green]Processed:[/green] {filename} -> {output_file}")
-            except Exception as e:
-                console.print(f"[red]Failed to process {filename}: {e}[/red]")
+        processed = process_folder(folder_path, output_folder, args)
         console.print(f"[bold blue]Processed {processed} HTML files.[/bold blue]")
         console.print(f"[bold green]Results saved in:[/bold green] {output_folder}")
         return
@@ -172,13 +950,11 @@ def execute():
 
     console.print(f"[bold blue]Input filename:[/bold blue] {input_filename}")
 
-    parser = HtmlParser()
-    data = parser.parse(html_content, save_output=False, input_filename=input_filename)
-
+    parser = create_html_parser(args)
     # Save output for single file/URL
-    file_utils = FileUtils()
-    file_utils.save_output(data, input_filename=input_filename)
-    console.print(f"[green]Saved output to output folder.[/green]")
-
-    console.print(Panel("[bold green]Extracted Data:[/bold green]", expand=False))
-    console.print(data)
+    try:
+        output_path = convert_and_save(parser, html_content, input_filename, args)
+    except Exception as e:
+        console.print(f"[bold red]Error saving output:[/bold red] {e}")
+        return
+    console.print(f"[green]Saved output to {output_path}.[/green]")
@@ -1,23 +1,241 @@
+import json
 import os
+import re
+from collections import OrderedDict
 
+# Bytes copied at a time from a page file into the merged file
+CHUNK_SIZE = 64 * 1024
+# Page files kept open at once while questions are copied in sorted order
+MAX_OPEN_FILES = 16
 
-def merge_markdown_files(output_folder="output", merged_filename="merged_output.md"):
-    md_files = [f for f in os.listdir(output_folder) if f.endswith(".md")]
-    md_files = sorted(md_files)  # Ensure files are ordered by name
+# Question heading written by MarkdownRenderer: "## <number> (<topic>)"
+_HEADING_PATTERN = re.compile(rb"^## (?P<number>.+?) \((?P<topic>[^()]*)\)\s*$")
+_QUESTION_ID_PATTERN = re.compile(rb"^\*Question ID: (?P<id>[^*]+)\*")
+_NUMBER_PATTERN = re.compile(r"\d+")
 
+
+def natural_sort_key(name):
+    """Sort key ordering embedded numbers numerically (az-204-2 before az-204-10)"""
+    return [
+        int(token) if token.isdigit() else token.lower()
+        for token in re.split(r"(\d+)", name)
+    ]
+
+
+class _OpenFiles:
+    """The most recently used page files, kept open up to MAX_OPEN_FILES"""
+
+    def __init__(self, folder, limit=MAX_OPEN_FILES):
+        self.folder = folder
+        self.limit = limit
+        self._files = OrderedDict()
+
+    def get(self, name):
+        file = self._files.get(name)
+        if file is not None:
+            self._files.move_to_end(name)
+            return file
+        if len(self._files) >= self.limit:
+            self._files.popitem(last=False)[1].close()
+        file = self._files[name] = open(os.path.join(self.folder, name), "rb")
+        return file
+
+    def close(self):
+        for file in self._files.values():
+            file.close()
+        self._files.clear()
+
+
+def _number_of(text):
+    """Return the first number in text, or None"""
+    match = _NUMBER_PATTERN.search(text or "")
+    return int(match.group(0)) if match else None
+
+
+def scan_markdown_file(file_path):
+    """
+    Locate the exam header and the question blocks of a rendered markdown file
+    without loading it.
+
+    A question starts at a heading in the format of MarkdownRenderer that
+    follows the "---" separator closing the exam header or the previous
+    question, so "## " lines inside question text or comments are not taken
+    for headings.
+
+    Returns:
+        tuple: (title, header_end, questions) where title is the "# " line of the
+            exam header, header_end the byte offset of the first question and
+            questions a list of dicts with number, topic, question_id and the
+            start and end byte offsets of each question block
+    """
+    title = None
+    header_end = None
+    questions = []
+    offset = 0
+    # The two lines before the current one
+    previous = (None, None)
+    with open(file_path, "rb") as file:
+        for line in file:
+            heading = (
+                previous[0] is not None
+                and previous[0].rstrip(b"\r\n") == b"---"
+                and not previous[1].strip()
+                and _HEADING_PATTERN.match(line)
+            )
+            previous = (previous[1], line)
+            if heading:
+                if questions:
+                    questions[-1]["end"] = offset
+                else:
+                    header_end = offset
+                questions.append(
+                    {
+                        "number": heading.group("number").decode("utf-8").strip(),
+                        "topic": (heading.group("topic") or b"").decode("utf-8"),
+                        "question_id": None,
+                        "start": offset,
+                        "end": None,
+                    }
+                )
+            elif questions:
+                question_id = _QUESTION_ID_PATTERN.match(line)
+                if question_id and questions[-1]["question_id"] is None:
+                    questions[-1]["question_id"] = (
+                        question_id.group("id").decode("utf-8").strip()
+                    )
+            elif title is None and line.startswith(b"# "):
+                title = line[2:].decode("utf-8").strip()
+            offset += len(line)
+    if questions:
+        questions[-1]["end"] = offset
+    else:
+        header_end = offset
+    return title, header_end, questions
+
+
+def _copy_range(source, destination, start, end):
+    """Copy bytes [start, end) of the source file in chunks"""
+    source.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = source.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        destination.write(chunk)
+        remaining -= len(chunk)
+
+
+def merge_markdown_files(
+    output_folder="output", merged_filename="merged_output.md", index_filename=None
+):
+    """
+    Merge the markdown files of a folder into one file, question by question.
+
+    Files are grouped by exam title, pages are taken in natural order and each
+    exam keeps the header of its first page followed by its questions sorted by
+    topic and question number. A question whose Question ID was already written
+    is dropped. Only byte offsets are kept in memory: question blocks are copied
+    from the page files in chunks.
+
+    A JSON index next to the merged file maps every question to the byte offset
+    and length of its block, so readers can seek straight to it.
+
+    Args:
+        output_folder (str): Folder holding the markdown files
+        merged_filename (str): Name of the merged file, inside output_folder
+        index_filename (str): Name of the index file (default: <merged>.index.json)
+
+    Returns:
+        str: Path to the merged file
+    """
+    if index_filename is None:
+        index_filename = os.path.splitext(merged_filename)[0] + ".index.json"
+    md_files = sorted(
+        (
+            f
+            for f in os.listdir(output_folder)
+            if f.endswith(".md") and f != merged_filename
+        ),
+        key=natural_sort_key,
+    )
+
+    # First pass: locate the questions of every file, grouped by exam
+    exams = {}
+    for page_index, fname in enumerate(md_files):
+        file_path = os.path.join(output_folder, fname)
+        title, header_end, questions = scan_markdown_file(file_path)
+        exam = exams.setdefault(title, {"header": (file_path, header_end), "blocks": []})
+        for question in questions:
+            question["source"] = fname
+            question["sort_key"] = (
+                _number_of(question["topic"]) or 0,
+                _number_of(question["number"]) or 0,
+                page_index,
+                question["start"],
+            )
+            exam["blocks"].append(question)
+
+    # Imported here: run as a script, the project root is on sys.path only from
+    # the __main__ block below
+    from src.utils.file_utils import atomic_write
+
+    # Second pass: copy the header and the unique questions of each exam
     merged_path = os.path.join(output_folder, merged_filename)
-    with open(merged_path, "w", encoding="utf-8") as outfile:
-        for fname in md_files:
-            file_path = os.path.join(output_folder, fname)
-            with open(file_path, "r", encoding="utf-8") as infile:
-                outfile.write(
-                    f"# {fname}\n\n"
-                )  # Optional: add filename as section header
-                outfile.write(infile.read())
-                outfile.write("\n\n")
+    seen_ids = set()
+    index = []
+    duplicates = 0
+    # The sort interleaves pages: keep the recently read ones open
+    sources = _OpenFiles(output_folder)
+    try:
+        with atomic_write(merged_path) as outfile:
+            for exam in exams.values():
+                header_path, header_end = exam["header"]
+                with open(header_path, "rb") as infile:
+                    _copy_range(infile, outfile, 0, header_end)
+                exam["blocks"].sort(key=lambda question: question["sort_key"])
+                for question in exam["blocks"]:
+                    question_id = question["question_id"]
+                    if question_id is not None:
+                        if question_id in seen_ids:
+                            duplicates += 1
+                            continue
+                        seen_ids.add(question_id)
+                    offset = outfile.tell()
+                    _copy_range(
+                        sources.get(question["source"]),
+                        outfile,
+                        question["start"],
+                        question["end"],
+                    )
+                    index.append(
+                        {
+                            "question_id": question_id,
+                            "number": question["number"],
+                            "topic": question["topic"],
+                            "source": question["source"],
+                            "offset": offset,
+                            "length": outfile.tell() - offset,
+                        }
+                    )
+    finally:
+        sources.close()
 
-    print(f"Merged {len(md_files)} files into {merged_path}")
+    with atomic_write(
+        os.path.join(output_folder, index_filename), "w", encoding="utf-8"
+    ) as file:
+        json.dump({"merged_file": merged_filename, "questions": index}, file, indent=2)
+
+    print(
+        f"Merged {len(md_files)} files into {merged_path} "
+        f"({len(index)} questions, {duplicates} duplicates dropped)"
+    )
+    return merged_path
 
 
 if __name__ == "__main__":
+    import sys
+
+    # Add the project root directory to Python path, as src/main.py does
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
     merge_markdown_files()
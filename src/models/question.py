@@ -0,0 +1,196 @@
+class Image:
+    """An image downloaded from a question, referenced by its path relative to the output"""
+
+    __slots__ = ("alt", "path")
+
+    def __init__(self, alt, path):
+        self.alt = alt
+        self.path = path
+
+    def to_dict(self):
+        return {"alt": self.alt, "path": self.path}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["alt"], data["path"])
+
+
+class Choice:
+    """One answer choice of a question"""
+
+    __slots__ = ("letter", "text", "is_correct", "images")
+
+    def __init__(self, letter, text, is_correct=False, images=None):
+        self.letter = letter
+        self.text = text
+        self.is_correct = is_correct
+        self.images = images if images is not None else []
+
+    def to_dict(self):
+        return {
+            "letter": self.letter,
+            "text": self.text,
+            "is_correct": self.is_correct,
+            "images": [image.to_dict() for image in self.images],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["letter"],
+            data["text"],
+            data["is_correct"],
+            [Image.from_dict(image) for image in data["images"]],
+        )
+
+
+class VoteBar:
+    """
+    One bar of the community vote distribution.
+    votes and percentage are None when the page does not provide them.
+    """
+
+    __slots__ = ("option", "votes", "percentage")
+
+    def __init__(self, option, votes=None, percentage=None):
+        self.option = option
+        self.votes = votes
+        self.percentage = percentage
+
+    def to_dict(self):
+        return {"option": self.option, "votes": self.votes, "percentage": self.percentage}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["option"], data["votes"], data["percentage"])
+
+
+class Comment:
+    """A discussion comment of a question"""
+
+    __slots__ = ("author", "votes", "content")
+
+    def __init__(self, author, votes, content):
+        self.author = author
+        self.votes = votes
+        self.content = content
+
+    def to_dict(self):
+        return {"author": self.author, "votes": self.votes, "content": self.content}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["author"], data["votes"], data["content"])
+
+
+class Question:
+    """
+    A question card extracted from an exam page.
+
+    None marks a section that is missing from the card, so that renderers can
+    tell it apart from a section that is present but empty:
+    number is None without a card header, votes is None without a voting summary.
+    """
+
+    __slots__ = (
+        "number",
+        "topic",
+        "question_id",
+        "text",
+        "images",
+        "choices",
+        "has_answer",
+        "correct_answer",
+        "answer_images",
+        "votes",
+        "comments",
+    )
+
+    def __init__(
+        self,
+        number=None,
+        topic="",
+        question_id=None,
+        text="",
+        images=None,
+        choices=None,
+        has_answer=False,
+        correct_answer=None,
+        answer_images=None,
+        votes=None,
+        comments=None,
+    ):
+        self.number = number
+        self.topic = topic
+        self.question_id = question_id
+        self.text = text
+        self.images = images if images is not None else []
+        self.choices = choices if choices is not None else []
+        self.has_answer = has_answer
+        self.correct_answer = correct_answer
+        self.answer_images = answer_images if answer_images is not None else []
+        self.votes = votes
+        self.comments = comments if comments is not None else []
+
+    def to_dict(self):
+        return {
+            "number": self.number,
+            "topic": self.topic,
+            "question_id": self.question_id,
+            "text": self.text,
+            "images": [image.to_dict() for image in self.images],
+            "choices": [choice.to_dict() for choice in self.choices],
+            "has_answer": self.has_answer,
+            "correct_answer": self.correct_answer,
+            "answer_images": [image.to_dict() for image in self.answer_images],
+            "votes": (
+                [bar.to_dict() for bar in self.votes] if self.votes is not None else None
+            ),
+            "comments": [comment.to_dict() for comment in self.comments],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            number=data["number"],
+            topic=data["topic"],
+            question_id=data["question_id"],
+            text=data["text"],
+            images=[Image.from_dict(image) for image in data["images"]],
+            choices=[Choice.from_dict(choice) for choice in data["choices"]],
+            has_answer=data["has_answer"],
+            correct_answer=data["correct_answer"],
+            answer_images=[Image.from_dict(image) for image in data["answer_images"]],
+            votes=(
+                [VoteBar.from_dict(bar) for bar in data["votes"]]
+                if data["votes"] is not None
+                else None
+            ),
+            comments=[Comment.from_dict(comment) for comment in data["comments"]],
+        )
+
+
+class ExamInfo:
+    """
+    Exam information from the page header.
+    title and last_updated are None when the page does not provide them;
+    details keeps the remaining header items in page order.
+    """
+
+    __slots__ = ("title", "last_updated", "details")
+
+    def __init__(self, title=None, last_updated=None, details=None):
+        self.title = title
+        self.last_updated = last_updated
+        self.details = details if details is not None else {}
+
+    def to_dict(self):
+        return {
+            "title": self.title,
+            "last_updated": self.last_updated,
+            "details": dict(self.details),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["title"], data["last_updated"], dict(data["details"]))
@@ -0,0 +1,9 @@
+# Parser settings needed by the command line without importing the parsers
+
+# Version of the extraction and rendering logic, bump it whenever the output
+# changes so that incremental folder rebuilds convert every file again
+PARSER_VERSION = "1"
+
+# Tree builders supported by BeautifulSoup, fastest first
+PARSER_BACKENDS = ("lxml", "html5lib", "html.parser")
+DEFAULT_BACKEND = "lxml"
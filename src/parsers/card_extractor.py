@@ -0,0 +1,368 @@
+import re
+from functools import lru_cache
+
+from bs4 import Tag
+from src.models.question import Choice, Comment, Question, VoteBar
+from src.utils.profiling import profiler
+
+# Roles of the card elements the extractor needs, by tag name and CSS class
+HEADER = "header"
+TOPIC = "topic"
+BODY = "body"
+TEXT = "text"
+CHOICES = "choices"
+CHOICE = "choice"
+LETTER = "letter"
+CORRECT = "correct"
+VOTE_SUMMARY = "vote_summary"
+VOTE_DISTRIBUTION = "vote_distribution"
+VOTE_BAR = "vote_bar"
+
+ROLE_TABLE = {
+    "div": {
+        "card-header": HEADER,
+        "card-body": BODY,
+        "question-choices-container": CHOICES,
+        "voting-summary": VOTE_SUMMARY,
+        "vote-distribution-bar": VOTE_DISTRIBUTION,
+        "vote-bar": VOTE_BAR,
+    },
+    "span": {
+        "question-title-topic": TOPIC,
+        "multi-choice-letter": LETTER,
+        "correct-answer": CORRECT,
+    },
+    "p": {"card-text": TEXT},
+    "li": {"multi-choice-item": CHOICE},
+}
+# Classes that, together with "card-text", mark the correct answer paragraph
+ANSWER_CLASS = "question-answer"
+
+MOST_VOTED_PATTERN = re.compile(r"Most Voted\s*$")
+WIDTH_PATTERN = re.compile(r"width:\s*(\d+)%")
+VOTE_COUNT_PATTERN = re.compile(r"(\d+)\s*vote")
+
+
+@lru_cache(maxsize=None)
+def _letter_pattern(letter):
+    """Compiled pattern stripping a choice letter, e.g. "A." from "A. Use option A" """
+    return re.compile(rf"^{letter}\s*")
+
+
+class _Scope:
+    """Enclosing elements of the node being walked"""
+
+    __slots__ = (
+        "header",
+        "body",
+        "choices",
+        "choice",
+        "answer",
+        "vote",
+        "distribution",
+        "image_lists",
+    )
+
+    def __init__(self):
+        self.header = False
+        self.body = False
+        self.choices = False
+        self.choice = None
+        self.answer = False
+        self.vote = None
+        self.distribution = None
+        self.image_lists = ()
+
+    def copy(self):
+        scope = _Scope.__new__(_Scope)
+        scope.header = self.header
+        scope.body = self.body
+        scope.choices = self.choices
+        scope.choice = self.choice
+        scope.answer = self.answer
+        scope.vote = self.vote
+        scope.distribution = self.distribution
+        scope.image_lists = self.image_lists
+        return scope
+
+
+class CardIndex:
+    """
+    Elements of a question card located by a single walk of its subtree.
+
+    Each element is the one the legacy QuestionProcessor finds with its
+    find()/find_all() scans: the first card header, the first card body, the
+    first "card-text" paragraph of the body, and so on.
+    """
+
+    __slots__ = (
+        "header",
+        "topic",
+        "body",
+        "text",
+        "text_images",
+        "choices_container",
+        "choices",
+        "answer",
+        "answer_images",
+        "correct",
+        "answer_vote",
+        "votes",
+        "images",
+    )
+
+    def __init__(self):
+        self.header = None
+        self.topic = None
+        self.body = None
+        self.text = None
+        self.text_images = []
+        self.choices_container = None
+        # [li element, letter span, images] of each choice, in page order
+        self.choices = []
+        self.answer = None
+        self.answer_images = []
+        self.correct = None
+        # Vote summary inside the answer paragraph
+        self.answer_vote = None
+        # {"distribution": first distribution bar, "bars": its vote bars} of
+        # every vote summary in the body, keyed by id() of the summary element
+        self.votes = {}
+        # Every img of the card, for prefetching
+        self.images = []
+
+    @property
+    def question_id(self):
+        return self.body.get("data-id") if self.body is not None else None
+
+
+class CardExtractor:
+    """
+    Single-pass extraction of question cards into Question records.
+
+    A card is walked once; every element is dispatched on ROLE_TABLE by tag name
+    and class and recorded in a CardIndex, which the extraction then reads
+    instead of scanning the card again. The records are identical to the ones
+    built by QuestionProcessor's per-section methods.
+    """
+
+    def __init__(self, image_handler):
+        self.image_handler = image_handler
+
+    def index(self, card):
+        """Walk a card once and return its CardIndex"""
+        card_index = CardIndex()
+        self._walk(card, card_index, _Scope())
+        return card_index
+
+    def _walk(self, element, card_index, scope):
+        for child in element.contents:
+            if not isinstance(child, Tag):
+                continue
+            name = child.name
+            inner = scope
+            if name == "img":
+                card_index.images.append(child)
+                for images in scope.image_lists:
+                    images.append(child)
+            else:
+                roles = ROLE_TABLE.get(name)
+                if roles is not None:
+                    classes = child.attrs.get("class")
+                    if classes:
+                        if isinstance(classes, str):
+                            classes = classes.split()
+                        for css_class in classes:
+                            role = roles.get(css_class)
+                            if role is not None:
+                                inner = self._enter(
+                                    child, role, classes, card_index, scope, inner
+                                )
+            if child.contents:
+                self._walk(child, card_index, inner)
+
+    @staticmethod
+    def _enter(element, role, classes, card_index, scope, inner):
+        """Record an element with a role and return the scope of its subtree"""
+        if role == HEADER:
+            if card_index.header is None:
+                card_index.header = element
+                inner = inner.copy()
+                inner.header = True
+        elif role == TOPIC:
+            if scope.header and card_index.topic is None:
+                card_index.topic = element
+        elif role == BODY:
+            if card_index.body is None:
+                card_index.body = element
+                inner = inner.copy()
+                inner.body = True
+        elif role == TEXT:
+            if scope.body:
+                is_text = card_index.text is None
+                is_answer = card_index.answer is None and ANSWER_CLASS in classes
+                if is_text or is_answer:
+                    inner = inner.copy()
+                if is_text:
+                    card_index.text = element
+                    inner.image_lists += (card_index.text_images,)
+                if is_answer:
+                    card_index.answer = element
+                    inner.answer = True
+                    inner.image_lists += (card_index.answer_images,)
+        elif role == CHOICES:
+            if scope.body and card_index.choices_container is None:
+                card_index.choices_container = element
+                inner = inner.copy()
+                inner.choices = True
+        elif role == CHOICE:
+            if scope.choices:
+                choice = [element, None, []]
+                card_index.choices.append(choice)
+                inner = inner.copy()
+                inner.choice = choice
+                inner.image_lists += (choice[2],)
+        elif role == LETTER:
+            if scope.choice is not None and scope.choice[1] is None:
+                scope.choice[1] = element
+        elif role == CORRECT:
+            if scope.answer and card_index.correct is None:
+                card_index.correct = element
+        elif role == VOTE_SUMMARY:
+            if scope.body:
+                vote = {"distribution": None, "bars": []}
+                card_index.votes[id(element)] = vote
+                if scope.answer and card_index.answer_vote is None:
+                    card_index.answer_vote = vote
+                inner = inner.copy()
+                inner.vote = vote
+                inner.distribution = None
+        elif role == VOTE_DISTRIBUTION:
+            if scope.vote is not None and scope.vote["distribution"] is None:
+                scope.vote["distribution"] = element
+                inner = inner.copy()
+                inner.distribution = scope.vote
+        elif role == VOTE_BAR:
+            if scope.distribution is not None:
+                scope.distribution["bars"].append(element)
+        return inner
+
+    @profiler.timed("card_extractor.extract")
+    def extract(self, card, assets_folder, discussions=None, fetch_comments=None, card_index=None):
+        """
+        Extract a question card into a Question record
+
+        Args:
+            card (Tag): Question card element
+            assets_folder (str): Folder where images are saved
+            discussions (dict): Optional mapping of question ID to prefetched top comments
+            fetch_comments (callable): Called with a question ID whose comments
+                were not prefetched
+            card_index (CardIndex): Index of the card if it was already walked
+
+        Returns:
+            Question: The extracted question
+        """
+        if card_index is None:
+            card_index = self.index(card)
+        question = Question()
+
+        header = card_index.header
+        if header is not None:
+            question.number = header.get_text().strip().split("\n")[0].strip()
+            if card_index.topic is not None:
+                question.topic = card_index.topic.text.strip()
+
+        if card_index.body is None:
+            return question
+        question.question_id = card_index.question_id
+
+        if card_index.text is not None:
+            self._extract_text(card_index, question, assets_folder)
+        if card_index.choices_container is not None:
+            self._extract_choices(card_index, question, assets_folder)
+        if card_index.answer is not None:
+            self._extract_answer(card_index, question, assets_folder)
+
+        question_id = question.question_id
+        if question_id:
+            if discussions is not None and question_id in discussions:
+                top_comments = discussions[question_id]
+            else:
+                top_comments = fetch_comments(question_id) if fetch_comments else []
+            question.comments = [
+                Comment(comment["author"], comment["votes"], comment["content"])
+                for comment in top_comments
+            ]
+        return question
+
+    def _extract_text(self, card_index, question, assets_folder):
+        # Images are replaced by markdown inside the text; the ones left have no
+        # source and produce no Image record
+        self.image_handler.replace_images(
+            [img for img in card_index.text_images if img.parent is not None],
+            assets_folder,
+        )
+        question.text = card_index.text.get_text().strip()
+
+    def _extract_choices(self, card_index, question, assets_folder):
+        image_handler = self.image_handler
+        for item, letter_span, images in card_index.choices:
+            letter = letter_span.get_text().strip() if letter_span is not None else ""
+            is_correct = "correct-hidden" in item.get("class", [])
+
+            image_handler.replace_images(
+                [img for img in images if img.parent is not None], assets_folder
+            )
+
+            choice_text = item.get_text().strip()
+            choice_text = _letter_pattern(letter).sub("", choice_text).strip()
+            choice_text = MOST_VOTED_PATTERN.sub("", choice_text).strip()
+            question.choices.append(Choice(letter, choice_text, is_correct))
+
+    def _extract_answer(self, card_index, question, assets_folder):
+        answer_p = card_index.answer
+        question.has_answer = True
+
+        if card_index.correct is not None:
+            question.correct_answer = card_index.correct.text.strip()
+
+        for img in card_index.answer_images:
+            if img.parent is None:
+                continue
+            image = self.image_handler.get_image(img, assets_folder)
+            if image:
+                question.answer_images.append(image)
+
+        vote = card_index.answer_vote
+        if vote is None:
+            # lxml and html5lib close the <p> before the nested <div>, which
+            # moves the summary right after the answer
+            next_element = answer_p.find_next_sibling()
+            if next_element is not None and "voting-summary" in next_element.get(
+                "class", []
+            ):
+                vote = card_index.votes.get(
+                    id(next_element), {"distribution": None, "bars": []}
+                )
+        if vote is None:
+            return
+
+        question.votes = []
+        for bar in vote["bars"]:
+            # Only process visible vote bars (display: flex)
+            style = bar.get("style")
+            if not style or "display: flex" not in style:
+                continue
+            width_match = WIDTH_PATTERN.search(style)
+            percentage = int(width_match.group(1)) if width_match else None
+
+            # Get vote count from tooltip
+            vote_count = None
+            title = bar.get("data-original-title")
+            if title is not None and "vote" in title:
+                vote_count_match = VOTE_COUNT_PATTERN.search(title)
+                if vote_count_match:
+                    vote_count = int(vote_count_match.group(1))
+
+            question.votes.append(VoteBar(bar.text.strip(), vote_count, percentage))
@@ -0,0 +1,43 @@
+from lxml import etree
+
+# Classes of the page regions streamed out of the document
+EXAM_INFO_CLASS = "examQa"
+QUESTION_CARD_CLASS = "exam-question-card"
+
+
+def iter_exam_fragments(file_path, encoding="utf-8"):
+    """
+    Stream the exam header and question cards out of a saved HTML page.
+
+    The file is read incrementally with lxml's iterparse. Each region is
+    serialised as soon as its closing tag is seen and then removed from the
+    tree, so memory stays flat however many questions the page contains.
+
+    Args:
+        file_path (str): Path to the HTML file
+        encoding (str): File encoding, defaults to utf-8
+
+    Yields:
+        tuple: ("exam_info" | "card", HTML fragment of the region)
+    """
+    for _, element in etree.iterparse(
+        file_path, events=("end",), tag="div", html=True, encoding=encoding
+    ):
+        classes = (element.get("class") or "").split()
+        if QUESTION_CARD_CLASS in classes:
+            kind = "card"
+        elif EXAM_INFO_CLASS in classes:
+            kind = "exam_info"
+        else:
+            continue
+
+        yield kind, etree.tostring(
+            element, encoding="unicode", method="html", with_tail=False
+        )
+
+        # Release the region and everything parsed before it
+        element.clear()
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
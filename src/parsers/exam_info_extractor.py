@@ -1,3 +1,7 @@
+from src.models.question import ExamInfo
+from src.renderers.markdown_renderer import MarkdownRenderer
+
+
 class ExamInfoExtractor:
     def extract_exam_info(self, soup):
         """Extract exam information from the HTML soup"""
@@ -25,19 +29,20 @@ class ExamInfoExtractor:
         
         return exam_info
     
+    def extract(self, soup):
+        """Extract exam information from the HTML soup into an ExamInfo record"""
+        return self.to_model(self.extract_exam_info(soup))
+    
+    @staticmethod
+    def to_model(exam_info):
+        """Convert an exam info dict from extract_exam_info to an ExamInfo record"""
+        details = {
+            key: value
+            for key, value in exam_info.items()
+            if key not in ['title', 'last_updated']
+        }
+        return ExamInfo(exam_info.get('title'), exam_info.get('last_updated'), details)
+    
     def format_exam_info(self, exam_info):
         """Convert exam info to markdown format"""
-        markdown_output = []
-        markdown_output.append(f"# {exam_info.get('title', 'Exam Questions')}")
-        markdown_output.append("")
-        markdown_output.append(f"*{exam_info.get('last_updated', '')}*")
-        markdown_output.append("")
-        
-        # Add other exam information
-        for key, value in exam_info.items():
-            if key not in ['title', 'last_updated']:
-                markdown_output.append(f"**{key}:** {value}")
-        
-        markdown_output.append("\n---\n")
-        
-        return markdown_output
+        return MarkdownRenderer().render_exam_info(self.to_model(exam_info))
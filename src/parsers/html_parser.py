@@ -1,14 +1,57 @@
-from bs4 import BeautifulSoup
+from itertools import chain
+
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 from src.utils.file_utils import FileUtils
+from src.models.question import ExamInfo
+from src.parsers.backends import DEFAULT_BACKEND, PARSER_BACKENDS
+from src.parsers.card_stream import iter_exam_fragments
 from src.parsers.exam_info_extractor import ExamInfoExtractor
-from src.parsers.question_processor import QuestionProcessor
+from src.parsers.question_processor import DEFAULT_DISCUSSION_WORKERS, QuestionProcessor
+from src.renderers.markdown_renderer import MarkdownRenderer
+from src.utils.profiling import profiler
+
+# Number of cards whose images and discussions are fetched together when streaming
+DEFAULT_STREAM_BATCH_SIZE = 16
+
+# Only these page regions are built into a tree, the rest of the page is skipped
+EXAM_REGION_CLASSES = frozenset(["examQa", "exam-question-card"])
+
+
+def _is_exam_region(css_class):
+    """Match a class attribute (raw string while parsing) against EXAM_REGION_CLASSES"""
+    if not css_class:
+        return False
+    classes = css_class.split() if isinstance(css_class, str) else css_class
+    return not EXAM_REGION_CLASSES.isdisjoint(classes)
+
+
+EXAM_REGIONS = SoupStrainer("div", class_=_is_exam_region)
 
 
 class HtmlParser:
-    def __init__(self):
+    def __init__(
+        self,
+        discussion_workers=DEFAULT_DISCUSSION_WORKERS,
+        response_cache=None,
+        offline=False,
+        show_progress=True,
+        backend=DEFAULT_BACKEND,
+    ):
+        if backend not in PARSER_BACKENDS:
+            raise ValueError(
+                f"Unknown parser backend {backend!r}, expected one of {PARSER_BACKENDS}"
+            )
+        self.backend = backend
         self.file_utils = FileUtils()
         self.exam_info_extractor = ExamInfoExtractor()
-        self.question_processor = QuestionProcessor(self.file_utils)
+        self.renderer = MarkdownRenderer()
+        self.question_processor = QuestionProcessor(
+            self.file_utils,
+            discussion_workers=discussion_workers,
+            response_cache=response_cache,
+            offline=offline,
+            show_progress=show_progress,
+        )
 
     def parse(
         self, html_content, save_output=True, output_filename=None, input_filename=None
@@ -27,32 +70,210 @@ class HtmlParser:
         Returns:
             str: Markdown formatted content
         """
+        exam_info, questions = self.extract(html_content)
+        markdown_content = self.renderer.render(exam_info, questions)
+
+        # Output saving is now handled in cli.py
+        return markdown_content
+
+    def extract(self, html_content):
+        """
+        Extract the exam information and questions of a page into model records,
+        which any renderer can then turn into an output format.
+
+        Args:
+            html_content (str): HTML content to parse
+
+        Returns:
+            tuple: (ExamInfo, list of Question)
+        """
+        assets_folder = self.file_utils.get_assets_folder_path()
+        soup = self._prepare_soup(html_content)
+
+        exam_info = self.exam_info_extractor.extract(soup)
+        questions = self.question_processor.extract_questions(soup, assets_folder)
+        return exam_info, questions
+
+    def iter_parse(self, html_content, batch_size=DEFAULT_STREAM_BATCH_SIZE):
+        """
+        Parse HTML content into markdown blocks produced one question at a time.
+
+        Nothing is rendered ahead of the consumer, so writing the blocks out as
+        they come, e.g. with FileUtils.save_output_stream, keeps a single question
+        of markdown in memory instead of the whole exam.
+
+        Args:
+            html_content (str): HTML content to parse
+            batch_size (int): Number of cards prefetched and extracted together
+
+        Returns:
+            iterator: Markdown blocks, the exam header first and then one per
+                question. Joined with newlines they equal the output of parse().
+        """
+        exam_info, questions = self.iter_extract(html_content, batch_size)
+        return self.renderer.iter_render(exam_info, questions)
+
+    def iter_extract(self, html_content, batch_size=DEFAULT_STREAM_BATCH_SIZE, start=0):
+        """
+        Extract the exam information of a page, and its questions lazily.
+
+        The page is parsed right away; the question cards are then extracted
+        batch_size at a time as the iterator is consumed.
+
+        Args:
+            html_content (str): HTML content to parse
+            batch_size (int): Number of cards prefetched and extracted together
+            start (int): Number of leading cards to skip, e.g. the ones a
+                resumed run already has
+
+        Returns:
+            tuple: (ExamInfo, iterator of Question)
+        """
         assets_folder = self.file_utils.get_assets_folder_path()
         soup = self._prepare_soup(html_content)
 
-        exam_info = self.exam_info_extractor.extract_exam_info(soup)
-        markdown_output = self.exam_info_extractor.format_exam_info(exam_info)
+        exam_info = self.exam_info_extractor.extract(soup)
+        cards = soup.find_all("div", class_="exam-question-card")
+        return exam_info, self._iter_card_questions(cards, assets_folder, batch_size, start)
+
+    def _iter_card_questions(self, cards, assets_folder, batch_size, start=0):
+        """Extract cards batch by batch from position start, with a progress bar"""
+        from tqdm import tqdm
 
-        questions_markdown = self.question_processor.process_questions(
-            soup, assets_folder
+        progress = tqdm(
+            total=len(cards),
+            initial=min(start, len(cards)),
+            desc="Processing questions",
+            unit="question",
+            disable=not self.question_processor.show_progress,
         )
-        markdown_output.extend(questions_markdown)
+        try:
+            for position in range(start, len(cards), batch_size):
+                batch = cards[position : position + batch_size]
+                yield from self._extract_card_batch(batch, assets_folder)
+                progress.update(len(batch))
+        finally:
+            progress.close()
 
-        markdown_content = "\n".join(markdown_output)
+    def iter_parse_file(self, file_path, batch_size=DEFAULT_STREAM_BATCH_SIZE):
+        """
+        Parse a saved HTML page one question card at a time.
 
-        # Output saving is now handled in cli.py
-        return markdown_content
+        Only batch_size cards are held in memory at once, so peak memory does not
+        grow with the number of questions on the page.
+
+        Args:
+            file_path (str): Path to the HTML file
+            batch_size (int): Number of cards prefetched and rendered together
+
+        Yields:
+            str: Markdown blocks, the exam header first and then one per question.
+                Joined with newlines they equal the output of parse().
+        """
+        from tqdm import tqdm
+
+        assets_folder = self.file_utils.get_assets_folder_path()
+        header_done = False
+        batch = []
+        progress = tqdm(
+            desc="Processing questions",
+            unit="question",
+            disable=not self.question_processor.show_progress,
+        )
+
+        try:
+            for kind, fragment in iter_exam_fragments(file_path):
+                soup = self._prepare_soup(fragment)
+                if kind == "exam_info":
+                    if not header_done:
+                        yield self._render_exam_header(soup)
+                        header_done = True
+                    continue
+
+                # The header normally precedes the cards; without one, render
+                # the default header exactly like parse() does
+                if not header_done:
+                    yield self._render_exam_header(None)
+                    header_done = True
+
+                card = soup.find("div", class_="exam-question-card")
+                if card is not None:
+                    batch.append(card)
+                if len(batch) >= batch_size:
+                    yield from self._render_card_batch(batch, assets_folder)
+                    progress.update(len(batch))
+                    batch = []
+
+            if not header_done:
+                yield self._render_exam_header(None)
+            if batch:
+                yield from self._render_card_batch(batch, assets_folder)
+                progress.update(len(batch))
+        finally:
+            progress.close()
 
+    def _render_exam_header(self, soup):
+        """Render the exam information block of a page (defaults if soup is None)"""
+        exam_info = (
+            self.exam_info_extractor.extract(soup) if soup is not None else ExamInfo()
+        )
+        return "\n".join(self.renderer.render_exam_info(exam_info))
+
+    def _render_card_batch(self, cards, assets_folder):
+        """Prefetch a batch of cards and yield the markdown block of each"""
+        for question in self._extract_card_batch(cards, assets_folder):
+            yield "\n".join(self.renderer.render_question(question))
+
+    def _extract_card_batch(self, cards, assets_folder):
+        """Prefetch a batch of cards and yield the Question record of each"""
+        discussions = self.question_processor.prefetch(cards, assets_folder)
+        for card in cards:
+            yield self.question_processor.extract_question(
+                card, assets_folder, discussions
+            )
+
+    @profiler.timed("html_parser.prepare_soup")
     def _prepare_soup(self, html_content):
         """Parse HTML while preserving necessary elements for vote data extraction"""
-        # Use html.parser to ensure better preservation of script content
+        profiler.add_bytes("html_parser.prepare_soup", len(html_content))
+        # Only build the exam header and question cards; html5lib cannot
+        # restrict parsing and always builds the whole page
+        parse_only = EXAM_REGIONS if self.backend != "html5lib" else None
         soup = BeautifulSoup(
-            html_content, "html.parser", preserve_whitespace_tags=["script"]
+            html_content,
+            self.backend,
+            parse_only=parse_only,
+            preserve_whitespace_tags=["script"],
         )
 
         # Remove only unnecessary style elements but keep all scripts and data attributes
+        vote_parents = {}
         for element in soup.find_all("style"):
-            if not element.parent or "vote" not in str(element.parent):
+            parent = element.parent
+            if parent is None:
+                element.decompose()
+                continue
+            if id(parent) not in vote_parents:
+                vote_parents[id(parent)] = self._mentions_vote(parent)
+            if not vote_parents[id(parent)]:
                 element.decompose()
 
         return soup
+
+    @staticmethod
+    def _mentions_vote(element):
+        """
+        Tell whether "vote" appears in the markup of an element.
+        Walks tag names, attributes and strings instead of serialising the subtree.
+        """
+        for node in chain([element], element.descendants):
+            if isinstance(node, Tag):
+                if "vote" in node.name:
+                    return True
+                for key, value in node.attrs.items():
+                    values = value if isinstance(value, list) else [value]
+                    if "vote" in key or any("vote" in str(v) for v in values):
+                        return True
+            elif "vote" in node:
+                return True
+        return False
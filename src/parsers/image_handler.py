@@ -1,22 +1,55 @@
-from src.utils.request_helpers import download_image
+from src.models.question import Image
+from src.utils.request_helpers import DEFAULT_IMAGE_WORKERS, download_image, download_images
 
 class ImageHandler:
-    def __init__(self, file_utils):
+    def __init__(self, file_utils, max_workers=DEFAULT_IMAGE_WORKERS, revalidate=False):
         self.file_utils = file_utils
+        self.max_workers = max_workers
+        # Check cached images against the server instead of trusting the cache
+        self.revalidate = revalidate
+        # Local paths of the images downloaded by the last prefetch, keyed by URL
+        self._local_paths = {}
+    
+    def prefetch_images(self, elements, assets_folder):
+        """
+        Download every image found in the given elements concurrently.
+
+        The results are kept so that the markdown rewriting done afterwards by
+        process_images_in_element and get_image_markdown does not hit the network.
+        """
+        self.prefetch_image_tags(
+            (img for element in elements for img in element.find_all('img')),
+            assets_folder,
+        )
+    
+    def prefetch_image_tags(self, imgs, assets_folder):
+        """Download the given img elements concurrently, see prefetch_images"""
+        image_urls = []
+        for img in imgs:
+            img_src = img.get('src', '')
+            if img_src:
+                image_urls.append(self._full_url(img_src))
+        
+        self._local_paths = download_images(
+            image_urls, assets_folder, self.max_workers, revalidate=self.revalidate
+        )
     
     def process_images_in_element(self, element, assets_folder):
         """Process all images within an HTML element and replace with markdown"""
-        for img in element.find_all('img'):
+        self.replace_images(element.find_all('img'), assets_folder)
+    
+    def replace_images(self, imgs, assets_folder):
+        """Replace the given img elements with markdown image syntax"""
+        for img in imgs:
             img_src = img.get('src', '')
             if not img_src:
                 continue
                 
             # Make sure it's a full URL
-            if not img_src.startswith(('http://', 'https://')):
-                img_src = f"https://www.examtopics.com{img_src}"
+            img_src = self._full_url(img_src)
             
             # Download image and get local path
-            local_path = download_image(img_src, assets_folder)
+            local_path = self._get_local_path(img_src, assets_folder)
             
             # Convert to relative path
             relative_path = self.file_utils.get_relative_path(local_path)
@@ -27,19 +60,38 @@ class ImageHandler:
     
     def get_image_markdown(self, img, assets_folder):
         """Generate markdown for an image element"""
+        image = self.get_image(img, assets_folder)
+        if image is None:
+            return None
+        return f"![{image.alt}]({image.path})"
+    
+    def get_image(self, img, assets_folder):
+        """Download an image element and return it as an Image record"""
         img_src = img.get('src', '')
         if not img_src:
             return None
             
         # Make sure it's a full URL
-        if not img_src.startswith(('http://', 'https://')):
-            img_src = f"https://www.examtopics.com{img_src}"
+        img_src = self._full_url(img_src)
         
         # Download image and get local path
-        local_path = download_image(img_src, assets_folder)
+        local_path = self._get_local_path(img_src, assets_folder)
         
         # Convert to relative path
         relative_path = self.file_utils.get_relative_path(local_path)
         
-        img_alt = img.get('alt', 'image')
-        return f"![{img_alt}]({relative_path})"
+        return Image(img.get('alt', 'image'), relative_path)
+    
+    def _full_url(self, img_src):
+        """Make sure the image source is a full URL"""
+        if not img_src.startswith(('http://', 'https://')):
+            img_src = f"https://www.examtopics.com{img_src}"
+        return img_src
+    
+    def _get_local_path(self, img_url, assets_folder):
+        """Return the local path of a prefetched image, downloading it if needed"""
+        local_path = self._local_paths.get(img_url)
+        if local_path is None:
+            local_path = download_image(img_url, assets_folder, revalidate=self.revalidate)
+            self._local_paths[img_url] = local_path
+        return local_path
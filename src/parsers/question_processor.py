@@ -1,214 +1,129 @@
-import re
 import json
-import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from src.parsers.card_extractor import CardExtractor
 from src.parsers.image_handler import ImageHandler
-from tqdm import tqdm
+from src.renderers.markdown_renderer import MarkdownRenderer
+from src.utils.profiling import profiler
+from src.utils.http_client import get_client
+
+# Number of discussion threads fetched concurrently
+DEFAULT_DISCUSSION_WORKERS = 8
 
 
 class QuestionProcessor:
-    def __init__(self, file_utils):
+    def __init__(
+        self,
+        file_utils,
+        discussion_workers=DEFAULT_DISCUSSION_WORKERS,
+        response_cache=None,
+        offline=False,
+        show_progress=True,
+    ):
+        """
+        discussion_workers: number of discussion threads fetched concurrently
+        response_cache: optional ResponseCache used for the discussion endpoint
+        offline: serve discussions from the cache only, never from the network
+        show_progress: display a progress bar while processing questions
+        """
         self.file_utils = file_utils
         self.image_handler = ImageHandler(file_utils)
+        self.renderer = MarkdownRenderer()
+        self.discussion_workers = discussion_workers
+        self.response_cache = response_cache
+        self.offline = offline
+        self.show_progress = show_progress
+        self.card_extractor = CardExtractor(self.image_handler)
+        # CardIndex of the prefetched cards, keyed by id() of the card
+        self._card_indexes = {}
 
     def process_questions(self, soup, assets_folder):
         """Process all question cards and convert to markdown"""
         markdown_output = []
+        for question in self.extract_questions(soup, assets_folder):
+            markdown_output.extend(self.renderer.render_question(question))
+        return markdown_output
+
+    def extract_questions(self, soup, assets_folder):
+        """Extract all question cards of a page into Question records"""
         question_cards = soup.find_all("div", class_="exam-question-card")
 
-        for card in tqdm(question_cards, desc="Processing questions", unit="question"):
-            header_md = self._process_question_header(card)
-            markdown_output.extend(header_md)
+        # Download all images and discussions of the page up front, concurrently
+        discussions = self.prefetch(question_cards, assets_folder)
 
-            body_md = self._process_question_body(card, assets_folder)
-            markdown_output.extend(body_md)
+        cards = question_cards
+        if self.show_progress:
+            # Imported here so that runs without progress bars never load tqdm
+            from tqdm import tqdm
 
-            markdown_output.append("\n---\n")
+            cards = tqdm(question_cards, desc="Processing questions", unit="question")
 
-        return markdown_output
+        return [self.extract_question(card, assets_folder, discussions) for card in cards]
 
-    def _process_question_header(self, card):
-        """Extract question header information (number and topic)"""
-        markdown_lines = []
-        header = card.find("div", class_="card-header")
-        if header:
-            question_number = header.get_text().strip().split("\n")[0].strip()
-            topic = ""
-            topic_span = header.find("span", class_="question-title-topic")
-            if topic_span:
-                topic = topic_span.text.strip()
-
-            markdown_lines.append(f"## {question_number} ({topic})")
-
-        return markdown_lines
-
-    def _process_question_body(self, card, assets_folder):
-        """Process the question body including text, images, choices and answers"""
-        markdown_lines = []
-        body = card.find("div", class_="card-body")
-        if not body:
-            return markdown_lines
-
-        # Add question ID if available
-        question_id = body.get("data-id")
-        if question_id:
-            markdown_lines.append(f"*Question ID: {question_id}*\n")
-
-        # Process question text and images
-        question_text = self._process_question_text(body, assets_folder)
-        markdown_lines.extend(question_text)
-
-        # Process choices
-        choices_container = body.find("div", class_="question-choices-container")
-        if choices_container:
-            choices_md = self._process_choices(choices_container, assets_folder)
-            markdown_lines.extend(choices_md)
-
-        # Process correct answer
-        answer_md = self._process_correct_answer(body, assets_folder)
-        markdown_lines.extend(answer_md)
-
-        # Fetch and add top 3 discussion comments
-        if question_id:
-            top_comments = self.fetch_top_discussion_comments(question_id)
-            if top_comments:
-                markdown_lines.append("\n**Top 3 Discussion Comments:**")
-                for idx, comment in enumerate(top_comments, 1):
-                    markdown_lines.append(
-                        f"\n**{comment['author']}** ({comment['votes']} votes):\n {comment['content']}"
-                    )
+    def prefetch(self, question_cards, assets_folder):
+        """
+        Download the images and discussions of several cards concurrently.
+        Returns a dict mapping each question ID to its top comments.
+        """
+        # The walk that finds the images also indexes the cards for extraction
+        indexes = [self.card_extractor.index(card) for card in question_cards]
+        self._card_indexes = {
+            id(card): (card, card_index)
+            for card, card_index in zip(question_cards, indexes)
+        }
+        self.image_handler.prefetch_image_tags(
+            (img for card_index in indexes for img in card_index.images), assets_folder
+        )
+        return self.fetch_discussions([card_index.question_id for card_index in indexes])
 
-        return markdown_lines
-
-    def _process_question_text(self, body, assets_folder):
-        """Extract and process the question text with images"""
-        markdown_lines = []
-        question_text = body.find("p", class_="card-text")
-        if not question_text:
-            return markdown_lines
-
-        # Process images inside question text
-        self.image_handler.process_images_in_element(question_text, assets_folder)
-
-        text_content = question_text.get_text().strip()
-        if text_content:
-            markdown_lines.append(text_content)
-            markdown_lines.append("")
-
-        # Check for any remaining images directly in question text
-        for img in question_text.find_all("img"):
-            img_md = self.image_handler.get_image_markdown(img, assets_folder)
-            if img_md:
-                markdown_lines.append(img_md)
-                markdown_lines.append("")
-
-        return markdown_lines
-
-    def _process_choices(self, choices_container, assets_folder):
-        """Process question choices and convert to markdown"""
-        markdown_lines = []
-        choice_items = choices_container.find_all("li", class_="multi-choice-item")
-
-        for item in choice_items:
-            choice_letter = item.find("span", class_="multi-choice-letter")
-            letter = ""
-            if choice_letter:
-                letter = choice_letter.get_text().strip()
-
-            # Check if this is the correct answer
-            is_correct = "correct-hidden" in item.get("class", [])
-
-            # Process images in choice text
-            self.image_handler.process_images_in_element(item, assets_folder)
-
-            # Get the choice text (excluding the letter part)
-            choice_text = item.get_text().strip()
-            choice_text = re.sub(rf"^{letter}\s*", "", choice_text).strip()
-            # Also remove "Most Voted" if present
-            choice_text = re.sub(r"Most Voted\s*$", "", choice_text).strip()
-
-            # Mark correct answer
-            markdown_choice = f"- **{letter}** {choice_text}"
-            if is_correct:
-                markdown_choice += " ✓"  # Mark correct answer
-
-            markdown_lines.append(markdown_choice)
-
-            # Check if there are any images in this choice that weren't processed via text
-            for img in item.find_all("img"):
-                img_md = self.image_handler.get_image_markdown(img, assets_folder)
-                if img_md:
-                    markdown_lines.append(f"  {img_md}")
-
-        return markdown_lines
-
-    def _process_correct_answer(self, body, assets_folder):
-        """Process the correct answer section"""
-        markdown_lines = []
-        # Use a more flexible selector that looks for elements containing both required classes
-        answer_p = body.find(
-            "p",
-            class_=lambda c: c
-            and all(cls in c.split() for cls in ["card-text", "question-answer"]),
+    def process_card(self, card, assets_folder, discussions=None):
+        """Convert a single question card to markdown lines"""
+        return self.renderer.render_question(
+            self.extract_question(card, assets_folder, discussions)
         )
-        if not answer_p:
-            return markdown_lines
-
-        markdown_lines.append("\n**Correct Answer:**")
-
-        correct_span = answer_p.find("span", class_="correct-answer")
-        if correct_span:
-            markdown_lines.append(f"**{correct_span.text.strip()}**")
-
-        # Process images in explanation
-        for img in answer_p.find_all("img"):
-            img_md = self.image_handler.get_image_markdown(img, assets_folder)
-            if img_md:
-                markdown_lines.append(img_md)
-
-        vote_div = answer_p.find("div", class_="voting-summary")
-        if vote_div:
-            markdown_lines.append("\n**Community vote distribution:**")
-
-            progress_bar = vote_div.find("div", class_="vote-distribution-bar")
-            if progress_bar:
-                vote_bars = progress_bar.find_all("div", class_="vote-bar")
-
-                for bar in vote_bars:
-                    # Only process visible vote bars (display: flex)
-                    if bar.get("style") and "display: flex" in bar.get("style"):
-                        option_text = bar.text.strip()
-                        width_match = re.search(
-                            r"width:\s*(\d+)%", bar.get("style", "")
-                        )
-                        percentage = width_match.group(1) if width_match else "?"
-
-                        # Get vote count from tooltip
-                        vote_count = "?"
-                        if (
-                            bar.has_attr("data-original-title")
-                            and "vote" in bar["data-original-title"]
-                        ):
-                            vote_count_match = re.search(
-                                r"(\d+)\s*vote", bar["data-original-title"]
-                            )
-                            if vote_count_match:
-                                vote_count = vote_count_match.group(1)
-
-                        markdown_lines.append(f"- {option_text}: {vote_count} votes")
-
-        return markdown_lines
 
+    def extract_question(self, card, assets_folder, discussions=None):
+        """Extract a single question card into a Question record"""
+        card_index = None
+        entry = self._card_indexes.pop(id(card), None)
+        if entry is not None and entry[0] is card:
+            card_index = entry[1]
+        return self.card_extractor.extract(
+            card,
+            assets_folder,
+            discussions,
+            self.fetch_top_discussion_comments,
+            card_index,
+        )
+
+    def fetch_discussions(self, question_ids, top_n=3):
+        """
+        Fetch the top N comments of several questions concurrently.
+        Returns a dict mapping each question ID to its list of comments.
+        """
+        unique_ids = list(dict.fromkeys(qid for qid in question_ids if qid))
+        if not unique_ids:
+            return {}
+
+        workers = max(1, min(self.discussion_workers, len(unique_ids)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda qid: self.fetch_top_discussion_comments(qid, top_n), unique_ids
+            )
+            return dict(zip(unique_ids, results))
+
+    @profiler.timed("fetch_top_discussion_comments")
     def fetch_top_discussion_comments(self, question_id, top_n=3):
         """
         Fetch and parse the top N most voted comments for a question.
         Returns a list of dicts: [{'author': ..., 'votes': ..., 'content': ...}, ...]
         """
-        url = f"https://www.examtopics.com/ajax/discussion/exam-question/{question_id}/"
+        from bs4 import BeautifulSoup
+
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
+            discussion_html = self._get_discussion_html(question_id)
+            if discussion_html is None:
+                return []
+            soup = BeautifulSoup(discussion_html, "html.parser")
             comments = []
             # Each comment is a div with class "media comment-container"
             for comment_div in soup.find_all("div", class_="media comment-container"):
@@ -241,3 +156,24 @@ class QuestionProcessor:
         except Exception as e:
             print(f"Failed to fetch discussion for question {question_id}: {e}")
             return []
+
+    def _get_discussion_html(self, question_id):
+        """
+        Return the discussion HTML of a question, from the response cache when fresh.
+        Returns None in offline mode if the question is not cached.
+        """
+        cache_key = f"discussion:{question_id}"
+        if self.response_cache is not None:
+            cached = self.response_cache.get(cache_key, ignore_ttl=self.offline)
+            if cached is not None:
+                return cached
+        if self.offline:
+            return None
+
+        url = f"https://www.examtopics.com/ajax/discussion/exam-question/{question_id}/"
+        response = get_client().get(url)
+        response.raise_for_status()
+        profiler.add_bytes("fetch_top_discussion_comments", len(response.content))
+        if self.response_cache is not None:
+            self.response_cache.set(cache_key, response.text)
+        return response.text
@@ -0,0 +1,44 @@
+import json
+
+from src.models.question import ExamInfo, Question
+
+
+class JsonRenderer:
+    """Render the extracted exam model as JSON, which can be loaded back for re-rendering"""
+
+    def __init__(self, indent=2):
+        self.indent = indent
+
+    def render(self, exam_info, questions):
+        """
+        Render a whole exam
+
+        Args:
+            exam_info (ExamInfo): Exam information
+            questions (iterable): Question records
+
+        Returns:
+            str: JSON document with "exam" and "questions" keys
+        """
+        return json.dumps(
+            {
+                "exam": exam_info.to_dict(),
+                "questions": [question.to_dict() for question in questions],
+            },
+            indent=self.indent,
+            ensure_ascii=False,
+        )
+
+    @staticmethod
+    def load(content):
+        """
+        Load a JSON document produced by render
+
+        Returns:
+            tuple: (ExamInfo, list of Question)
+        """
+        data = json.loads(content)
+        return (
+            ExamInfo.from_dict(data["exam"]),
+            [Question.from_dict(question) for question in data["questions"]],
+        )
@@ -0,0 +1,109 @@
+class MarkdownRenderer:
+    """Render the extracted exam model as markdown"""
+
+    def render(self, exam_info, questions):
+        """
+        Render a whole exam
+
+        Args:
+            exam_info (ExamInfo): Exam information
+            questions (iterable): Question records
+
+        Returns:
+            str: Markdown formatted content
+        """
+        return "\n".join(self.iter_render(exam_info, questions))
+
+    def iter_render(self, exam_info, questions):
+        """
+        Render a whole exam one block at a time, consuming questions lazily
+
+        Args:
+            exam_info (ExamInfo): Exam information
+            questions (iterable): Question records
+
+        Yields:
+            str: Markdown blocks, the exam header first and then one per question.
+                Joined with newlines they equal the output of render().
+        """
+        yield "\n".join(self.render_exam_info(exam_info))
+        for question in questions:
+            yield "\n".join(self.render_question(question))
+
+    def render_exam_info(self, exam_info):
+        """Convert exam info to markdown lines"""
+        title = exam_info.title if exam_info.title is not None else "Exam Questions"
+        last_updated = exam_info.last_updated if exam_info.last_updated is not None else ""
+
+        markdown_output = []
+        markdown_output.append(f"# {title}")
+        markdown_output.append("")
+        markdown_output.append(f"*{last_updated}*")
+        markdown_output.append("")
+
+        # Add other exam information
+        for key, value in exam_info.details.items():
+            markdown_output.append(f"**{key}:** {value}")
+
+        markdown_output.append("\n---\n")
+
+        return markdown_output
+
+    def render_question(self, question):
+        """Convert a question to markdown lines"""
+        markdown_lines = []
+        if question.number is not None:
+            markdown_lines.append(f"## {question.number} ({question.topic})")
+
+        if question.question_id:
+            markdown_lines.append(f"*Question ID: {question.question_id}*\n")
+
+        if question.text:
+            markdown_lines.append(question.text)
+            markdown_lines.append("")
+        for image in question.images:
+            markdown_lines.append(self.render_image(image))
+            markdown_lines.append("")
+
+        for choice in question.choices:
+            markdown_choice = f"- **{choice.letter}** {choice.text}"
+            if choice.is_correct:
+                markdown_choice += " ✓"  # Mark correct answer
+            markdown_lines.append(markdown_choice)
+            for image in choice.images:
+                markdown_lines.append(f"  {self.render_image(image)}")
+
+        if question.has_answer:
+            markdown_lines.extend(self._render_answer(question))
+
+        if question.comments:
+            markdown_lines.append("\n**Top 3 Discussion Comments:**")
+            for comment in question.comments:
+                markdown_lines.append(
+                    f"\n**{comment.author}** ({comment.votes} votes):\n {comment.content}"
+                )
+
+        markdown_lines.append("\n---\n")
+        return markdown_lines
+
+    def _render_answer(self, question):
+        """Convert the correct answer section to markdown lines"""
+        markdown_lines = ["\n**Correct Answer:**"]
+        if question.correct_answer is not None:
+            markdown_lines.append(f"**{question.correct_answer}**")
+
+        for image in question.answer_images:
+            markdown_lines.append(self.render_image(image))
+
+        if question.votes is not None:
+            markdown_lines.append("\n**Community vote distribution:**")
+            for bar in question.votes:
+                votes = bar.votes if bar.votes is not None else "?"
+                markdown_lines.append(f"- {bar.option}: {votes} votes")
+
+        return markdown_lines
+
+    @staticmethod
+    def render_image(image):
+        """Convert an image to markdown image syntax"""
+        return f"![{image.alt}]({image.path})"
@@ -0,0 +1,204 @@
+import json
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+
+# Same folder as FileUtils.get_cache_folder_path()
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "cache",
+    "webdriver.json",
+)
+# Seconds a resolved driver is trusted before being resolved again
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+
+# Registry keys holding the installed browser version on Windows
+_REGISTRY_VERSION_KEYS = {
+    "chrome": [(r"Software\Google\Chrome\BLBeacon", "version")],
+    "edge": [(r"Software\Microsoft\Edge\BLBeacon", "version")],
+    "firefox": [(r"SOFTWARE\Mozilla\Mozilla Firefox", "CurrentVersion")],
+}
+# Executables asked for "--version" elsewhere
+_VERSION_COMMANDS = {
+    "chrome": ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"],
+    "edge": ["microsoft-edge", "microsoft-edge-stable"],
+    "firefox": ["firefox"],
+}
+_VERSION_PATTERN = re.compile(r"\d+(?:\.\d+)+")
+
+
+def get_browser_version(browser_type):
+    """
+    Read the installed version of a browser without launching it
+
+    Args:
+        browser_type (str): "chrome", "firefox" or "edge"
+
+    Returns:
+        str: Version such as "126.0.6478.127", or None if it cannot be found
+    """
+    try:
+        import winreg
+
+        for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            for key_path, value_name in _REGISTRY_VERSION_KEYS.get(browser_type, []):
+                try:
+                    with winreg.OpenKey(root, key_path) as key:
+                        version = winreg.QueryValueEx(key, value_name)[0]
+                    match = _VERSION_PATTERN.search(str(version))
+                    if match:
+                        return match.group(0)
+                except OSError:
+                    continue
+    except ImportError:
+        pass
+
+    for command in _VERSION_COMMANDS.get(browser_type, []):
+        version = _run_version_command([command, "--version"])
+        if version:
+            return version
+    return None
+
+
+def get_driver_version(driver_path):
+    """Return the version reported by a driver binary, or None"""
+    if not driver_path or not os.path.exists(driver_path):
+        return None
+    return _run_version_command([driver_path, "--version"])
+
+
+def _run_version_command(command):
+    """Run a "--version" command and extract the version number it prints"""
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = _VERSION_PATTERN.search(result.stdout or "")
+    return match.group(0) if match else None
+
+
+class DriverResolver:
+    """
+    Cache of resolved WebDriver binaries.
+
+    webdriver_manager checks (and may download) the driver on every install()
+    call. The resolver keeps the driver path of each browser type together with
+    the browser version it was resolved for, and reuses it as long as the
+    binary exists, the installed browser still has that version and the entry
+    is younger than max_age.
+    """
+
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH, max_age=DEFAULT_MAX_AGE):
+        self.cache_path = cache_path
+        self.max_age = max_age
+        self.entries = self._load()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Read the cache, starting over if it is missing or corrupt"""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get_cached(self, browser_type, browser_version=None):
+        """
+        Return the cached entry of a browser type if it is still valid
+
+        Args:
+            browser_type (str): "chrome", "firefox" or "edge"
+            browser_version (str): Installed browser version, detected if None
+
+        Returns:
+            dict: Entry with driver_path, driver_version, browser_version and
+                resolved_at, or None if there is no valid entry
+        """
+        entry = self.entries.get(browser_type)
+        if not entry or not os.path.exists(entry.get("driver_path") or ""):
+            return None
+        if time.time() - entry.get("resolved_at", 0) > self.max_age:
+            return None
+        if browser_version is None:
+            browser_version = get_browser_version(browser_type)
+        if browser_version and browser_version != entry.get("browser_version"):
+            return None
+        return entry
+
+    def resolve(self, browser_type):
+        """
+        Return the driver path of a browser type, resolving it only when the
+        cached one is missing, stale or was resolved for another browser version
+        """
+        browser_version = get_browser_version(browser_type)
+        with self._lock:
+            entry = self.get_cached(browser_type, browser_version)
+            if entry:
+                return entry["driver_path"]
+
+            driver_path = self._install(browser_type)
+            self.entries[browser_type] = {
+                "driver_path": driver_path,
+                "driver_version": get_driver_version(driver_path),
+                "browser_version": browser_version,
+                "resolved_at": time.time(),
+            }
+            self.save()
+            return driver_path
+
+    def invalidate(self, browser_type=None):
+        """Forget the driver of a browser type, or of every browser type"""
+        if browser_type is None:
+            self.entries = {}
+        else:
+            self.entries.pop(browser_type, None)
+        self.save()
+
+    def version_info(self, browser_type):
+        """
+        Describe the browser and driver versions without launching a browser
+        or resolving the driver
+
+        Returns:
+            dict: browser, browser_version, driver_path and driver_version
+                (None when unknown)
+        """
+        entry = self.entries.get(browser_type) or {}
+        return {
+            "browser": browser_type,
+            "browser_version": get_browser_version(browser_type),
+            "driver_path": entry.get("driver_path"),
+            "driver_version": entry.get("driver_version"),
+        }
+
+    def _install(self, browser_type):
+        """Resolve the driver binary with webdriver_manager"""
+        if browser_type == "firefox":
+            from webdriver_manager.firefox import GeckoDriverManager  # type: ignore
+
+            return GeckoDriverManager().install()
+        if browser_type == "edge":
+            from webdriver_manager.microsoft import EdgeChromiumDriverManager  # type: ignore
+
+            return EdgeChromiumDriverManager().install()
+        from webdriver_manager.chrome import ChromeDriverManager  # type: ignore
+
+        return ChromeDriverManager().install()
+
+    def save(self):
+        """Write the cache atomically"""
+        folder = os.path.dirname(self.cache_path)
+        os.makedirs(folder, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=folder, suffix=".part")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(self.entries, file, indent=2)
+            os.replace(temp_path, self.cache_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
@@ -1,36 +1,246 @@
+import os
+import queue
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
 from .browser_detection import get_default_windows_browser
 from .chrome_profiles import (
     get_chrome_profile_path,
     print_chrome_profiles_info,
     get_chrome_profiles_info,
 )
+from .driver_resolver import DriverResolver
 from .script_loader import load_js_script
 
+# Script clicking every "Reveal Solution" and "Discussion" button, at the project root
+REVEAL_SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "revealSolutions.js",
+)
+CARD_SELECTOR = "div.exam-question-card"
+# Seconds to wait for the cards of a page, and for the reveal to finish once
+# its last click is due
+DEFAULT_PAGE_TIMEOUT = 30
+# Seconds between two readiness checks
+POLL_INTERVAL = 0.25
+
+
+def exam_page_urls(view_url, last_page, first_page=1):
+    """
+    Build the URLs of consecutive pages of an exam
+
+    Args:
+        view_url (str): Exam view URL, e.g. https://www.examtopics.com/exams/microsoft/az-204/view/
+        last_page (int): Last page number (inclusive)
+        first_page (int): First page number
+
+    Returns:
+        list: URLs of the pages, e.g. .../view/1, .../view/2, ...
+    """
+    base_url = view_url.rstrip("/")
+    # Drop a page number already present in the URL
+    head, _, tail = base_url.rpartition("/")
+    if tail.isdigit():
+        base_url = head
+    return [f"{base_url}/{page}" for page in range(first_page, last_page + 1)]
+
 
 class HtmlScraper:
+    """
+    Selenium scraper.
+
+    A scraper owns at most one browser session: start() launches it, every
+    fetch_page() call reuses it, and close() quits the browser and removes its
+    temporary profile. The scraper is also a context manager:
+
+        with HtmlScraper() as scraper:
+            for url, html in scraper.scrape_pages(urls):
+                ...
+    """
+
+    def __init__(self, timeout=DEFAULT_PAGE_TIMEOUT, reveal=True, resolver=None):
+        """
+        timeout: seconds to wait for the question cards, then for the reveal
+            after its last click is due
+        reveal: click the "Reveal Solution" and "Discussion" buttons before
+            reading the page
+        resolver: DriverResolver caching the driver binaries (default: shared cache)
+        """
+        self.driver = None
+        self.resolver = resolver or DriverResolver()
+        self.timeout = timeout
+        self.reveal = reveal
+        self._temp_profile = None
+        self._reveal_script = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def print_chrome_profiles_info(self):
         print_chrome_profiles_info()
 
     def get_chrome_profiles_info(self):
         return get_chrome_profiles_info()
 
+    def get_version_info(self):
+        """Return the browser and driver versions without launching a browser"""
+        return self.resolver.version_info(get_default_windows_browser())
+
+    def start(self, detach=False, profile_dir=None):
+        """
+        Launch the browser session if it is not running yet.
+        If detach=True, the browser will remain open after the script ends.
+        profile_dir: Chrome profile directory name (e.g., 'Default', 'Profile 1')
+
+        Returns:
+            WebDriver: The running driver
+        """
+        if self.driver is None:
+            self.driver = self._start_driver(detach)
+        return self.driver
+
+    def fetch_page(self, url):
+        """
+        Navigate the running session to url and return the page source once
+        its question cards are loaded and their solutions revealed
+        """
+        driver = self.start()
+
+        # Navigate to the URL
+        driver.get(url)
+
+        # Wait until the question cards are loaded, then reveal the answers
+        if self.wait_for_cards() and self.reveal:
+            self.reveal_solutions()
+
+        # Return the page source as HTML content
+        return driver.page_source
+
+    def wait_for_cards(self):
+        """
+        Wait until the page is loaded and its number of question cards stopped
+        changing between two checks.
+
+        Returns:
+            int: Number of question cards on the page, 0 if none showed up
+                before the timeout
+        """
+        from selenium.common.exceptions import TimeoutException  # type: ignore
+        from selenium.webdriver.common.by import By  # type: ignore
+        from selenium.webdriver.support.ui import WebDriverWait  # type: ignore
+
+        last_count = [-1]
+
+        def cards_stable(driver):
+            if driver.execute_script("return document.readyState") != "complete":
+                return False
+            count = len(driver.find_elements(By.CSS_SELECTOR, CARD_SELECTOR))
+            stable = count > 0 and count == last_count[0]
+            last_count[0] = count
+            return count if stable else False
+
+        try:
+            return WebDriverWait(
+                self.driver, self.timeout, poll_frequency=POLL_INTERVAL
+            ).until(cards_stable)
+        except TimeoutException:
+            print(
+                f"[WARNING] Question cards did not settle within {self.timeout}s, "
+                "using the page as it is."
+            )
+            return max(last_count[0], 0)
+
+    def reveal_solutions(self):
+        """
+        Run revealSolutions.js and wait until all its scheduled clicks are done.
+
+        The clicks are spaced out, so the wait is the delay of the last click,
+        reported by the script, plus the page timeout.
+
+        Returns:
+            bool: True if the reveal finished before the timeout
+        """
+        from selenium.common.exceptions import TimeoutException  # type: ignore
+        from selenium.webdriver.support.ui import WebDriverWait  # type: ignore
+
+        if self._reveal_script is None:
+            self._reveal_script = load_js_script(REVEAL_SCRIPT_PATH)
+        self.driver.execute_script(self._reveal_script)
+        duration = self.driver.execute_script("return window.revealSolutionsDuration || 0")
+        timeout = self.timeout + duration / 1000
+
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=POLL_INTERVAL).until(
+                lambda driver: driver.execute_script(
+                    "return window.revealSolutionsPending === 0"
+                )
+            )
+            return True
+        except TimeoutException:
+            print(
+                f"[WARNING] Solutions were not all revealed within {timeout:.0f}s."
+            )
+            return False
+
+    def scrape_pages(self, urls):
+        """
+        Scrape several pages with one browser session.
+
+        Yields:
+            tuple: (url, HTML content) for each URL, in order; the content is
+                None for a page that failed to load
+        """
+        for url in urls:
+            yield url, self.try_fetch_page(url)
+
+    def try_fetch_page(self, url):
+        """Fetch a page like fetch_page, returning None instead of raising"""
+        try:
+            return self.fetch_page(url)
+        except Exception as e:
+            print(f"[ERROR] Failed to load {url}: {e}")
+            return None
+
     def scrape(self, url, detach=False, profile_dir=None):
         """
         Scrape the given URL using Selenium.
         If detach=True, the browser will remain open after scraping.
         profile_dir: Chrome profile directory name (e.g., 'Default', 'Profile 1')
+
+        A session started here is closed afterwards unless detach=True;
+        a session that was already running is reused and left open.
         """
+        owns_session = self.driver is None
+        self.start(detach=detach, profile_dir=profile_dir)
+        try:
+            return self.fetch_page(url)
+        finally:
+            if owns_session and not detach:
+                self.close()
+
+    def close(self):
+        """Quit the browser and delete its temporary profile"""
+        driver, self.driver = self.driver, None
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"[WARNING] Failed to quit the browser cleanly: {e}")
+        if self._temp_profile:
+            shutil.rmtree(self._temp_profile, ignore_errors=True)
+            self._temp_profile = None
+
+    def _start_driver(self, detach=False):
+        """Launch a WebDriver for the default browser"""
         from selenium import webdriver  # type: ignore
         from selenium.webdriver.chrome.service import Service as ChromeService  # type: ignore
         from selenium.webdriver.chrome.options import Options as ChromeOptions  # type: ignore
         from selenium.webdriver.firefox.service import Service as FirefoxService  # type: ignore
         from selenium.webdriver.edge.service import Service as EdgeService  # type: ignore
-        from webdriver_manager.chrome import ChromeDriverManager  # type: ignore
-        from webdriver_manager.firefox import GeckoDriverManager  # type: ignore
-        from webdriver_manager.microsoft import EdgeChromiumDriverManager  # type: ignore
-        import time
-        import os
-        import sys
         import subprocess
 
         driver = None
@@ -58,16 +268,17 @@ class HtmlScraper:
         # Initialize the appropriate WebDriver based on default browser
         if browser_type == "chrome":
             chrome_options = ChromeOptions()
-            import tempfile
 
-            temp_profile = tempfile.mkdtemp()
-            chrome_options.add_argument(f"--user-data-dir={temp_profile}")
+            self._temp_profile = tempfile.mkdtemp()
+            chrome_options.add_argument(f"--user-data-dir={self._temp_profile}")
             chrome_options.add_experimental_option("detach", detach)
 
             try:
-                driver = webdriver.Chrome(
-                    service=ChromeService(ChromeDriverManager().install()),
-                    options=chrome_options,
+                driver = self._launch(
+                    browser_type,
+                    lambda driver_path: webdriver.Chrome(
+                        service=ChromeService(driver_path), options=chrome_options
+                    ),
                 )
             except Exception as chrome_exc:
                 print("[ERROR] Failed to start ChromeDriver:", chrome_exc)
@@ -75,25 +286,90 @@ class HtmlScraper:
                 print("- Ensure all Chrome windows are closed.")
                 print("- Make sure ChromeDriver version matches your installed Chrome.")
                 print("- Try updating both Chrome and ChromeDriver.")
+                shutil.rmtree(self._temp_profile, ignore_errors=True)
+                self._temp_profile = None
                 raise
         elif browser_type == "firefox":
-            driver = webdriver.Firefox(
-                service=FirefoxService(GeckoDriverManager().install())
+            driver = self._launch(
+                browser_type,
+                lambda driver_path: webdriver.Firefox(
+                    service=FirefoxService(driver_path)
+                ),
             )
         elif browser_type == "edge":
-            driver = webdriver.Edge(
-                service=EdgeService(EdgeChromiumDriverManager().install())
+            driver = self._launch(
+                browser_type,
+                lambda driver_path: webdriver.Edge(service=EdgeService(driver_path)),
             )
         else:
-            driver = webdriver.Chrome(
-                service=ChromeService(ChromeDriverManager().install())
+            driver = self._launch(
+                "chrome",
+                lambda driver_path: webdriver.Chrome(service=ChromeService(driver_path)),
             )
 
-        # Navigate to the URL
-        driver.get(url)
+        return driver
+
+    def _launch(self, browser_type, create_driver):
+        """
+        Create a driver with the cached driver binary of browser_type.
+        If a previously cached binary fails to start, it is resolved again once.
+        """
+        was_cached = browser_type in self.resolver.entries
+        try:
+            return create_driver(self.resolver.resolve(browser_type))
+        except Exception:
+            if not was_cached:
+                raise
+            print("[WARNING] Cached WebDriver failed to start, resolving it again.")
+            self.resolver.invalidate(browser_type)
+            return create_driver(self.resolver.resolve(browser_type))
 
-        # Wait for initial page to load
-        time.sleep(5)
 
-        # Return the page source as HTML content
-        return driver.page_source
+class ScraperPool:
+    """
+    Small pool of browser sessions scraping pages in parallel.
+    Each session is used by one thread at a time and reused across pages.
+    """
+
+    def __init__(self, size=2, resolver=None):
+        self.size = max(1, size)
+        self.resolver = resolver or DriverResolver()
+        self._scrapers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def scrape_pages(self, urls):
+        """
+        Scrape several pages across the pool's browsers.
+
+        Returns:
+            list: (url, HTML content) tuples in the order of urls; the content
+                is None for a page that failed to load
+        """
+        urls = list(urls)
+        idle = queue.Queue()
+        while len(self._scrapers) < min(self.size, len(urls)):
+            scraper = HtmlScraper(resolver=self.resolver)
+            self._scrapers.append(scraper)
+        for scraper in self._scrapers:
+            idle.put(scraper)
+
+        def fetch(url):
+            scraper = idle.get()
+            try:
+                return url, scraper.try_fetch_page(url)
+            finally:
+                idle.put(scraper)
+
+        with ThreadPoolExecutor(max_workers=len(self._scrapers) or 1) as executor:
+            return list(executor.map(fetch, urls))
+
+    def close(self):
+        """Quit every browser of the pool"""
+        for scraper in self._scrapers:
+            scraper.close()
+        self._scrapers = []
@@ -0,0 +1,113 @@
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit
+
+from src.utils.profiling import profiler
+from src.utils.request_helpers import fetch
+
+from .html_scraper import HtmlScraper
+
+# Substrings a served exam page must contain to be parsed without a browser
+REQUIRED_MARKERS = ("exam-question-card", "card-body")
+# Number of pages fetched concurrently
+DEFAULT_PAGE_WORKERS = 4
+
+
+class HttpScraper:
+    """
+    Browser-free scraper.
+
+    Exam view pages are fetched with the shared keep-alive requests session, several
+    at a time. A page missing one of REQUIRED_MARKERS (e.g. a challenge page or a
+    page built by JavaScript) is loaded again through the Selenium scraper.
+    """
+
+    def __init__(
+        self,
+        base_url=None,
+        max_workers=DEFAULT_PAGE_WORKERS,
+        browser_fallback=True,
+        markers=REQUIRED_MARKERS,
+    ):
+        """
+        base_url: optional scheme://host[/prefix] replacing the one of every URL,
+            e.g. a local stand-in server such as http://127.0.0.1:8000
+        max_workers: number of pages fetched concurrently
+        browser_fallback: load pages missing a marker with the browser
+        markers: substrings a page must contain to be used as served
+        """
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.browser_fallback = browser_fallback
+        self.markers = markers
+
+    def resolve_url(self, url):
+        """Return url moved onto base_url, or url itself without a base_url"""
+        if not self.base_url:
+            return url
+        base = urlsplit(self.base_url)
+        parts = urlsplit(url)
+        return urlunsplit(
+            (
+                base.scheme,
+                base.netloc,
+                base.path.rstrip("/") + parts.path,
+                parts.query,
+                parts.fragment,
+            )
+        )
+
+    def has_markers(self, html_content):
+        """Tell whether a served page holds everything the parser needs"""
+        return bool(html_content) and all(
+            marker in html_content for marker in self.markers
+        )
+
+    @profiler.timed("http_scraper.fetch_page")
+    def fetch_page(self, url):
+        """
+        Fetch one page over HTTP.
+
+        Returns:
+            str: HTML content, or None if the request failed
+        """
+        html_content = fetch(self.resolve_url(url))
+        if html_content:
+            profiler.add_bytes("http_scraper.fetch_page", len(html_content))
+        return html_content
+
+    def scrape(self, url):
+        """Scrape a single page, see scrape_pages"""
+        return self.scrape_pages([url])[0][1]
+
+    def scrape_pages(self, urls):
+        """
+        Fetch several pages concurrently, then load the incomplete ones with
+        a single browser session.
+
+        Returns:
+            list: (url, HTML content) tuples in the order of urls; the content
+                is None for a page that could not be fetched at all
+        """
+        urls = list(urls)
+        if not urls:
+            return []
+        workers = max(1, min(self.max_workers, len(urls)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pages = dict(zip(urls, executor.map(self.fetch_page, urls)))
+
+        incomplete = [url for url in urls if not self.has_markers(pages[url])]
+        if incomplete and self.browser_fallback:
+            print(
+                f"[WARNING] {len(incomplete)} page(s) lack the expected markup, "
+                "loading them with the browser."
+            )
+            try:
+                with HtmlScraper() as scraper:
+                    for url in incomplete:
+                        html_content = scraper.try_fetch_page(self.resolve_url(url))
+                        if html_content:
+                            pages[url] = html_content
+            except Exception as e:
+                print(f"[ERROR] Browser fallback failed: {e}")
+
+        return [(url, pages[url]) for url in urls]
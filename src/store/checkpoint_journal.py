@@ -0,0 +1,126 @@
+import json
+import os
+import re
+
+# Characters kept in journal file names, the rest become "_"
+_UNSAFE_NAME_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class CheckpointJournal:
+    """
+    Append-only JSONL log of the finished steps of a long-running job.
+
+    The first line names the job; every following line is one record, e.g. a
+    rendered question or a converted file, written and flushed as soon as the
+    step is done, so a run that dies loses at most the step in progress. A
+    journal reopened for the same job with resume keeps its records, otherwise
+    it starts over. A torn last line is dropped when reopening. Records are
+    not kept in memory: records() reads them back from the file.
+    """
+
+    def __init__(self, path, job, resume=False):
+        """
+        Open (or create) the journal of a job
+
+        Args:
+            path (str): Path to the JSONL file
+            job (str): Key of the job, e.g. the input hash and parser version;
+                records of another job are discarded
+            resume (bool): Keep the records of an earlier run of the same job
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.job = job
+        if resume and self._load():
+            self._file = open(path, "a", encoding="utf-8")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+            self._write({"job": job})
+
+    @staticmethod
+    def path_for(folder, name):
+        """Return the journal path of a job named name inside folder"""
+        return os.path.join(folder, _UNSAFE_NAME_CHARS.sub("_", name) + ".jsonl")
+
+    def _load(self):
+        """
+        Check that the journal exists and belongs to this job, and cut it after
+        its last complete record
+
+        Returns:
+            bool: True if the records of the journal can be resumed
+        """
+        try:
+            file = open(self.path, "rb")
+        except OSError:
+            return False
+        with file:
+            header = file.readline()
+            try:
+                if not header.endswith(b"\n") or json.loads(header).get("job") != self.job:
+                    return False
+            except (ValueError, AttributeError):
+                return False
+            valid_length = len(header)
+            # Only newline-terminated lines are complete: a partial last line is
+            # the one of a run killed mid-write
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    json.loads(line)
+                except ValueError:
+                    break
+                valid_length += len(line)
+            size = file.seek(0, os.SEEK_END)
+        if valid_length < size:
+            # Drop the partial line so that new records start on a line of their own
+            with open(self.path, "r+b") as file:
+                file.truncate(valid_length)
+        return True
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def append(self, kind, key, **data):
+        """
+        Record a finished step
+
+        Args:
+            kind (str): Type of step, e.g. "question" or "file"
+            key: Identifier of the step within its kind
+            **data: JSON-serialisable details, e.g. the rendered output
+        """
+        self._write({"kind": kind, "key": key, **data})
+
+    def records(self, kind):
+        """Yield the records of a kind, in the order they were written, read from the file"""
+        with open(self.path, "rb") as file:
+            file.readline()
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                record = json.loads(line)
+                if record["kind"] == kind:
+                    yield record
+
+    def completed(self, kind):
+        """Return the records of a kind keyed by their key; later records win"""
+        return {record["key"]: record for record in self.records(kind)}
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def discard(self):
+        """Close and delete the journal once its job has completed"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
@@ -1,5 +1,6 @@
 import json
-import os
+
+from .sinks import get_sink
 
 class DataStore:
     """
@@ -28,24 +29,28 @@ class DataStore:
             raise Exception(f"Error reading file {file_path}: {str(e)}")
     
     @staticmethod
-    def save_file(file_path, content, encoding='utf-8'):
+    def save_file(file_path, content, encoding='utf-8', sink=None):
         """
         Save content to a file
         
+        The content is written to a temporary file which then replaces file_path,
+        so a crash never leaves a half-written file behind.
+        
         Args:
             file_path (str): Path to the file
             content (str): Content to write
             encoding (str): File encoding, defaults to utf-8
+            sink (FileSink): Output sink, e.g. get_sink("gzip"), defaults to plain files
+            
+        Returns:
+            str: Path of the written file (with the sink suffix, e.g. ".gz")
             
         Raises:
             Exception: If there's an issue writing to the file
         """
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
-        
+        sink = sink or get_sink()
         try:
-            with open(file_path, 'w', encoding=encoding) as file:
-                file.write(content)
+            return sink.write(file_path, content, overwrite=True, encoding=encoding)
         except Exception as e:
             raise Exception(f"Error writing to file {file_path}: {str(e)}")
     
@@ -77,3 +82,54 @@ class DataStore:
         """
         json_content = json.dumps(data, indent=indent)
         DataStore.save_file(file_path, json_content, encoding)
+
+    @staticmethod
+    def save_questions(db_path, exam_info, questions):
+        """
+        Insert or update extracted questions in a SQLite question store
+
+        Args:
+            db_path (str): Path to the SQLite database file
+            exam_info (ExamInfo): Exam information
+            questions (iterable): Question records
+
+        Returns:
+            int: Number of questions inserted or changed
+        """
+        from .question_store import QuestionStore
+
+        with QuestionStore(db_path) as store:
+            return store.save_exam(exam_info, questions)
+
+    @staticmethod
+    def open_question_store(db_path):
+        """
+        Open a SQLite question store for queries or repeated writes
+
+        Args:
+            db_path (str): Path to the SQLite database file
+
+        Returns:
+            QuestionStore: Open store, to be closed by the caller
+        """
+        from .question_store import QuestionStore
+
+        return QuestionStore(db_path)
+
+    @staticmethod
+    def open_search_index(db_path):
+        """
+        Open the full-text search index of extracted questions
+
+        Args:
+            db_path (str): Path to the SQLite database file
+
+        Returns:
+            SearchIndex: Open index, to be closed by the caller
+
+        Raises:
+            RuntimeError: If the SQLite library was built without FTS5
+        """
+        from .search_index import SearchIndex
+
+        return SearchIndex(db_path)
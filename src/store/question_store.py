@@ -0,0 +1,524 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from src.models.question import Choice, Comment, Image, Question, VoteBar
+
+# Number of questions written per transaction
+DEFAULT_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS exams (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    title TEXT,
+    last_updated TEXT,
+    details TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS questions (
+    question_id TEXT PRIMARY KEY,
+    exam_id INTEGER NOT NULL REFERENCES exams (id),
+    number TEXT,
+    topic TEXT NOT NULL,
+    text TEXT NOT NULL,
+    images TEXT NOT NULL,
+    has_answer INTEGER NOT NULL,
+    correct_answer TEXT,
+    answer_images TEXT NOT NULL,
+    has_votes INTEGER NOT NULL,
+    most_voted TEXT,
+    most_voted_votes INTEGER,
+    content_hash TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS questions_exam_topic ON questions (exam_id, topic);
+CREATE INDEX IF NOT EXISTS questions_updated_at ON questions (updated_at);
+CREATE TABLE IF NOT EXISTS choices (
+    question_id TEXT NOT NULL REFERENCES questions (question_id),
+    position INTEGER NOT NULL,
+    letter TEXT NOT NULL,
+    text TEXT NOT NULL,
+    is_correct INTEGER NOT NULL,
+    images TEXT NOT NULL,
+    PRIMARY KEY (question_id, position)
+);
+CREATE TABLE IF NOT EXISTS votes (
+    question_id TEXT NOT NULL REFERENCES questions (question_id),
+    position INTEGER NOT NULL,
+    option TEXT NOT NULL,
+    votes INTEGER,
+    percentage INTEGER,
+    PRIMARY KEY (question_id, position)
+);
+CREATE TABLE IF NOT EXISTS comments (
+    question_id TEXT NOT NULL REFERENCES questions (question_id),
+    position INTEGER NOT NULL,
+    author TEXT NOT NULL,
+    votes INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (question_id, position)
+);
+"""
+
+_QUESTION_COLUMNS = (
+    "question_id, exam_id, number, topic, text, images, has_answer, correct_answer, "
+    "answer_images, has_votes, most_voted, most_voted_votes, content_hash, updated_at"
+)
+_ANSWER_LETTERS = re.compile(r"^[A-Z]+\b")
+
+
+def exam_key(exam_info):
+    """Return the key identifying an exam: its exam code, else its title"""
+    return exam_info.details.get("Exam Code") or exam_info.title or "unknown"
+
+
+def most_voted_option(votes):
+    """
+    Return the answer letters and vote count of the most voted bar
+
+    Args:
+        votes (list): VoteBar records, or None
+
+    Returns:
+        tuple: (letters, votes) such as ("B", 13), or (None, None) without votes
+    """
+    if not votes:
+        return None, None
+    top = max(
+        votes,
+        key=lambda bar: (
+            bar.votes if bar.votes is not None else -1,
+            bar.percentage if bar.percentage is not None else -1,
+        ),
+    )
+    match = _ANSWER_LETTERS.match(top.option.strip())
+    return (match.group(0) if match else top.option.strip()), top.votes
+
+
+def _to_timestamp(value):
+    """Convert a datetime, date, ISO 8601 string or epoch seconds to epoch seconds"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+    return value.timestamp()
+
+
+def _images_json(images):
+    return json.dumps([image.to_dict() for image in images], ensure_ascii=False)
+
+
+def _images_from_json(content):
+    return [Image.from_dict(image) for image in json.loads(content)]
+
+
+class QuestionStore:
+    """
+    SQLite store of extracted questions, keyed by their data-id.
+
+    Exams, questions, choices, vote bars and comments live in their own tables.
+    Questions are written with batched upserts; a question whose content did not
+    change keeps its rows and its updated_at time, so "updated since" queries
+    only return real changes.
+    """
+
+    def __init__(self, db_path, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Open (or create) the store database
+
+        Args:
+            db_path (str): Path to the SQLite database file
+            batch_size (int): Number of questions written per transaction
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        # Several processes may write to the store: wait for locks instead of
+        # failing, and use WAL so readers never block the writer
+        self._connection = sqlite3.connect(
+            db_path, timeout=30, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def save_exam(self, exam_info, questions, key=None):
+        """
+        Insert or update an exam and its questions
+
+        Args:
+            exam_info (ExamInfo): Exam information
+            questions (iterable): Question records; records without a question ID
+                cannot be keyed and are skipped
+            key (str): Exam key, defaults to exam_key(exam_info)
+
+        Returns:
+            int: Number of questions inserted or changed
+        """
+        key = key or exam_key(exam_info)
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO exams (key, title, last_updated, details, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET title = excluded.title,"
+                " last_updated = excluded.last_updated, details = excluded.details,"
+                " updated_at = excluded.updated_at",
+                (
+                    key,
+                    exam_info.title,
+                    exam_info.last_updated,
+                    json.dumps(exam_info.details, ensure_ascii=False),
+                    now,
+                ),
+            )
+            exam_id = self._connection.execute(
+                "SELECT id FROM exams WHERE key = ?", (key,)
+            ).fetchone()[0]
+
+        changed = 0
+        batch = []
+        for question in questions:
+            if not question.question_id:
+                continue
+            batch.append(question)
+            if len(batch) >= self.batch_size:
+                changed += self._upsert_questions(exam_id, batch)
+                batch = []
+        if batch:
+            changed += self._upsert_questions(exam_id, batch)
+        return changed
+
+    def _upsert_questions(self, exam_id, questions):
+        """Write a batch of questions in one transaction, skipping unchanged ones"""
+        # Later duplicates of a question ID win, as they would with one-by-one writes
+        by_id = {question.question_id: question for question in questions}
+        hashes = {
+            question_id: hashlib.sha256(
+                json.dumps(
+                    [exam_id, question.to_dict()], sort_keys=True, ensure_ascii=False
+                ).encode("utf-8")
+            ).hexdigest()
+            for question_id, question in by_id.items()
+        }
+        now = time.time()
+        with self._lock, self._connection:
+            placeholders = ", ".join("?" * len(by_id))
+            stored = dict(
+                self._connection.execute(
+                    "SELECT question_id, content_hash FROM questions"
+                    f" WHERE question_id IN ({placeholders})",
+                    list(by_id),
+                )
+            )
+            changed_ids = [
+                question_id
+                for question_id in by_id
+                if stored.get(question_id) != hashes[question_id]
+            ]
+            if not changed_ids:
+                return 0
+
+            question_rows = []
+            choice_rows = []
+            vote_rows = []
+            comment_rows = []
+            for question_id in changed_ids:
+                question = by_id[question_id]
+                most_voted, most_voted_votes = most_voted_option(question.votes)
+                question_rows.append(
+                    (
+                        question_id,
+                        exam_id,
+                        question.number,
+                        question.topic,
+                        question.text,
+                        _images_json(question.images),
+                        int(question.has_answer),
+                        question.correct_answer,
+                        _images_json(question.answer_images),
+                        int(question.votes is not None),
+                        most_voted,
+                        most_voted_votes,
+                        hashes[question_id],
+                        now,
+                    )
+                )
+                for position, choice in enumerate(question.choices):
+                    choice_rows.append(
+                        (
+                            question_id,
+                            position,
+                            choice.letter,
+                            choice.text,
+                            int(choice.is_correct),
+                            _images_json(choice.images),
+                        )
+                    )
+                for position, bar in enumerate(question.votes or []):
+                    vote_rows.append(
+                        (question_id, position, bar.option, bar.votes, bar.percentage)
+                    )
+                for position, comment in enumerate(question.comments):
+                    comment_rows.append(
+                        (
+                            question_id,
+                            position,
+                            comment.author,
+                            comment.votes,
+                            comment.content,
+                        )
+                    )
+
+            changed_placeholders = ", ".join("?" * len(changed_ids))
+            for table in ("choices", "votes", "comments"):
+                self._connection.execute(
+                    f"DELETE FROM {table} WHERE question_id IN ({changed_placeholders})",
+                    changed_ids,
+                )
+            self._connection.executemany(
+                f"INSERT INTO questions ({_QUESTION_COLUMNS})"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (question_id) DO UPDATE SET"
+                " exam_id = excluded.exam_id, number = excluded.number,"
+                " topic = excluded.topic, text = excluded.text,"
+                " images = excluded.images, has_answer = excluded.has_answer,"
+                " correct_answer = excluded.correct_answer,"
+                " answer_images = excluded.answer_images,"
+                " has_votes = excluded.has_votes, most_voted = excluded.most_voted,"
+                " most_voted_votes = excluded.most_voted_votes,"
+                " content_hash = excluded.content_hash,"
+                " updated_at = excluded.updated_at",
+                question_rows,
+            )
+            self._connection.executemany(
+                "INSERT INTO choices (question_id, position, letter, text, is_correct,"
+                " images) VALUES (?, ?, ?, ?, ?, ?)",
+                choice_rows,
+            )
+            self._connection.executemany(
+                "INSERT INTO votes (question_id, position, option, votes, percentage)"
+                " VALUES (?, ?, ?, ?, ?)",
+                vote_rows,
+            )
+            self._connection.executemany(
+                "INSERT INTO comments (question_id, position, author, votes, content)"
+                " VALUES (?, ?, ?, ?, ?)",
+                comment_rows,
+            )
+        return len(changed_ids)
+
+    def list_exams(self):
+        """
+        Returns:
+            list: Dicts with the key, title, last_updated and question count of each exam
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT e.key, e.title, e.last_updated, COUNT(q.question_id)"
+                " FROM exams e LEFT JOIN questions q ON q.exam_id = e.id"
+                " GROUP BY e.id ORDER BY e.key"
+            ).fetchall()
+        return [
+            {"key": key, "title": title, "last_updated": last_updated, "questions": count}
+            for key, title, last_updated, count in rows
+        ]
+
+    def get_question(self, question_id):
+        """Return one Question by its data-id, or None"""
+        questions = self._load_questions(
+            " WHERE q.question_id = ?", [question_id]
+        )
+        return questions[0] if questions else None
+
+    def find_questions(self, exam=None, topic=None, updated_since=None, limit=None):
+        """
+        Return the questions matching every given criterion
+
+        Args:
+            exam (str): Exam key (exam code or title)
+            topic (str): Topic, e.g. "Topic 2"
+            updated_since: Only questions inserted or changed at or after this
+                datetime, date, ISO 8601 string or epoch time
+            limit (int): Maximum number of questions
+
+        Returns:
+            list: Question records ordered by exam, topic and question number
+        """
+        clauses = []
+        params = []
+        if exam is not None:
+            clauses.append("e.key = ?")
+            params.append(exam)
+        if topic is not None:
+            clauses.append("q.topic = ?")
+            params.append(topic)
+        if updated_since is not None:
+            clauses.append("q.updated_at >= ?")
+            params.append(_to_timestamp(updated_since))
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        return self._load_questions(where, params, limit)
+
+    def most_voted_disagreements(self, exam=None, limit=50):
+        """
+        Return the questions whose most voted community answer differs from the
+        official one, most voted first
+
+        Args:
+            exam (str): Optional exam key
+            limit (int): Maximum number of rows
+
+        Returns:
+            list: Dicts with exam, question_id, number, topic, correct_answer,
+                most_voted and most_voted_votes
+        """
+        query = (
+            "SELECT e.key, q.question_id, q.number, q.topic, q.correct_answer,"
+            " q.most_voted, q.most_voted_votes"
+            " FROM questions q JOIN exams e ON e.id = q.exam_id"
+            " WHERE q.most_voted IS NOT NULL AND q.correct_answer IS NOT NULL"
+            " AND q.most_voted != q.correct_answer"
+        )
+        params = []
+        if exam is not None:
+            query += " AND e.key = ?"
+            params.append(exam)
+        query += " ORDER BY COALESCE(q.most_voted_votes, -1) DESC, q.question_id LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        columns = (
+            "exam",
+            "question_id",
+            "number",
+            "topic",
+            "correct_answer",
+            "most_voted",
+            "most_voted_votes",
+        )
+        return [dict(zip(columns, row)) for row in rows]
+
+    def vote_distributions(self, exam=None):
+        """
+        Return the vote bars of every question with votes, read in one query
+
+        Args:
+            exam (str): Optional exam key
+
+        Returns:
+            list: (exam, question_id, number, topic, correct_answer, bars) tuples,
+                bars being the (option, votes, percentage) of each bar in page order
+        """
+        query = (
+            "SELECT e.key, q.question_id, q.number, q.topic, q.correct_answer,"
+            " v.option, v.votes, v.percentage"
+            " FROM votes v JOIN questions q ON q.question_id = v.question_id"
+            " JOIN exams e ON e.id = q.exam_id"
+        )
+        params = []
+        if exam is not None:
+            query += " WHERE e.key = ?"
+            params.append(exam)
+        query += " ORDER BY v.question_id, v.position"
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+
+        distributions = []
+        current_id = None
+        for key, question_id, number, topic, correct_answer, option, votes, percentage in rows:
+            if question_id != current_id:
+                current_id = question_id
+                bars = []
+                distributions.append((key, question_id, number, topic, correct_answer, bars))
+            bars.append((option, votes, percentage))
+        return distributions
+
+    def _load_questions(self, where, params, limit=None):
+        """Load the questions selected by a WHERE clause, with their child rows"""
+        query = (
+            "SELECT q.question_id, q.number, q.topic, q.text, q.images, q.has_answer,"
+            " q.correct_answer, q.answer_images, q.has_votes"
+            " FROM questions q JOIN exams e ON e.id = q.exam_id"
+            + where
+            # Shorter first orders "Topic 2" before "Topic 10", "#9" before "#10"
+            + " ORDER BY e.key, LENGTH(q.topic), q.topic, LENGTH(q.number), q.number,"
+            " q.question_id"
+        )
+        if limit is not None:
+            query += " LIMIT ?"
+            params = list(params) + [limit]
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+            questions = {}
+            for (
+                question_id,
+                number,
+                topic,
+                text,
+                images,
+                has_answer,
+                correct_answer,
+                answer_images,
+                has_votes,
+            ) in rows:
+                questions[question_id] = Question(
+                    number=number,
+                    topic=topic,
+                    question_id=question_id,
+                    text=text,
+                    images=_images_from_json(images),
+                    has_answer=bool(has_answer),
+                    correct_answer=correct_answer,
+                    answer_images=_images_from_json(answer_images),
+                    votes=[] if has_votes else None,
+                )
+            self._load_children(questions)
+        return list(questions.values())
+
+    def _load_children(self, questions):
+        """Attach choices, vote bars and comments to loaded questions"""
+        ids = list(questions)
+        # Stay below SQLite's limit of bound parameters per statement
+        for start in range(0, len(ids), DEFAULT_BATCH_SIZE):
+            chunk = ids[start : start + DEFAULT_BATCH_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            for question_id, letter, text, is_correct, images in self._connection.execute(
+                "SELECT question_id, letter, text, is_correct, images FROM choices"
+                f" WHERE question_id IN ({placeholders}) ORDER BY question_id, position",
+                chunk,
+            ):
+                questions[question_id].choices.append(
+                    Choice(letter, text, bool(is_correct), _images_from_json(images))
+                )
+            for question_id, option, votes, percentage in self._connection.execute(
+                "SELECT question_id, option, votes, percentage FROM votes"
+                f" WHERE question_id IN ({placeholders}) ORDER BY question_id, position",
+                chunk,
+            ):
+                questions[question_id].votes.append(VoteBar(option, votes, percentage))
+            for question_id, author, votes, content in self._connection.execute(
+                "SELECT question_id, author, votes, content FROM comments"
+                f" WHERE question_id IN ({placeholders}) ORDER BY question_id, position",
+                chunk,
+            ):
+                questions[question_id].comments.append(Comment(author, votes, content))
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+
+# Default time to live of cached responses, in seconds (one day)
+DEFAULT_TTL = 24 * 60 * 60
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of HTTP response bodies keyed by an arbitrary string
+    """
+
+    def __init__(self, db_path, ttl=DEFAULT_TTL):
+        """
+        Open (or create) the cache database
+
+        Args:
+            db_path (str): Path to the SQLite database file
+            ttl (int): Number of seconds a cached response stays fresh
+        """
+        # Imported here so that reading DEFAULT_TTL at startup does not load SQLite
+        import sqlite3
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # The cache may be shared by several worker processes: wait for locks
+        # instead of failing, and use WAL so readers never block the writer
+        self._connection = sqlite3.connect(
+            db_path, timeout=30, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " body TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL)"
+            )
+
+    def get(self, key, ignore_ttl=False):
+        """
+        Return a cached response body
+
+        Args:
+            key (str): Cache key
+            ignore_ttl (bool): Return the body even if it is older than the TTL
+
+        Returns:
+            str: Cached body, or None if missing or expired
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        body, fetched_at = row
+        if not ignore_ttl and time.time() - fetched_at > self.ttl:
+            return None
+        return body
+
+    def set(self, key, body):
+        """Store a response body, replacing any previous one"""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, body, fetched_at) VALUES (?, ?, ?)",
+                (key, body, time.time()),
+            )
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._connection.close()
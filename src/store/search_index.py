@@ -0,0 +1,305 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from .question_store import DEFAULT_BATCH_SIZE, exam_key
+
+# Relative weight of each indexed column in the BM25 ranking
+COLUMN_WEIGHTS = {"topic": 2.0, "text": 1.0, "choices": 0.5, "comments": 0.25}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    question_id TEXT NOT NULL UNIQUE,
+    exam TEXT NOT NULL,
+    number TEXT,
+    topic TEXT NOT NULL,
+    source TEXT,
+    content_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_exam ON documents (exam);
+CREATE VIRTUAL TABLE IF NOT EXISTS postings USING fts5 (
+    topic, text, choices, comments,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+);
+"""
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+# Markdown image links; only their alt text is indexed, not the asset paths
+_IMAGE_LINK_PATTERN = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+
+
+def _searchable(text):
+    return _IMAGE_LINK_PATTERN.sub(r"\1", text or "")
+
+
+def _indexed_fields(question):
+    """Return the (topic, text, choices, comments) text indexed for a question"""
+    return (
+        question.topic or "",
+        _searchable(question.text),
+        "\n".join(_searchable(choice.text) for choice in question.choices),
+        "\n".join(comment.content for comment in question.comments),
+    )
+
+
+def match_expression(query):
+    """
+    Turn free text into an FTS5 query matching every word, e.g.
+    'blob "storage" tier' -> '"blob" "storage" "tier"'
+
+    Returns:
+        str: The query, or None if it has no words
+    """
+    tokens = _TOKEN_PATTERN.findall(query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"' for token in tokens)
+
+
+class SearchIndex:
+    """
+    Persistent full-text index of extracted questions, ranked with BM25.
+
+    Question topic, text, choices and top comments are indexed in an SQLite FTS5
+    table, whose inverted index keeps compressed posting lists on disk. Every
+    question is keyed by its data-id: indexing a page again only rewrites the
+    questions whose content changed, so the index grows page by page across all
+    mined exams. Each question remembers the output file it was written to.
+    """
+
+    def __init__(self, db_path, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Open (or create) the index database
+
+        Args:
+            db_path (str): Path to the SQLite database file
+            batch_size (int): Number of questions written per transaction
+
+        Raises:
+            RuntimeError: If the SQLite library was built without FTS5
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            db_path, timeout=30, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        try:
+            with self._lock, self._connection:
+                self._connection.executescript(_SCHEMA)
+        except sqlite3.OperationalError as e:
+            self._connection.close()
+            raise RuntimeError(f"The search index needs SQLite with FTS5: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_questions(self, exam_info, questions, source=None, key=None):
+        """
+        Index or re-index the questions of an exam
+
+        Args:
+            exam_info (ExamInfo): Exam information
+            questions (iterable): Question records; records without a question ID
+                cannot be keyed and are skipped
+            source (str): Output file the questions were written to
+            key (str): Exam key, defaults to the one of the question store
+
+        Returns:
+            int: Number of questions indexed or changed
+        """
+        writer = self.writer(exam_info, source, key)
+        for question in questions:
+            writer.add(question)
+        return writer.finish()
+
+    def writer(self, exam_info, source=None, key=None):
+        """
+        Return a SearchIndexWriter indexing questions one at a time, in batches,
+        e.g. while they are streamed to their output
+        """
+        return SearchIndexWriter(self, key or exam_key(exam_info), source)
+
+    def _write_batch(self, exam, questions, source):
+        """Write a batch of questions in one transaction, skipping unchanged ones"""
+        by_id = {question.question_id: question for question in questions}
+        documents = {}
+        for question_id, question in by_id.items():
+            fields = _indexed_fields(question)
+            content_hash = hashlib.sha256(
+                json.dumps([exam, question.number, fields], ensure_ascii=False).encode(
+                    "utf-8"
+                )
+            ).hexdigest()
+            documents[question_id] = (question, fields, content_hash)
+
+        changed = 0
+        with self._lock, self._connection:
+            placeholders = ", ".join("?" * len(by_id))
+            stored = {
+                question_id: (row_id, content_hash)
+                for row_id, question_id, content_hash in self._connection.execute(
+                    "SELECT id, question_id, content_hash FROM documents"
+                    f" WHERE question_id IN ({placeholders})",
+                    list(by_id),
+                )
+            }
+            for question_id, (question, fields, content_hash) in documents.items():
+                row_id, stored_hash = stored.get(question_id, (None, None))
+                if stored_hash == content_hash:
+                    if source is not None:
+                        self._connection.execute(
+                            "UPDATE documents SET source = ? WHERE id = ?", (source, row_id)
+                        )
+                    continue
+                if row_id is None:
+                    row_id = self._connection.execute(
+                        "INSERT INTO documents"
+                        " (question_id, exam, number, topic, source, content_hash)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        (question_id, exam, question.number, fields[0], source, content_hash),
+                    ).lastrowid
+                else:
+                    self._connection.execute(
+                        "UPDATE documents SET exam = ?, number = ?, topic = ?,"
+                        " source = COALESCE(?, source), content_hash = ? WHERE id = ?",
+                        (exam, question.number, fields[0], source, content_hash, row_id),
+                    )
+                    self._connection.execute(
+                        "DELETE FROM postings WHERE rowid = ?", (row_id,)
+                    )
+                self._connection.execute(
+                    "INSERT INTO postings (rowid, topic, text, choices, comments)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (row_id, *fields),
+                )
+                changed += 1
+        return changed
+
+    def set_source(self, question_ids, source):
+        """Record the output file the given questions were written to"""
+        question_ids = list(question_ids)
+        with self._lock, self._connection:
+            for start in range(0, len(question_ids), self.batch_size):
+                chunk = question_ids[start : start + self.batch_size]
+                self._connection.execute(
+                    "UPDATE documents SET source = ?"
+                    f" WHERE question_id IN ({', '.join('?' * len(chunk))})",
+                    [source, *chunk],
+                )
+
+    def search(self, query, exam=None, limit=20):
+        """
+        Return the questions best matching every word of a query
+
+        Args:
+            query (str): Free text; words are matched after stemming, in any order
+            exam (str): Optional exam key
+            limit (int): Maximum number of results
+
+        Returns:
+            list: Dicts with the question_id, exam, number, topic, source file,
+                BM25 score (higher is better) and a snippet of the best matching
+                field with the matched words in brackets, best match first
+        """
+        expression = match_expression(query)
+        if expression is None:
+            return []
+        weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS.values())
+        sql = (
+            "SELECT d.question_id, d.exam, d.number, d.topic, d.source,"
+            f" -bm25(postings, {weights}) AS score,"
+            " snippet(postings, -1, '[', ']', '...', 12)"
+            " FROM postings JOIN documents d ON d.id = postings.rowid"
+            " WHERE postings MATCH ?"
+        )
+        params = [expression]
+        if exam is not None:
+            sql += " AND d.exam = ?"
+            params.append(exam)
+        sql += f" ORDER BY bm25(postings, {weights}), d.question_id LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        columns = ("question_id", "exam", "number", "topic", "source", "score", "snippet")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def count(self):
+        """Return the number of indexed questions"""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def optimize(self):
+        """Merge the posting lists written by incremental updates into one segment"""
+        with self._lock, self._connection:
+            self._connection.execute("INSERT INTO postings (postings) VALUES ('optimize')")
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._connection.close()
+
+
+class SearchIndexWriter:
+    """
+    Indexes the questions of one exam as they come, batch_size at a time, e.g.
+    while they are streamed to their output. finish() writes the last batch and
+    records the output file of every question, known once the output is written.
+    """
+
+    def __init__(self, index, exam, source=None):
+        self.index = index
+        self.exam = exam
+        self.source = source
+        self.changed = 0
+        self.batches = 0
+        self.question_ids = []
+        self._pending = []
+
+    def add(self, question):
+        """Queue a question, writing the queue once it holds a full batch"""
+        if not question.question_id:
+            return
+        self._pending.append(question)
+        if len(self._pending) >= self.index.batch_size:
+            self._flush()
+
+    def add_indexed(self, question_id):
+        """
+        Count in a question indexed by an earlier run, e.g. one resumed from a
+        checkpoint journal, so that finish() records its output file too
+        """
+        if question_id:
+            self.question_ids.append(question_id)
+
+    def _flush(self):
+        if self._pending:
+            self.changed += self.index._write_batch(self.exam, self._pending, self.source)
+            self.question_ids.extend(question.question_id for question in self._pending)
+            self._pending = []
+            self.batches += 1
+
+    def finish(self, source=None):
+        """
+        Write the queued questions
+
+        Args:
+            source (str): Output file of every question added, if not known
+                when the writer was created
+
+        Returns:
+            int: Number of questions indexed or changed
+        """
+        self._flush()
+        if source is not None and source != self.source:
+            self.index.set_source(self.question_ids, source)
+        return self.changed
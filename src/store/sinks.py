@@ -0,0 +1,244 @@
+import contextlib
+import gzip
+import os
+import re
+import shutil
+import tempfile
+
+from src.utils.file_utils import DIR_MODE, FILE_MODE, atomic_write
+
+# Number of "_1", "_2", ... names tried before giving up on a free one
+MAX_UNIQUE_ATTEMPTS = 1000
+
+_QUESTION_ID_PATTERN = re.compile(r"^\*Question ID: (?P<id>[^*]+)\*", re.MULTILINE)
+
+
+def _unique_candidates(path, suffix=""):
+    """Yield path, then path with "_1", "_2", ... inserted before its extension"""
+    base = path[: -len(suffix)] if suffix and path.endswith(suffix) else path
+    stem, extension = os.path.splitext(base)
+    yield path
+    for counter in range(1, MAX_UNIQUE_ATTEMPTS):
+        yield f"{stem}_{counter}{extension}{suffix}"
+
+
+class FileSink:
+    """
+    Sink writing text to a single file.
+
+    Content is written to a temporary file in the target folder which is then
+    renamed over the target, so readers never see a half-written file. Without
+    overwrite, a free name is claimed with an exclusive create, so concurrent
+    writers never pick the same name.
+    """
+
+    name = "plain"
+    # Appended to the target path, e.g. ".gz"
+    suffix = ""
+
+    def target_path(self, path):
+        """Return the path actually written for path"""
+        return path + self.suffix
+
+    def write(self, path, content, overwrite=True, encoding="utf-8"):
+        """
+        Write content to path
+
+        Args:
+            path (str): Target path, before the sink suffix
+            content (str): Text to write
+            overwrite (bool): Replace an existing file instead of picking a new
+                "_1", "_2", ... name
+            encoding (str): Text encoding
+
+        Returns:
+            str: Path of the written file
+        """
+        return self.write_blocks(path, [content], overwrite, encoding)
+
+    def write_blocks(self, path, blocks, overwrite=True, encoding="utf-8", separator=""):
+        """
+        Write text blocks to path as they are produced, see write
+
+        Args:
+            separator (str): Text written between two blocks
+        """
+        target = self.target_path(path)
+        folder = os.path.dirname(os.path.abspath(target))
+        os.makedirs(folder, exist_ok=True)
+        if not overwrite:
+            target = self._claim_unique_path(target)
+
+        try:
+            with atomic_write(target) as raw, self._open_stream(raw) as stream:
+                encoded_separator = separator.encode(encoding)
+                for index, block in enumerate(blocks):
+                    if index and encoded_separator:
+                        stream.write(encoded_separator)
+                    stream.write(block.encode(encoding))
+        except BaseException:
+            if not overwrite and os.path.exists(target) and not os.path.getsize(target):
+                os.remove(target)
+            raise
+        return target
+
+    def _claim_unique_path(self, target):
+        """Create an empty placeholder at the first free name and return it"""
+        for candidate in _unique_candidates(target, self.suffix):
+            try:
+                fd = os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY, FILE_MODE)
+            except FileExistsError:
+                continue
+            os.close(fd)
+            return candidate
+        raise FileExistsError(
+            f"No free name for {target} after {MAX_UNIQUE_ATTEMPTS} attempts"
+        )
+
+    def _open_stream(self, raw):
+        """Wrap the raw temporary file, e.g. in a compressor"""
+        return contextlib.nullcontext(raw)
+
+
+class PlainSink(FileSink):
+    """Plain text files"""
+
+
+class GzipSink(FileSink):
+    """gzip-compressed files (.gz)"""
+
+    name = "gzip"
+    suffix = ".gz"
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def _open_stream(self, raw):
+        # mtime=0 keeps the output identical for identical content
+        return gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=self.level, mtime=0)
+
+
+class ZstdSink(FileSink):
+    """zstd-compressed files (.zst), requires the optional zstandard package"""
+
+    name = "zstd"
+    suffix = ".zst"
+
+    def __init__(self, level=3):
+        try:
+            import zstandard  # type: ignore
+        except ImportError:
+            raise ImportError(
+                "The zstd sink requires the zstandard package: pip install zstandard"
+            )
+        self._compressor = zstandard.ZstdCompressor(level=level)
+
+    def _open_stream(self, raw):
+        return self._compressor.stream_writer(raw, closefd=False)
+
+
+class QuestionDirectorySink(FileSink):
+    """
+    Directory with one markdown file per question.
+
+    A markdown target path with ".d" appended, e.g. exam_output.md.d, becomes a
+    directory holding 000-header.md with the exam information, then one
+    NNN-<question id>.md file per question in page order. The directory is
+    built next to the target and renamed into place. Its files are the blocks
+    given by the renderer, so markdown must be written with write_blocks.
+    Other outputs, e.g. JSON, have no question blocks and are written as plain
+    files.
+    """
+
+    name = "questions"
+    # Appended to markdown target paths, which become directories
+    dir_suffix = ".d"
+
+    @staticmethod
+    def _is_markdown(path):
+        return path.endswith(".md")
+
+    def target_path(self, path):
+        return path + self.dir_suffix if self._is_markdown(path) else path
+
+    def write(self, path, content, overwrite=True, encoding="utf-8"):
+        if self._is_markdown(path):
+            raise ValueError(
+                "The questions sink writes markdown from its question blocks: "
+                "use write_blocks"
+            )
+        return super().write(path, content, overwrite, encoding)
+
+    def write_blocks(self, path, blocks, overwrite=True, encoding="utf-8", separator=""):
+        if not self._is_markdown(path):
+            return super().write_blocks(path, blocks, overwrite, encoding, separator)
+        target = self.target_path(path)
+        parent = os.path.dirname(os.path.abspath(target))
+        os.makedirs(parent, exist_ok=True)
+        if not overwrite:
+            target = self._claim_unique_dir(target)
+
+        temp_dir = tempfile.mkdtemp(dir=parent, suffix=".part")
+        try:
+            for index, block in enumerate(blocks):
+                if index == 0:
+                    name = "000-header.md"
+                else:
+                    match = _QUESTION_ID_PATTERN.search(block)
+                    name = f"{index:03d}-{match.group('id').strip() if match else 'question'}.md"
+                with open(os.path.join(temp_dir, name), "w", encoding=encoding, newline="") as file:
+                    file.write(block)
+            os.chmod(temp_dir, DIR_MODE)
+            self._replace_dir(temp_dir, target)
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        return target
+
+    @staticmethod
+    def _replace_dir(temp_dir, target):
+        """Rename temp_dir to target, moving an existing target out of the way first"""
+        old_dir = None
+        if os.path.isdir(target):
+            old_dir = tempfile.mkdtemp(dir=os.path.dirname(target), suffix=".old")
+            os.rmdir(old_dir)
+            os.rename(target, old_dir)
+        os.rename(temp_dir, target)
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    def _claim_unique_dir(self, target):
+        """Create an empty directory at the first free name and return it"""
+        for candidate in _unique_candidates(target, self.dir_suffix):
+            try:
+                os.mkdir(candidate)
+            except FileExistsError:
+                continue
+            return candidate
+        raise FileExistsError(
+            f"No free name for {target} after {MAX_UNIQUE_ATTEMPTS} attempts"
+        )
+
+
+SINKS = {
+    sink.name: sink for sink in (PlainSink, GzipSink, ZstdSink, QuestionDirectorySink)
+}
+
+
+def get_sink(name="plain"):
+    """
+    Create the sink registered under name
+
+    Args:
+        name (str): "plain", "gzip", "zstd" or "questions"
+
+    Returns:
+        FileSink: New sink instance
+
+    Raises:
+        ValueError: If no sink has this name
+    """
+    try:
+        return SINKS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown output sink {name!r}, expected one of {sorted(SINKS)}")
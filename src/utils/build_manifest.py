@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import tempfile
+
+
+class BuildManifest:
+    """
+    Record of the inputs converted into an output folder.
+
+    For each input file the manifest keeps the hash of its content, the parser
+    version and backend that produced the outputs, and the path and content hash
+    of each output. Inputs whose record still matches, with outputs unchanged on
+    disk, are up to date and can be skipped; an output replaced since, e.g. by
+    an input of the same name in another folder, is rebuilt.
+    """
+
+    FILENAME = ".manifest.json"
+
+    def __init__(self, output_folder):
+        self.output_folder = output_folder
+        self.path = os.path.join(output_folder, self.FILENAME)
+        self.entries = self._load()
+
+    def _load(self):
+        """Read the manifest, starting over if it is missing or corrupt"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            return data.get("files", {}) if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def hash_file(file_path):
+        """Return the SHA-256 hex digest of a file's content"""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def hash_output(path):
+        """
+        Return the SHA-256 hex digest of an output: a file, or a directory
+        written by the questions sink, hashed by relative name and content
+        """
+        if not os.path.isdir(path):
+            return BuildManifest.hash_file(path)
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, path).encode("utf-8") + b"\0")
+                digest.update(BuildManifest.hash_file(file_path).encode("ascii"))
+        return digest.hexdigest()
+
+    def is_up_to_date(self, input_name, file_hash, parser_version, extensions):
+        """
+        Tell whether an input was already converted with the same content and parser
+
+        Args:
+            input_name (str): Absolute path of the input file
+            file_hash (str): Hash of the input content
+            parser_version (str): Version string of the parser that would run now
+            extensions (iterable): Output extensions that must exist, e.g. [".md"]
+
+        Returns:
+            bool: True if all outputs exist, were built from this exact input and
+                still have the content recorded for them
+        """
+        entry = self.entries.get(input_name)
+        if (
+            not entry
+            or entry.get("hash") != file_hash
+            or entry.get("parser_version") != parser_version
+        ):
+            return False
+        outputs = entry.get("outputs", {})
+        output_hashes = entry.get("output_hashes", {})
+        for extension in extensions:
+            if extension not in outputs or extension not in output_hashes:
+                return False
+            try:
+                if self.hash_output(outputs[extension]) != output_hashes[extension]:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def other_inputs(self, input_name, output_path):
+        """Return the other recorded inputs whose outputs include output_path"""
+        return [
+            name
+            for name, entry in self.entries.items()
+            if name != input_name and output_path in entry.get("outputs", {}).values()
+        ]
+
+    def record(self, input_name, file_hash, parser_version, outputs):
+        """
+        Record a converted input and persist the manifest
+
+        Args:
+            input_name (str): Absolute path of the input file
+            file_hash (str): Hash of the input content
+            parser_version (str): Version string of the parser that produced the outputs
+            outputs (dict): Mapping of output extension to output path
+        """
+        self.entries[input_name] = {
+            "hash": file_hash,
+            "parser_version": parser_version,
+            "outputs": dict(outputs),
+            "output_hashes": {
+                extension: self.hash_output(path) for extension, path in outputs.items()
+            },
+        }
+        self.save()
+
+    def save(self):
+        """Write the manifest atomically"""
+        os.makedirs(self.output_folder, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.output_folder, suffix=".part")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump({"files": self.entries}, file, indent=2)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
@@ -1,5 +1,45 @@
+import contextlib
 import os
-from store.data_store import DataStore
+import tempfile
+from src.utils.profiling import profiler
+
+# Permissions of written files and folders; mkstemp and mkdtemp create them
+# for the owner only, open() and makedirs() would honour the umask
+_umask = os.umask(0)
+os.umask(_umask)
+FILE_MODE = 0o666 & ~_umask
+DIR_MODE = 0o777 & ~_umask
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode="wb", folder=None, **kwargs):
+    """
+    Write to a temporary file next to path, renamed over path once complete,
+    so a crash never leaves a half-written file behind
+
+    Args:
+        path (str or callable): Destination, or a function returning it once the
+            content is written, e.g. a name derived from a hash of the content
+        mode (str): File mode, "wb" or "w"
+        folder (str): Folder of the temporary file, defaults to the one of path;
+            it must be on the file system of the destination
+        **kwargs: Arguments of os.fdopen, e.g. encoding
+
+    Yields:
+        file: The temporary file, removed if the block raises
+    """
+    if folder is None:
+        folder = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(dir=folder or ".", suffix=".part")
+    try:
+        with os.fdopen(fd, mode, **kwargs) as file:
+            yield file
+        os.chmod(temp_path, FILE_MODE)
+        os.replace(temp_path, path() if callable(path) else path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
 
 
 class FileUtils:
@@ -15,6 +55,12 @@ class FileUtils:
             os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "output"
         )
 
+    def get_cache_folder_path(self):
+        """Get the path to the cache folder"""
+        return os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "cache"
+        )
+
     def get_relative_path(self, absolute_path):
         """
         Convert absolute path to a relative path from the output folder
@@ -36,7 +82,17 @@ class FileUtils:
 
         return absolute_path
 
-    def save_output(self, content, filename=None, input_filename=None):
+    @profiler.timed("file_utils.save_output")
+    def save_output(
+        self,
+        content,
+        filename=None,
+        input_filename=None,
+        extension=".md",
+        output_folder=None,
+        overwrite=False,
+        sink=None,
+    ):
         """
         Save markdown content to output folder
 
@@ -44,8 +100,90 @@ class FileUtils:
             content (str): Content to save
             filename (str): Optional filename, defaults to input_filename + "_output.md"
             input_filename (str): Optional input filename to base output filename on
+            extension (str): Output file extension, defaults to ".md"
+            output_folder (str): Optional folder, defaults to the project output folder
+            overwrite (bool): Replace an existing file instead of picking a new
+                "_1", "_2", ... name
+            sink (FileSink): Output sink, e.g. get_sink("gzip"), defaults to plain files
+
+        Returns:
+            str: Path of the saved file
+
+        Raises:
+            OSError: If the output cannot be written
+        """
+        output_path = self._get_output_path(
+            filename, input_filename, extension, output_folder
+        )
+        if profiler.enabled:
+            profiler.add_bytes("file_utils.save_output", len(content.encode("utf-8")))
+
+        # Imported here: store.sinks imports atomic_write from this module
+        from store.sinks import get_sink
+
+        sink = sink or get_sink()
+        output_path = sink.write(output_path, content, overwrite=overwrite)
+        if not overwrite:
+            print(f"Output successfully saved to {output_path}")
+        return output_path
+
+    def save_output_stream(
+        self,
+        blocks,
+        filename=None,
+        input_filename=None,
+        sink=None,
+        output_folder=None,
+        overwrite=False,
+    ):
         """
-        output_folder = self.get_output_folder_path()
+        Save markdown blocks to output folder as they are produced
+
+        Args:
+            blocks (iterable): Markdown blocks, written separated by newlines
+            filename (str): Optional filename, defaults to input_filename + "_output.md"
+            input_filename (str): Optional input filename to base output filename on
+            sink (FileSink): Output sink, defaults to plain files
+            output_folder (str): Optional folder, defaults to the project output folder
+            overwrite (bool): Replace an existing file instead of picking a new
+                "_1", "_2", ... name
+
+        Returns:
+            str: Path of the saved file
+        """
+        output_path = self._get_output_path(
+            filename, input_filename, output_folder=output_folder
+        )
+
+        def counted(blocks):
+            for block in blocks:
+                if profiler.enabled:
+                    profiler.add_bytes("file_utils.save_output", len(block.encode("utf-8")))
+                yield block
+
+        # Imported here: store.sinks imports atomic_write from this module
+        from store.sinks import get_sink
+
+        sink = sink or get_sink()
+        output_path = sink.write_blocks(
+            output_path, counted(blocks), overwrite=overwrite, separator="\n"
+        )
+        if not overwrite:
+            print(f"Output successfully saved to {output_path}")
+        return output_path
+
+    def _get_output_path(
+        self,
+        filename=None,
+        input_filename=None,
+        extension=".md",
+        output_folder=None,
+    ):
+        """
+        Build the path in the output folder for the given names.
+        Sinks pick a free "_1", "_2", ... variant when the file must not be replaced.
+        """
+        output_folder = output_folder or self.get_output_folder_path()
 
         # Create output folder if it doesn't exist
         os.makedirs(output_folder, exist_ok=True)
@@ -55,28 +193,13 @@ class FileUtils:
             if input_filename:
                 # Extract base filename without extension
                 base_input = os.path.splitext(os.path.basename(input_filename))[0]
-                filename = f"{base_input}_output.md"
+                filename = f"{base_input}_output{extension}"
             else:
-                filename = "exam_output.md"
+                filename = f"exam_output{extension}"
 
-        # Make sure filename has .md extension
-        if not filename.endswith(".md"):
-            filename += ".md"
+        # Make sure filename has the expected extension
+        if not filename.endswith(extension):
+            filename += extension
 
         # Full path to output file
-        output_path = os.path.join(output_folder, filename)
-
-        # Check if file already exists and create unique filename
-        counter = 1
-        base_name, extension = os.path.splitext(filename)
-        while os.path.exists(output_path):
-            new_filename = f"{base_name}_{counter}{extension}"
-            output_path = os.path.join(output_folder, new_filename)
-            counter += 1
-
-        try:
-            # Use DataStore instead of direct file writing
-            DataStore.save_file(output_path, content, encoding="utf-8")
-            print(f"Output successfully saved to {output_path}")
-        except Exception as e:
-            print(f"Error saving output: {e}")
+        return os.path.join(output_folder, filename)
@@ -0,0 +1,399 @@
+import contextlib
+import email.utils
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from src.utils.profiling import profiler
+
+# Requests per second and burst size allowed per host; the rate halves on
+# throttling and climbs back by RATE_STEP per window of successful requests
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 16
+MIN_RATE = 0.5
+RATE_STEP = 1.0
+# Concurrent requests per host: starting point and bounds of the adaptive limit.
+# The start matches the discussion and image thread pools (8 threads each), so
+# they are not held back before the host shows any strain
+DEFAULT_CONCURRENCY = 8
+MIN_CONCURRENCY = 1
+# Matches the connection pool of the shared session
+MAX_CONCURRENCY = 16
+# Retries after the first attempt, and exponential backoff bounds in seconds
+DEFAULT_MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+# Longest Retry-After honoured, in seconds; longer pauses are capped to this
+MAX_RETRY_AFTER = 120.0
+# (connect, read) timeout in seconds of requests that do not set their own, so
+# that a stalled connection fails, is retried and frees its slot
+DEFAULT_TIMEOUT = (5, 30)
+
+# Statuses retried with backoff; 429 and 503 may carry a Retry-After header
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+# Latency smoothing factor, and how far above its best level latency may rise
+# before concurrency is reduced
+LATENCY_ALPHA = 0.2
+LATENCY_TOLERANCE = 2.0
+
+
+def parse_retry_after(value, now=None):
+    """
+    Convert a Retry-After header to seconds from now
+
+    Args:
+        value (str): Header value, either seconds or an HTTP date
+        now (float): Current time.time(), for testing
+
+    Returns:
+        float: Seconds to wait, or None if the value is missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - (time.time() if now is None else now))
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, maximum=BACKOFF_MAX):
+    """Exponential backoff with full jitter: uniform in [0, min(maximum, base * 2**attempt)]"""
+    return random.uniform(0, min(maximum, base * (2 ** attempt)))
+
+
+class HostLimiter:
+    """
+    Request budget of one host.
+
+    A token bucket bounds the request rate, and an adaptive limit bounds the
+    requests in flight: it grows by one after a full window of quick successful
+    requests and halves on throttling, server errors and connection failures
+    (additive increase, multiplicative decrease). A rise of the smoothed latency
+    well above its best level shrinks it by one. Throttling also halves the rate
+    of the bucket, which then climbs back towards its configured value, and a
+    Retry-After pause blocks every request to the host until it expires.
+    """
+
+    def __init__(
+        self,
+        rate=DEFAULT_RATE,
+        burst=DEFAULT_BURST,
+        concurrency=DEFAULT_CONCURRENCY,
+        min_concurrency=MIN_CONCURRENCY,
+        max_concurrency=MAX_CONCURRENCY,
+    ):
+        self.rate = rate
+        self.max_rate = rate
+        self.burst = burst
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.limit = max(min_concurrency, min(concurrency, max_concurrency))
+        self.in_flight = 0
+        self.latency = None
+        self.best_latency = None
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._successes = 0
+        self._slow = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Wait for a concurrency slot and a token, then take both"""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.in_flight >= self.limit:
+                    self._condition.wait()
+                    continue
+                wait = max(
+                    self._paused_until - now,
+                    (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0,
+                )
+                if wait <= 0:
+                    self._tokens -= 1
+                    self.in_flight += 1
+                    return
+                self._condition.wait(wait)
+
+    def release(self, latency=None, ok=True, throttled=False, retry_after=None):
+        """
+        Give back a slot and adapt the limits to the outcome of the request
+
+        Args:
+            latency (float): Seconds until the response arrived
+            ok (bool): False for throttling, server errors and connection failures
+            throttled (bool): The server answered 429 Too Many Requests
+            retry_after (float): Seconds the server asked to wait before retrying
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.rate = max(MIN_RATE, self.rate / 2)
+            if retry_after:
+                self._paused_until = max(
+                    self._paused_until, time.monotonic() + min(retry_after, MAX_RETRY_AFTER)
+                )
+            if not ok:
+                self.limit = max(self.min_concurrency, self.limit // 2)
+                self._successes = 0
+                self._slow = 0
+            elif latency is not None:
+                self._observe_latency(latency)
+            self._condition.notify_all()
+
+    def _observe_latency(self, latency):
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += LATENCY_ALPHA * (latency - self.latency)
+        if self.best_latency is None or self.latency < self.best_latency:
+            self.best_latency = self.latency
+
+        if self.latency > LATENCY_TOLERANCE * self.best_latency:
+            # The host slows down under load: shrink by one per window of slow
+            # requests, and let the reference drift so that a lasting change of
+            # latency is eventually accepted
+            self.best_latency += LATENCY_ALPHA**2 * (self.latency - self.best_latency)
+            self._successes = 0
+            self._slow += 1
+            if self._slow >= self.limit:
+                self.limit = max(self.min_concurrency, self.limit - 1)
+                self._slow = 0
+            return
+        self._slow = 0
+        self._successes += 1
+        if self._successes >= self.limit:
+            self.limit = min(self.max_concurrency, self.limit + 1)
+            self.rate = min(self.max_rate, self.rate + RATE_STEP)
+            self._successes = 0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def snapshot(self):
+        """Return the current limits, requests in flight and smoothed latency"""
+        with self._condition:
+            return {
+                "rate": self.rate,
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "latency": self.latency,
+                "paused_for": max(0.0, self._paused_until - time.monotonic()),
+            }
+
+
+class HttpClient:
+    """
+    Rate-limited, retrying HTTP client shared by every outbound request.
+
+    Requests go through the shared keep-alive session. Each host gets its own
+    HostLimiter; failed requests (connection errors, timeouts and
+    RETRY_STATUSES) are retried up to max_retries times after a Retry-After
+    pause or an exponential backoff with jitter. A request holds its slot until
+    its response arrives, or with stream() until its body has been read.
+    """
+
+    def __init__(
+        self,
+        session=None,
+        rate=DEFAULT_RATE,
+        burst=DEFAULT_BURST,
+        concurrency=DEFAULT_CONCURRENCY,
+        max_concurrency=MAX_CONCURRENCY,
+        max_retries=DEFAULT_MAX_RETRIES,
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        """
+        session: requests Session to send with, defaults to the shared one
+        rate: sustained requests per second per host
+        burst: requests a host may receive at once after an idle period
+        concurrency: initial number of concurrent requests per host
+        max_concurrency: upper bound of the adaptive concurrency
+        max_retries: retries after the first attempt
+        timeout: default (connect, read) timeout in seconds of every request
+        """
+        self._session = session
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            from src.utils.request_helpers import get_session
+
+            self._session = get_session()
+        return self._session
+
+    def limiter(self, url):
+        """Return the HostLimiter of the host of url"""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = HostLimiter(
+                    self.rate,
+                    self.burst,
+                    self.concurrency,
+                    max_concurrency=self.max_concurrency,
+                )
+                self._limiters[host] = limiter
+            return limiter
+
+    def get(self, url, **kwargs):
+        """Send a GET request, see request"""
+        return self.request("GET", url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request within the budget of its host, retrying failures
+
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            **kwargs: Passed on to requests.Session.request; timeout defaults
+                to the timeout of the client
+
+        Returns:
+            requests.Response: The first successful response, or the last one
+                once the retries are exhausted; callers check its status
+
+        Raises:
+            requests.exceptions.RequestException: If the last attempt failed
+                without a response
+        """
+        return self._send(method, url, **kwargs)[0]
+
+    @contextlib.contextmanager
+    def stream(self, url, method="GET", **kwargs):
+        """
+        Send a streamed request, see request, and keep its slot of the host
+        budget while the body is read: the slot is given back and the response
+        closed when the with block exits.
+
+        Yields:
+            requests.Response: The response, with its body not yet read
+        """
+        response, latency, held = self._send(method, url, hold=True, stream=True, **kwargs)
+        try:
+            yield response
+        finally:
+            try:
+                response.close()
+            finally:
+                if held:
+                    self.limiter(url).release(latency)
+
+    def _send(self, method, url, hold=False, **kwargs):
+        """
+        Send a request with retries
+
+        Returns:
+            tuple: (response, latency in seconds, whether the slot is still held);
+                with hold, a successful response keeps its slot for the caller
+                to release
+        """
+        import requests
+
+        kwargs.setdefault("timeout", self.timeout)
+        limiter = self.limiter(url)
+        attempt = 0
+        while True:
+            limiter.acquire()
+            start = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                limiter.release(ok=False)
+                if attempt >= self.max_retries:
+                    raise
+                self._backoff(backoff_delay(attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                limiter.release()
+                raise
+
+            latency = time.monotonic() - start
+            if response.status_code not in RETRY_STATUSES:
+                if hold:
+                    return response, latency, True
+                limiter.release(latency)
+                return response, latency, False
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            limiter.release(
+                latency,
+                ok=False,
+                throttled=response.status_code == 429,
+                retry_after=retry_after,
+            )
+            if attempt >= self.max_retries:
+                return response, latency, False
+            response.close()
+            # After a Retry-After the host limiter holds every request back, a
+            # short jitter is enough to spread the retries of the waiting threads
+            self._backoff(backoff_delay(attempt if retry_after is None else 0))
+            attempt += 1
+
+    @staticmethod
+    def _backoff(delay):
+        with profiler.stage("http_client.backoff"):
+            time.sleep(delay)
+
+    def snapshot(self):
+        """Return the limiter state of every host contacted so far"""
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {host: limiter.snapshot() for host, limiter in limiters.items()}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def configure_client(**kwargs):
+    """
+    Replace the process-wide HttpClient, e.g. with limits from the command line
+
+    Args:
+        **kwargs: HttpClient arguments, such as rate and concurrency
+
+    Returns:
+        HttpClient: The new shared client
+    """
+    global _client
+    with _client_lock:
+        _client = HttpClient(**kwargs)
+    return _client
+
+
+def get_client():
+    """
+    Return the process-wide HttpClient, so every caller shares the budget of
+    each host
+
+    Returns:
+        HttpClient: Shared client
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from src.utils.file_utils import atomic_write
+
+
+class ImageCache:
+    """
+    Persistent, content-addressed cache of downloaded images.
+
+    Images are stored in the cache folder under a name derived from their content
+    hash, so two different images sharing a basename never overwrite each other.
+    A small JSON index maps every image URL to its file and to the ETag and
+    Last-Modified values returned by the server, which lets later runs skip the
+    network entirely or send a conditional request.
+    """
+
+    INDEX_FILENAME = ".image_index.json"
+
+    def __init__(self, cache_folder):
+        self.cache_folder = cache_folder
+        self.index_path = os.path.join(cache_folder, self.INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries = self._load_index()
+
+    def _load_index(self):
+        """Read the index from disk, ignoring a missing or corrupt file"""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                entries = json.load(file)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get_path(self, image_url):
+        """
+        Return the local path of a cached image.
+
+        Returns:
+            str: Path to the cached file, or None if the URL is not cached
+        """
+        with self._lock:
+            entry = self._entries.get(image_url)
+        if not entry:
+            return None
+        path = os.path.join(self.cache_folder, entry["file"])
+        return path if os.path.exists(path) else None
+
+    def get_validators(self, image_url):
+        """
+        Return the conditional request headers for a cached image.
+
+        Returns:
+            dict: If-None-Match / If-Modified-Since headers (empty if unknown)
+        """
+        if self.get_path(image_url) is None:
+            return {}
+        with self._lock:
+            entry = self._entries[image_url]
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def mark_revalidated(self, image_url):
+        """Record that the server confirmed the cached copy is still current"""
+        with self._lock:
+            self._entries[image_url]["checked_at"] = time.time()
+            self._dirty = True
+
+    def store(self, image_url, chunks, etag=None, last_modified=None):
+        """
+        Write an image to the cache under its content-hashed name.
+
+        Args:
+            image_url (str): URL the image was downloaded from
+            chunks (iterable): Image content as an iterable of bytes
+            etag (str): ETag response header, if any
+            last_modified (str): Last-Modified response header, if any
+
+        Returns:
+            str: Local path to the cached image
+        """
+        os.makedirs(self.cache_folder, exist_ok=True)
+        digest = hashlib.sha256()
+
+        def cached_path():
+            filename = self._hashed_filename(image_url, digest.hexdigest())
+            return os.path.join(self.cache_folder, filename)
+
+        with atomic_write(cached_path, folder=self.cache_folder) as file:
+            for chunk in chunks:
+                if chunk:
+                    digest.update(chunk)
+                    file.write(chunk)
+        filename = self._hashed_filename(image_url, digest.hexdigest())
+
+        with self._lock:
+            self._entries[image_url] = {
+                "file": filename,
+                "etag": etag,
+                "last_modified": last_modified,
+                "checked_at": time.time(),
+            }
+            self._dirty = True
+        return os.path.join(self.cache_folder, filename)
+
+    def flush(self):
+        """Persist the index if it changed, merging entries written by other processes"""
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = self._load_index()
+            entries.update(self._entries)
+            self._entries = entries
+            os.makedirs(self.cache_folder, exist_ok=True)
+            with atomic_write(self.index_path, "w", encoding="utf-8") as file:
+                json.dump(entries, file)
+            self._dirty = False
+
+    @staticmethod
+    def _hashed_filename(image_url, hexdigest):
+        """Build '<basename>-<hash><ext>' so files stay recognisable but never collide"""
+        basename = os.path.basename(urlparse(image_url).path) or "image"
+        stem, extension = os.path.splitext(basename)
+        return f"{stem}-{hexdigest[:16]}{extension}"
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_image_cache(cache_folder):
+    """Return the shared ImageCache for a folder"""
+    key = os.path.abspath(cache_folder)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = ImageCache(cache_folder)
+        return cache
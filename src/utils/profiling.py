@@ -0,0 +1,82 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Profiler:
+    """
+    Lightweight per-stage timers and byte counters.
+
+    Disabled by default, in which case stages cost a single attribute check.
+    Stages may be entered from several threads; nested stages are timed
+    independently, so a parent stage includes the time of its children.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    @contextmanager
+    def stage(self, name, nbytes=0):
+        """Time the enclosed block under the given stage name"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - start, nbytes, calls=1)
+
+    def timed(self, name):
+        """Decorator timing every call of a function under the given stage name"""
+
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with self.stage(name):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def add_bytes(self, name, nbytes):
+        """Count bytes handled by a stage"""
+        if self.enabled:
+            self._record(name, 0.0, nbytes, calls=0)
+
+    def _record(self, name, seconds, nbytes, calls):
+        with self._lock:
+            stats = self._stats.setdefault(name, {"calls": 0, "seconds": 0.0, "bytes": 0})
+            stats["calls"] += calls
+            stats["seconds"] += seconds
+            stats["bytes"] += nbytes
+
+    def merge(self, summary):
+        """Add the stats of another profiler, e.g. one from a worker process"""
+        for name, stats in summary.items():
+            self._record(name, stats["seconds"], stats["bytes"], stats["calls"])
+
+    def summary(self):
+        """
+        Return the collected stats
+
+        Returns:
+            dict: Stage name -> {"calls": int, "seconds": float, "bytes": int}
+        """
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def reset(self):
+        """Forget all collected stats"""
+        with self._lock:
+            self._stats = {}
+
+
+# Shared profiler of the process
+profiler = Profiler()
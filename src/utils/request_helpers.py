@@ -1,24 +1,73 @@
-import requests
 import os
-import requests
-from urllib.parse import urlparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.http_client import get_client
+from src.utils.image_cache import get_image_cache
+from src.utils.profiling import profiler
+
+# Size of the shared keep-alive connection pool and of the image download pool
+DEFAULT_POOL_SIZE = 16
+DEFAULT_IMAGE_WORKERS = 8
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return the process-wide requests Session.
+
+    The session keeps connections alive between requests so repeated calls to
+    the same host reuse the TLS handshake instead of paying for a new one.
+
+    Returns:
+        requests.Session: Shared session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                # requests is only imported once something goes to the network
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=DEFAULT_POOL_SIZE, pool_maxsize=DEFAULT_POOL_SIZE
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
 
 def fetch(url):
+    import requests
+
     try:
-        response = requests.get(url)
+        response = get_client().get(url)
         response.raise_for_status()  # Raise an error for bad responses
         return response.text
     except requests.exceptions.RequestException as e:
         print(f"An error occurred while fetching the URL: {e}")
         return None
 
-def download_image(image_url, save_folder='assets'):
+@profiler.timed("download_image")
+def download_image(image_url, save_folder='assets', revalidate=False, flush_cache=True):
     """
     Download an image from a URL and save it to the specified folder.
+
+    Images are kept in a content-addressed cache inside the folder. A cached image
+    is returned without touching the network unless revalidate is set, in which
+    case a conditional request is sent and the body is only downloaded again if
+    the server reports a change.
     
     Args:
         image_url (str): URL of the image to download
         save_folder (str): Folder where the image will be saved
+        revalidate (bool): Check cached images against the server
+        flush_cache (bool): Persist the cache index after the download
             
     Returns:
         str: Local path to the saved image, or original URL if download failed
@@ -26,27 +75,78 @@ def download_image(image_url, save_folder='assets'):
 
     # Ensure the save folder exists
     os.makedirs(save_folder, exist_ok=True)
+    cache = get_image_cache(save_folder)
+
+    cached_path = cache.get_path(image_url)
+    if cached_path and not revalidate:
+        return cached_path
     
     try:
-        # Extract image filename from URL
-        parsed_url = urlparse(image_url)
-        image_filename = os.path.basename(parsed_url.path)
-        
-        # Full path to save the image
-        save_path = os.path.join(save_folder, image_filename)
-        
-        # Download the image with certificate verification disabled
-        response = requests.get(image_url, stream=True, verify=False)
-        response.raise_for_status()
-        
-        # Save the image to disk
-        with open(save_path, 'wb') as file:
-            for chunk in response.iter_content(chunk_size=8192):
-                file.write(chunk)
+        # Download the image with certificate verification disabled,
+        # sending the cached validators so an unchanged image costs no body;
+        # the host slot is held until the body has been read in the block
+        with get_client().stream(
+            image_url,
+            verify=False,
+            headers=cache.get_validators(image_url),
+        ) as response:
+            if response.status_code == 304 and cached_path:
+                cache.mark_revalidated(image_url)
+                return cached_path
+            response.raise_for_status()
+
+            # Save the image to disk under its content hash
+            save_path = cache.store(
+                image_url,
+                response.iter_content(chunk_size=8192),
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+            )
         
+        profiler.add_bytes("download_image", os.path.getsize(save_path))
+
         # Return the local path to use in markdown
         return save_path
     except Exception as e:
         print(f"Failed to download image from {image_url}: {e}")
-        # Return original URL if download fails
-        return image_url
\ No newline at end of file
+        # Fall back to a stale cached copy, then to the original URL
+        return cached_path or image_url
+    finally:
+        if flush_cache:
+            cache.flush()
+
+
+def download_images(
+    image_urls, save_folder='assets', max_workers=DEFAULT_IMAGE_WORKERS, revalidate=False
+):
+    """
+    Download several images concurrently over the shared session.
+
+    Duplicate URLs are fetched only once.
+
+    Args:
+        image_urls (iterable): URLs of the images to download
+        save_folder (str): Folder where the images will be saved
+        max_workers (int): Maximum number of concurrent downloads
+        revalidate (bool): Check cached images against the server
+
+    Returns:
+        dict: Mapping of image URL to local path (or original URL if the download failed)
+    """
+    unique_urls = list(dict.fromkeys(image_urls))
+    if not unique_urls:
+        return {}
+
+    os.makedirs(save_folder, exist_ok=True)
+    workers = max(1, min(max_workers, len(unique_urls)))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            local_paths = executor.map(
+                lambda url: download_image(
+                    url, save_folder, revalidate=revalidate, flush_cache=False
+                ),
+                unique_urls,
+            )
+            return dict(zip(unique_urls, local_paths))
+    finally:
+        get_image_cache(save_folder).flush()
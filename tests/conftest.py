@@ -0,0 +1,137 @@
+import os
+import sys
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Like src/main.py, make the project root and the packages under src importable.
+# src goes last: its cmd package would shadow the standard library one pytest uses
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+SRC = os.path.join(PROJECT_ROOT, "src")
+if SRC not in sys.path:
+    sys.path.append(SRC)
+
+
+@pytest.fixture
+def http_server():
+    """
+    Serve files on localhost from a dict of path -> body (str or bytes).
+
+    A path with an entry in etags is served with that ETag, and answered with
+    304 Not Modified when the request carries it in If-None-Match.
+
+    Yields:
+        SimpleNamespace: url (http://127.0.0.1:<port>), pages and etags to
+            fill, and requested, the list of requested paths
+    """
+    server_state = types.SimpleNamespace(url=None, pages={}, etags={}, requested=[])
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            server_state.requested.append(self.path)
+            body = server_state.pages.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            etag = server_state.etags.get(self.path)
+            if etag is not None and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            content = body.encode("utf-8") if isinstance(body, str) else body
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(content)))
+            if etag is not None:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server_state.url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    try:
+        yield server_state
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def project_dirs(tmp_path, monkeypatch):
+    """
+    Move the assets, output and cache folders of FileUtils into tmp_path.
+
+    Returns:
+        SimpleNamespace: The assets, output and cache folder paths
+    """
+    from src.utils import file_utils as src_file_utils
+    from utils import file_utils
+
+    folders = types.SimpleNamespace(
+        assets=str(tmp_path / "assets"),
+        output=str(tmp_path / "output"),
+        cache=str(tmp_path / "cache"),
+    )
+    # The CLI imports FileUtils as utils.file_utils, the parsers as src.utils.file_utils
+    for module in (file_utils, src_file_utils):
+        monkeypatch.setattr(
+            module.FileUtils, "get_assets_folder_path", lambda self: folders.assets
+        )
+        monkeypatch.setattr(
+            module.FileUtils, "get_output_folder_path", lambda self: folders.output
+        )
+        monkeypatch.setattr(
+            module.FileUtils, "get_cache_folder_path", lambda self: folders.cache
+        )
+    return folders
+
+
+@pytest.fixture
+def stubbed_network():
+    """Replace image downloads and discussion fetches with local stubs"""
+    from benchmarks.bench_parse import stub_network
+
+    with stub_network():
+        yield
+
+
+@pytest.fixture
+def cli_args():
+    """
+    Return a factory of command line namespaces with the defaults of a run
+    without cache or search index, e.g. cli_args(json=True)
+    """
+
+    def make(**overrides):
+        args = dict(
+            json=False,
+            db=None,
+            sink="plain",
+            parser="lxml",
+            resume=False,
+            no_cache=True,
+            offline=False,
+            cache_ttl=1,
+            force=False,
+            workers=1,
+            timings=False,
+            timings_json=None,
+            profile=None,
+            index=None,
+            no_index=True,
+        )
+        args.update(overrides)
+        return types.SimpleNamespace(**args)
+
+    return make
@@ -0,0 +1,115 @@
+import os
+
+from benchmarks.synthetic_pages import generate_exam_page
+from src.cmd import cli
+from utils.build_manifest import BuildManifest
+
+PARSER_VERSION = "1/lxml"
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+    return path
+
+
+def up_to_date(
+    manifest,
+    input_name="/in/page.html",
+    file_hash="hash-1",
+    parser_version=PARSER_VERSION,
+    extensions=(".md",),
+):
+    return manifest.is_up_to_date(input_name, file_hash, parser_version, extensions)
+
+
+def recorded_manifest(tmp_path):
+    """Return a manifest recording page.html converted into page_output.md"""
+    output_folder = str(tmp_path / "output")
+    output = write(os.path.join(output_folder, "page_output.md"), "# Page\n")
+    manifest = BuildManifest(output_folder)
+    manifest.record("/in/page.html", "hash-1", PARSER_VERSION, {".md": output})
+    return manifest, output
+
+
+def test_recorded_input_is_up_to_date(tmp_path):
+    manifest, _ = recorded_manifest(tmp_path)
+
+    assert up_to_date(manifest)
+
+
+def test_changed_input_parser_or_outputs_are_rebuilt(tmp_path):
+    manifest, _ = recorded_manifest(tmp_path)
+
+    assert not up_to_date(manifest, input_name="/in/other.html")
+    assert not up_to_date(manifest, file_hash="hash-2")
+    assert not up_to_date(manifest, parser_version="2/lxml")
+    assert not up_to_date(manifest, extensions=[".md", ".json"])
+
+
+def test_edited_or_deleted_output_is_rebuilt(tmp_path):
+    manifest, output = recorded_manifest(tmp_path)
+
+    write(output, "# Replaced by another input\n")
+    assert not up_to_date(manifest)
+
+    os.remove(output)
+    assert not up_to_date(manifest)
+
+
+def test_directory_output_is_hashed_by_content(tmp_path):
+    output_folder = str(tmp_path / "output")
+    output = os.path.join(output_folder, "page_output.md.d")
+    write(os.path.join(output, "000-header.md"), "# Page\n")
+    write(os.path.join(output, "001-1.md"), "## Question #1 (Topic 1)\n")
+    manifest = BuildManifest(output_folder)
+    manifest.record("/in/page.html", "hash-1", PARSER_VERSION, {".md": output})
+    assert up_to_date(manifest)
+
+    write(os.path.join(output, "001-1.md"), "## Question #1 (Topic 2)\n")
+    assert not up_to_date(manifest)
+
+
+def test_manifest_is_persisted_and_survives_corruption(tmp_path):
+    manifest, output = recorded_manifest(tmp_path)
+
+    reloaded = BuildManifest(manifest.output_folder)
+    assert up_to_date(reloaded)
+    assert reloaded.other_inputs("/in/copy.html", output) == ["/in/page.html"]
+
+    write(manifest.path, '{"files": {')
+    assert BuildManifest(manifest.output_folder).entries == {}
+
+
+def test_process_folder_only_converts_changed_files(
+    tmp_path, project_dirs, stubbed_network, cli_args
+):
+    folder = str(tmp_path / "pages")
+    for page in (1, 2, 3):
+        write(
+            os.path.join(folder, f"az-204-{page}.html"),
+            generate_exam_page(3, images=False, seed=page),
+        )
+    args = cli_args()
+
+    assert cli.process_folder(folder, project_dirs.output, args) == 3
+    assert cli.process_folder(folder, project_dirs.output, args) == 0
+
+    write(
+        os.path.join(folder, "az-204-2.html"),
+        generate_exam_page(4, images=False, seed=2),
+    )
+    assert cli.process_folder(folder, project_dirs.output, args) == 1
+
+    # An output changed on disk is rebuilt even though its input did not change
+    write(os.path.join(project_dirs.output, "az-204-3_output.md"), "# Edited\n")
+    assert cli.process_folder(folder, project_dirs.output, args) == 1
+    output = os.path.join(project_dirs.output, "az-204-3_output.md")
+    with open(output, encoding="utf-8") as file:
+        assert file.read() != "# Edited\n"
+
+    assert cli.process_folder(folder, project_dirs.output, cli_args(force=True)) == 3
+    # JSON outputs are not recorded yet, so --json converts every file again
+    assert cli.process_folder(folder, project_dirs.output, cli_args(json=True)) == 3
+    assert cli.process_folder(folder, project_dirs.output, cli_args(json=True)) == 0
@@ -0,0 +1,206 @@
+import os
+import sqlite3
+
+import pytest
+
+from benchmarks.synthetic_pages import generate_exam_page
+from src.cmd import cli
+from store.checkpoint_journal import CheckpointJournal
+from store.search_index import SearchIndex
+
+NUM_QUESTIONS = 30
+INPUT_FILENAME = "az-204-1.html"
+
+
+def read(path):
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+
+# CheckpointJournal
+
+
+def test_records_are_read_back_in_order(tmp_path):
+    path = str(tmp_path / "job.jsonl")
+    with CheckpointJournal(path, "job-1") as journal:
+        journal.append("file", "a.html", hash="1")
+        journal.append("question", 0, block="## 1")
+        journal.append("file", "a.html", hash="2")
+
+        assert [record["hash"] for record in journal.records("file")] == ["1", "2"]
+        assert journal.completed("file") == {
+            "a.html": {"kind": "file", "key": "a.html", "hash": "2"}
+        }
+
+
+def test_resume_keeps_records_of_the_same_job_only(tmp_path):
+    path = str(tmp_path / "job.jsonl")
+    with CheckpointJournal(path, "job-1") as journal:
+        journal.append("question", 0, block="## 1")
+
+    with CheckpointJournal(path, "job-1", resume=True) as journal:
+        assert list(journal.completed("question")) == [0]
+        journal.append("question", 1, block="## 2")
+    with CheckpointJournal(path, "job-1", resume=True) as journal:
+        assert list(journal.completed("question")) == [0, 1]
+
+    with CheckpointJournal(path, "job-2", resume=True) as journal:
+        assert journal.completed("question") == {}
+    with CheckpointJournal(path, "job-2") as journal:
+        journal.append("question", 0, block="## 1")
+    with CheckpointJournal(path, "job-2", resume=False) as journal:
+        assert journal.completed("question") == {}
+
+
+def test_torn_last_line_is_dropped(tmp_path):
+    path = str(tmp_path / "job.jsonl")
+    with CheckpointJournal(path, "job-1") as journal:
+        journal.append("question", 0, block="## 1")
+    with open(path, "a", encoding="utf-8") as file:
+        file.write('{"kind": "question", "key": 1, "blo')
+
+    with CheckpointJournal(path, "job-1", resume=True) as journal:
+        assert list(journal.completed("question")) == [0]
+        journal.append("question", 1, block="## 2")
+        assert list(journal.completed("question")) == [0, 1]
+
+
+def test_discard_deletes_the_journal(tmp_path):
+    path = str(tmp_path / "job.jsonl")
+    journal = CheckpointJournal(path, "job-1")
+    journal.discard()
+
+    assert not os.path.exists(path)
+
+
+# Resuming convert_and_save
+
+
+class Interrupted(Exception):
+    """Stands in for a run killed while rendering a question"""
+
+
+@pytest.fixture
+def page(project_dirs, stubbed_network):
+    return generate_exam_page(NUM_QUESTIONS, images=False)
+
+
+def make_parser(args):
+    return cli.create_html_parser(args, show_progress=False)
+
+
+def interrupted_run(monkeypatch, args, html_content, after):
+    """Run convert_and_save, failing while rendering question number after + 1"""
+    parser = make_parser(args)
+    render_question = parser.renderer.render_question
+    rendered = []
+
+    def render_until_interrupted(question):
+        if len(rendered) == after:
+            raise Interrupted()
+        rendered.append(question)
+        return render_question(question)
+
+    monkeypatch.setattr(parser.renderer, "render_question", render_until_interrupted)
+    with pytest.raises(Interrupted):
+        cli.convert_and_save(parser, html_content, INPUT_FILENAME, args)
+
+
+def counted_run(monkeypatch, args, html_content):
+    """
+    Run convert_and_save
+
+    Returns:
+        tuple: (markdown output path, number of question cards extracted)
+    """
+    parser = make_parser(args)
+    processor = parser.question_processor
+    extract_question = processor.extract_question
+    extracted = []
+
+    def counting_extract_question(*arguments, **kwargs):
+        extracted.append(1)
+        return extract_question(*arguments, **kwargs)
+
+    monkeypatch.setattr(processor, "extract_question", counting_extract_question)
+    output = cli.convert_and_save(parser, html_content, INPUT_FILENAME, args)
+    return output, len(extracted)
+
+
+def journal_path(project_dirs):
+    return CheckpointJournal.path_for(
+        os.path.join(project_dirs.cache, "checkpoints"), f"page-{INPUT_FILENAME}"
+    )
+
+
+def test_resume_replays_journaled_questions(
+    monkeypatch, page, project_dirs, cli_args
+):
+    reference, _ = counted_run(monkeypatch, cli_args(json=True), page)
+    interrupted_run(monkeypatch, cli_args(json=True), page, after=12)
+    assert os.path.exists(journal_path(project_dirs))
+    # A run killed mid-write leaves a partial record behind
+    with open(journal_path(project_dirs), "a", encoding="utf-8") as file:
+        file.write('{"kind": "question", "key": 12, "blo')
+
+    args = cli_args(json=True, resume=True)
+    output, extracted = counted_run(monkeypatch, args, page)
+
+    assert extracted == NUM_QUESTIONS - 12
+    assert read(output) == read(reference)
+    assert read(os.path.splitext(output)[0] + ".json") == read(
+        os.path.splitext(reference)[0] + ".json"
+    )
+    assert not os.path.exists(journal_path(project_dirs))
+
+
+def test_resume_without_records_skips_the_journaled_questions(
+    monkeypatch, page, cli_args
+):
+    reference, _ = counted_run(monkeypatch, cli_args(), page)
+    interrupted_run(monkeypatch, cli_args(), page, after=12)
+
+    output, extracted = counted_run(monkeypatch, cli_args(resume=True), page)
+
+    assert extracted == NUM_QUESTIONS - 12
+    assert read(output) == read(reference)
+
+
+def test_resume_with_index_restarts_at_the_last_indexed_batch(
+    monkeypatch, tmp_path, page, cli_args
+):
+    open_search_index = cli.open_search_index
+
+    def open_small_batch_index(args):
+        search_index = open_search_index(args)
+        search_index.batch_size = 5
+        return search_index
+
+    reference, _ = counted_run(monkeypatch, cli_args(), page)
+    monkeypatch.setattr(cli, "open_search_index", open_small_batch_index)
+    index_path = str(tmp_path / "index.sqlite3")
+    args = cli_args(index=index_path, no_index=False)
+    interrupted_run(monkeypatch, args, page, after=12)
+
+    args.resume = True
+    output, extracted = counted_run(monkeypatch, args, page)
+
+    # The questions after the last full batch of 5 were never indexed
+    assert extracted == NUM_QUESTIONS - 10
+    assert read(output) == read(reference)
+    with SearchIndex(index_path) as search_index:
+        assert search_index.count() == NUM_QUESTIONS
+    with sqlite3.connect(index_path) as connection:
+        sources = connection.execute("SELECT DISTINCT source FROM documents").fetchall()
+    assert sources == [(output,)]
+
+
+def test_changed_page_or_no_resume_starts_over(monkeypatch, page, cli_args):
+    interrupted_run(monkeypatch, cli_args(), page, after=12)
+    _, extracted = counted_run(monkeypatch, cli_args(), page)
+    assert extracted == NUM_QUESTIONS
+
+    interrupted_run(monkeypatch, cli_args(), page, after=12)
+    changed_page = generate_exam_page(NUM_QUESTIONS, images=False, seed=1)
+    _, extracted = counted_run(monkeypatch, cli_args(resume=True), changed_page)
+    assert extracted == NUM_QUESTIONS
@@ -0,0 +1,117 @@
+import pytest
+
+from benchmarks.synthetic_pages import generate_exam_page
+from scrapers import http_scraper
+from scrapers.html_scraper import exam_page_urls
+from scrapers.http_scraper import HttpScraper
+
+VIEW_URL = "https://www.examtopics.com/exams/microsoft/az-204/view/"
+CHALLENGE_PAGE = "<html><body>Checking your browser...</body></html>"
+
+
+class FakeBrowser:
+    """Stands in for HtmlScraper, serving the pages given by URL"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.loaded = []
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def try_fetch_page(self, url):
+        self.loaded.append(url)
+        return self.pages.get(url)
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    fake = FakeBrowser({})
+    monkeypatch.setattr(http_scraper, "HtmlScraper", fake)
+    return fake
+
+
+def test_fetches_pages_from_base_url_without_browser(http_server, browser):
+    base_url, pages, requested = (
+        http_server.url,
+        http_server.pages,
+        http_server.requested,
+    )
+    urls = exam_page_urls(VIEW_URL, 2)
+    served = [generate_exam_page(3, images=False, seed=seed) for seed in (1, 2)]
+    pages["/exams/microsoft/az-204/view/1"] = served[0]
+    pages["/exams/microsoft/az-204/view/2"] = served[1]
+
+    results = HttpScraper(base_url=base_url).scrape_pages(urls)
+
+    assert results == list(zip(urls, served))
+    assert sorted(requested) == [
+        "/exams/microsoft/az-204/view/1",
+        "/exams/microsoft/az-204/view/2",
+    ]
+    assert browser.loaded == []
+
+
+def test_base_url_path_prefix(http_server, browser):
+    base_url, pages, requested = (
+        http_server.url,
+        http_server.pages,
+        http_server.requested,
+    )
+    html = generate_exam_page(2, images=False)
+    pages["/mirror/exams/microsoft/az-204/view/1"] = html
+
+    scraper = HttpScraper(base_url=base_url + "/mirror/")
+
+    assert scraper.scrape(VIEW_URL + "1") == html
+    assert requested == ["/mirror/exams/microsoft/az-204/view/1"]
+
+
+def test_incomplete_page_falls_back_to_browser(http_server, browser):
+    base_url, pages = http_server.url, http_server.pages
+    complete = generate_exam_page(2, images=False, seed=1)
+    rendered = generate_exam_page(2, images=False, seed=2)
+    pages["/exams/microsoft/az-204/view/1"] = complete
+    pages["/exams/microsoft/az-204/view/2"] = CHALLENGE_PAGE
+    browser.pages[base_url + "/exams/microsoft/az-204/view/2"] = rendered
+
+    results = dict(
+        HttpScraper(base_url=base_url).scrape_pages(exam_page_urls(VIEW_URL, 2))
+    )
+
+    assert browser.loaded == [base_url + "/exams/microsoft/az-204/view/2"]
+    assert results == {VIEW_URL + "1": complete, VIEW_URL + "2": rendered}
+
+
+def test_missing_page_falls_back_to_browser(http_server, browser):
+    base_url = http_server.url
+
+    results = HttpScraper(base_url=base_url).scrape_pages([VIEW_URL + "9"])
+
+    assert browser.loaded == [base_url + "/exams/microsoft/az-204/view/9"]
+    assert results == [(VIEW_URL + "9", None)]
+
+
+def test_failed_fallback_keeps_served_page(http_server, browser):
+    base_url, pages = http_server.url, http_server.pages
+    pages["/exams/microsoft/az-204/view/1"] = CHALLENGE_PAGE
+
+    results = HttpScraper(base_url=base_url).scrape_pages([VIEW_URL + "1"])
+
+    assert results == [(VIEW_URL + "1", CHALLENGE_PAGE)]
+
+
+def test_no_fallback_when_disabled(http_server, browser):
+    base_url, pages = http_server.url, http_server.pages
+    pages["/exams/microsoft/az-204/view/1"] = CHALLENGE_PAGE
+
+    scraper = HttpScraper(base_url=base_url, browser_fallback=False)
+
+    assert scraper.scrape(VIEW_URL + "1") == CHALLENGE_PAGE
+    assert browser.loaded == []
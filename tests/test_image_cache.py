@@ -0,0 +1,120 @@
+import os
+
+from src.utils.image_cache import ImageCache
+from src.utils.request_helpers import download_image, download_images
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+OTHER_PNG = b"\x89PNG\r\n\x1a\n" + b"\x01" * 64
+
+
+def read(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def test_images_are_named_by_content(tmp_path):
+    cache = ImageCache(str(tmp_path))
+
+    first = cache.store("https://a.example/img/diagram.png", [PNG[:8], PNG[8:]])
+    same_name = cache.store("https://b.example/img/diagram.png", [OTHER_PNG])
+    same_content = cache.store("https://c.example/img/diagram.png", [PNG])
+
+    assert os.path.basename(first).startswith("diagram-")
+    assert first.endswith(".png")
+    assert first != same_name
+    assert first == same_content
+    assert read(first) == PNG and read(same_name) == OTHER_PNG
+    assert cache.get_path("https://a.example/img/diagram.png") == first
+    assert cache.get_path("https://d.example/img/diagram.png") is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+
+def test_index_is_persisted_and_merged_across_processes(tmp_path):
+    first = ImageCache(str(tmp_path))
+    second = ImageCache(str(tmp_path))
+    path_a = first.store("https://a.example/a.png", [PNG], etag='"a1"')
+    path_b = second.store(
+        "https://a.example/b.png", [OTHER_PNG], last_modified="Mon, 01 Jan 2024"
+    )
+    first.flush()
+    second.flush()
+
+    reloaded = ImageCache(str(tmp_path))
+    assert reloaded.get_path("https://a.example/a.png") == path_a
+    assert reloaded.get_path("https://a.example/b.png") == path_b
+    assert reloaded.get_validators("https://a.example/a.png") == {
+        "If-None-Match": '"a1"'
+    }
+    assert reloaded.get_validators("https://a.example/b.png") == {
+        "If-Modified-Since": "Mon, 01 Jan 2024"
+    }
+
+
+def test_deleted_file_or_corrupt_index_is_a_miss(tmp_path):
+    cache = ImageCache(str(tmp_path))
+    path = cache.store("https://a.example/a.png", [PNG], etag='"a1"')
+    cache.flush()
+
+    os.remove(path)
+    assert cache.get_path("https://a.example/a.png") is None
+    assert cache.get_validators("https://a.example/a.png") == {}
+
+    with open(cache.index_path, "w", encoding="utf-8") as file:
+        file.write("{")
+    assert ImageCache(str(tmp_path)).get_path("https://a.example/a.png") is None
+
+
+def test_download_is_served_from_the_cache(tmp_path, http_server):
+    http_server.pages["/img/a.png"] = PNG
+    url = http_server.url + "/img/a.png"
+    folder = str(tmp_path / "assets")
+
+    path = download_image(url, folder)
+    assert read(path) == PNG
+    assert download_image(url, folder) == path
+    assert http_server.requested == ["/img/a.png"]
+
+    # A fresh cache of the same folder finds the image through the saved index
+    assert ImageCache(folder).get_path(url) == path
+
+
+def test_revalidation_only_downloads_changed_images(tmp_path, http_server):
+    http_server.pages["/img/a.png"] = PNG
+    http_server.etags["/img/a.png"] = '"v1"'
+    url = http_server.url + "/img/a.png"
+    folder = str(tmp_path / "assets")
+    path = download_image(url, folder)
+
+    assert download_image(url, folder, revalidate=True) == path
+    assert read(path) == PNG
+
+    http_server.pages["/img/a.png"] = OTHER_PNG
+    http_server.etags["/img/a.png"] = '"v2"'
+    changed_path = download_image(url, folder, revalidate=True)
+    assert changed_path != path
+    assert read(changed_path) == OTHER_PNG
+    assert ImageCache(folder).get_validators(url) == {"If-None-Match": '"v2"'}
+
+
+def test_failed_download_falls_back_to_cache_then_url(tmp_path, http_server):
+    http_server.pages["/img/a.png"] = PNG
+    url = http_server.url + "/img/a.png"
+    missing_url = http_server.url + "/img/missing.png"
+    folder = str(tmp_path / "assets")
+    path = download_image(url, folder)
+
+    del http_server.pages["/img/a.png"]
+    assert download_image(url, folder, revalidate=True) == path
+    assert download_image(missing_url, folder) == missing_url
+
+
+def test_download_images_fetches_each_url_once(tmp_path, http_server):
+    for name in ("a", "b", "c"):
+        http_server.pages[f"/img/{name}.png"] = PNG + name.encode("ascii")
+    urls = [http_server.url + f"/img/{name}.png" for name in ("a", "b", "a", "c")]
+
+    paths = download_images(urls, str(tmp_path / "assets"))
+
+    assert list(paths) == [urls[0], urls[1], urls[3]]
+    assert sorted(http_server.requested) == ["/img/a.png", "/img/b.png", "/img/c.png"]
+    assert read(paths[urls[1]]) == PNG + b"b"
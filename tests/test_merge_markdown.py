@@ -0,0 +1,139 @@
+import json
+import os
+
+from src.merge_markdown import merge_markdown_files, natural_sort_key
+from src.models.question import ExamInfo, Question
+from src.renderers.markdown_renderer import MarkdownRenderer
+
+
+def question(number, topic, question_id, text=None):
+    return Question(
+        number=f"Question #{number}",
+        topic=f"Topic {topic}",
+        question_id=question_id,
+        text=text or f"Text of question {number} of topic {topic}",
+    )
+
+
+def write_page(folder, name, questions, title="AZ-204 Exam"):
+    """Render a page like the converter does and return its path"""
+    content = MarkdownRenderer().render(ExamInfo(title=title), questions)
+    path = os.path.join(folder, name)
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        file.write(content)
+    return path
+
+
+def merge(folder):
+    """
+    Merge the pages of folder
+
+    Returns:
+        tuple: (merged content as bytes, list of index entries)
+    """
+    merged_path = merge_markdown_files(str(folder))
+    with open(merged_path, "rb") as file:
+        merged = file.read()
+    index_path = os.path.join(folder, "merged_output.index.json")
+    with open(index_path, encoding="utf-8") as file:
+        index = json.load(file)
+    assert index["merged_file"] == "merged_output.md"
+    return merged, index["questions"]
+
+
+def test_natural_sort_key_orders_page_numbers():
+    names = ["az-204-10_output.md", "az-204-2_output.md", "AZ-204-1_output.md"]
+
+    assert sorted(names, key=natural_sort_key) == [
+        "AZ-204-1_output.md",
+        "az-204-2_output.md",
+        "az-204-10_output.md",
+    ]
+
+
+def test_overlapping_pages_keep_one_copy_of_each_question(tmp_path):
+    first_page = [question(1, 1, "101"), question(2, 1, "102")]
+    second_page = [question(2, 1, "102"), question(3, 1, "103")]
+    write_page(tmp_path, "az-204-1_output.md", first_page)
+    write_page(tmp_path, "az-204-2_output.md", second_page)
+
+    merged, index = merge(tmp_path)
+
+    assert [entry["question_id"] for entry in index] == ["101", "102", "103"]
+    assert merged.count(b"*Question ID: 102*") == 1
+    assert merged.count(b"# AZ-204 Exam") == 1
+    # The copy kept is the one of the first page
+    assert [entry["source"] for entry in index] == [
+        "az-204-1_output.md",
+        "az-204-1_output.md",
+        "az-204-2_output.md",
+    ]
+
+
+def test_questions_are_sorted_by_topic_and_number_across_pages(tmp_path):
+    write_page(
+        tmp_path, "az-204-10_output.md", [question(2, 2, "202"), question(10, 1, "110")]
+    )
+    write_page(
+        tmp_path, "az-204-2_output.md", [question(1, 2, "201"), question(9, 1, "109")]
+    )
+
+    _, index = merge(tmp_path)
+
+    assert [(entry["topic"], entry["number"]) for entry in index] == [
+        ("Topic 1", "Question #9"),
+        ("Topic 1", "Question #10"),
+        ("Topic 2", "Question #1"),
+        ("Topic 2", "Question #2"),
+    ]
+
+
+def test_index_offsets_point_at_the_question_blocks(tmp_path):
+    renderer = MarkdownRenderer()
+    # Multi-byte characters and a heading-like line inside the question text
+    text = "Résumé with ü\n## Not a heading (Topic 9)"
+    questions = {
+        "101": question(1, 1, "101", text=text),
+        "102": question(2, 1, "102"),
+        "201": question(1, 2, "201"),
+    }
+    write_page(tmp_path, "az-204-1_output.md", [questions["101"], questions["201"]])
+    write_page(tmp_path, "az-204-2_output.md", [questions["102"], questions["101"]])
+
+    merged, index = merge(tmp_path)
+
+    assert len(index) == 3
+    end = None
+    for entry in index:
+        block = merged[entry["offset"] : entry["offset"] + entry["length"]]
+        expected = "\n".join(renderer.render_question(questions[entry["question_id"]]))
+        # Blocks are separated by the newline joining rendered blocks
+        assert block.decode("utf-8") in (expected + "\n", expected)
+        if end is not None:
+            assert entry["offset"] == end
+        end = entry["offset"] + entry["length"]
+    assert end == len(merged)
+
+
+def test_exams_keep_their_own_header(tmp_path):
+    write_page(tmp_path, "az-204-1_output.md", [question(1, 1, "101")])
+    write_page(
+        tmp_path, "az-900-1_output.md", [question(1, 1, "901")], title="AZ-900 Exam"
+    )
+
+    merged, index = merge(tmp_path)
+
+    assert merged.index(b"# AZ-204 Exam") < merged.index(b"101")
+    assert merged.index(b"101") < merged.index(b"# AZ-900 Exam")
+    assert merged.index(b"# AZ-900 Exam") < merged.index(b"901")
+    assert [entry["question_id"] for entry in index] == ["101", "901"]
+
+
+def test_merging_again_ignores_the_merged_file(tmp_path):
+    write_page(tmp_path, "az-204-1_output.md", [question(1, 1, "101")])
+    first, _ = merge(tmp_path)
+
+    second, index = merge(tmp_path)
+
+    assert second == first
+    assert len(index) == 1